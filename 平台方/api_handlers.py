@@ -0,0 +1,398 @@
+"""
+接口处理模块
+游戏接口的参数校验和业务处理，与具体的服务器实现无关：
+backend.py（Flask，多线程）持有房间锁后调用，async_backend.py（asyncio，单事件循环）直接调用，
+两者因此提供完全相同的接口约定（参数、错误信息、返回数据）
+每个处理函数接收游戏逻辑实例和请求数据，返回 (响应数据, 状态码, 提示信息)
+"""
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+from game_logic import GameLogic, GameStatus
+
+logger = logging.getLogger(__name__)
+
+Result = Tuple[Dict, int, str]
+
+
+def register(game: GameLogic, data: Optional[Dict]) -> Result:
+    """游戏方注册"""
+    data = data or {}
+    group_name = data.get('group_name') or data.get('group_id', '')
+    group_name = group_name.strip() if isinstance(group_name, str) else ''
+
+    if not group_name:
+        return {}, 400, '组名不能为空'
+
+    success = game.register_group(group_name)
+    if success:
+        return {
+            'group_name': group_name,
+            'total_groups': len(game.groups)
+        }, 200, '注册成功'
+    else:
+        return {}, 400, '注册失败：组名已存在或已达到最大组数(5组)'
+
+
+def start_game(game: GameLogic, data: Optional[Dict]) -> Result:
+    """开始游戏（主持方）"""
+    data = data or {}
+    undercover_word = data.get('undercover_word', '').strip()
+    civilian_word = data.get('civilian_word', '').strip()
+
+    if not undercover_word or not civilian_word:
+        return {}, 400, '词语不能为空'
+
+    success = game.start_game(undercover_word, civilian_word)
+    if success:
+        return {
+            'undercover_group': game.undercover_group,
+            'groups': {name: info['role'] for name, info in game.groups.items()}
+        }, 200, '游戏已开始'
+    else:
+        return {}, 400, '无法开始游戏：游戏状态不正确或没有注册的组'
+
+
+def start_round(game: GameLogic, data: Optional[Dict] = None) -> Result:
+    """开始新回合（主持方）"""
+    order = game.start_round()
+    if order:
+        return {
+            'round': game.current_round,
+            'order': order
+        }, 200, '回合已开始'
+    else:
+        return {}, 400, '无法开始回合：游戏状态不正确或活跃组数不足'
+
+
+def submit_description(game: GameLogic, data: Optional[Dict]) -> Result:
+    """提交描述（游戏方）"""
+    data = data or {}
+    group_name = data.get('group_name', '').strip()
+    description = data.get('description', '').strip()
+
+    if not group_name or not description:
+        return {}, 400, '组名和描述不能为空'
+
+    success = game.submit_description(group_name, description)
+    if success:
+        # 获取当前描述列表
+        current_descriptions = game.descriptions.get(game.current_round, [])
+        return {
+            'round': game.current_round,
+            'total_descriptions': len(current_descriptions)
+        }, 200, '描述提交成功'
+    else:
+        # 检查具体失败原因
+        if game.game_status != GameStatus.DESCRIBING:
+            return {}, 400, '描述提交失败：当前不在描述阶段'
+        if group_name in [d['group'] for d in game.descriptions.get(game.current_round, [])]:
+            return {}, 400, '描述提交失败：已提交过描述'
+        # 可能是超时
+        return {}, 400, '描述提交失败：已超时（3秒限制）、组名无效或游戏状态不正确'
+
+
+def submit_vote(game: GameLogic, data: Optional[Dict]) -> Result:
+    """提交投票（游戏方）"""
+    try:
+        logger.debug("收到投票请求", extra={"fields": {"data": data}})
+        if not data:
+            logger.info("投票失败：请求数据为空")
+            return {}, 400, '请求数据为空'
+
+        voter_group = data.get('voter_group', '').strip()
+        target_group = data.get('target_group', '').strip()
+
+        if not voter_group or not target_group:
+            logger.info("投票失败：投票者和被投票者不能为空",
+                        extra={"fields": {"voter": voter_group, "target": target_group}})
+            return {}, 400, '投票者和被投票者不能为空'
+
+        # 防御性检查：确保game对象和关键属性存在
+        if game is None:
+            return {}, 500, '投票提交失败：游戏对象未初始化'
+        if not hasattr(game, 'groups') or game.groups is None:
+            return {}, 500, '投票提交失败：游戏组数据未初始化'
+        if not hasattr(game, 'eliminated_groups') or not isinstance(game.eliminated_groups, list):
+            return {}, 500, '投票提交失败：淘汰组数据异常'
+        if not hasattr(game, 'votes') or game.votes is None:
+            return {}, 500, '投票提交失败：投票数据未初始化'
+        if not hasattr(game, 'current_round') or game.current_round is None:
+            return {}, 500, '投票提交失败：当前回合数异常'
+
+        # 确保current_round是有效的整数
+        if not isinstance(game.current_round, int) or game.current_round < 0:
+            return {}, 500, f'投票提交失败：当前回合数无效（{game.current_round}）'
+
+        # 阶段切换由截止时间调度器按时触发；这里是写操作，顺带推进一次以防调度线程稍有延迟
+        if game.game_status == GameStatus.DESCRIBING:
+            game.advance_phase()
+
+        # 详细检查失败原因（在调用submit_vote之前）
+        if game.game_status != GameStatus.VOTING:
+            return {}, 400, '投票提交失败：当前不在投票阶段（状态：' + game.game_status.value + '）'
+
+        # 确保当前回合的投票字典存在
+        if game.current_round not in game.votes:
+            game.votes[game.current_round] = {}
+
+        # 检查是否已经投过票了
+        current_round_votes = game.votes.get(game.current_round, {})
+        if voter_group in current_round_votes:
+            logger.info("投票失败：已投过票", extra={"fields": {
+                "round": game.current_round, "voter": voter_group, "previous_target": current_round_votes.get(voter_group)}})
+            return {}, 400, '投票提交失败：已投过票'
+        if voter_group == target_group:
+            return {}, 400, '投票提交失败：不能投自己'
+        if voter_group not in game.groups:
+            return {}, 400, f'投票提交失败：投票者组名无效（注册的组：{list(game.groups.keys())}）'
+        if target_group not in game.groups:
+            return {}, 400, f'投票提交失败：目标组名无效（注册的组：{list(game.groups.keys())}）'
+        if not game.is_active(voter_group):
+            return {}, 400, '投票提交失败：投票者已淘汰'
+        if not game.is_eligible_voter(voter_group):
+            return {}, 400, '投票提交失败：投票者没有参加本回合（本回合开始后才注册）'
+        if not game.is_active(target_group):
+            return {}, 400, '投票提交失败：被投票者已淘汰'
+
+        # 所有检查都通过，调用submit_vote
+        success = game.submit_vote(voter_group, target_group)
+        if success:
+            logger.info("投票成功", extra={"fields": {
+                "round": game.current_round, "voter": voter_group, "target": target_group}})
+            if game.game_status != GameStatus.VOTING:
+                # 开启了自动推进，最后一票已触发本回合结算
+                return {}, 200, '投票提交成功，本回合投票已自动结算'
+            return {}, 200, '投票提交成功'
+        else:
+            # 如果submit_vote返回False，但前面的检查都通过了，说明有内部逻辑问题
+            logger.error("投票失败：submit_vote返回False，但前面的检查都通过了", extra={"fields": {
+                "round": game.current_round, "voter": voter_group, "target": target_group}})
+            return {}, 400, f'投票提交失败：内部逻辑错误（请检查游戏状态和投票记录）'
+    except KeyError as e:
+        # 处理KeyError异常
+        error_detail = f"KeyError: {str(e)}"
+        logger.exception("投票处理异常", extra={"fields": {"data": data}})
+        return {}, 500, f'投票提交失败：数据访问错误 - {error_detail}'
+    except AttributeError as e:
+        # 处理AttributeError异常
+        error_detail = f"AttributeError: {str(e)}"
+        logger.exception("投票处理异常", extra={"fields": {"data": data}})
+        return {}, 500, f'投票提交失败：属性访问错误 - {error_detail}'
+    except Exception as e:
+        # 捕获所有其他异常，避免500错误
+        error_detail = f"{type(e).__name__}: {str(e)}"
+        logger.exception("投票处理异常", extra={"fields": {"data": data}})
+        return {}, 500, f'投票提交失败：服务器内部错误 - {error_detail}'
+
+
+def process_voting(game: GameLogic, data: Optional[Dict] = None) -> Result:
+    """处理投票结果（主持方）"""
+    result = game.process_voting_result()
+    if 'error' in result:
+        return result, 400, result.get('error', '投票处理失败')
+    return result, 200, '投票结果已生成'
+
+
+def get_settings(game: GameLogic, data: Optional[Dict] = None) -> Result:
+    """获取房间设置（主持方）"""
+    return game.get_settings(), 200, 'ok'
+
+
+def update_settings(game: GameLogic, data: Optional[Dict]) -> Result:
+    """更新房间设置（主持方）"""
+    data = data or {}
+
+    updates = {}
+    for key in ('auto_advance', 'auto_next_round'):
+        if key in data:
+            if not isinstance(data[key], bool):
+                return {}, 400, f'{key} 必须是布尔值'
+            updates[key] = data[key]
+    if 'next_round_delay' in data:
+        delay = data['next_round_delay']
+        if isinstance(delay, bool) or not isinstance(delay, (int, float)) or not 0 <= delay <= 60:
+            return {}, 400, 'next_round_delay 必须是0到60之间的秒数'
+        updates['next_round_delay'] = float(delay)
+
+    settings = game.update_settings(**updates)
+    return settings, 200, '设置已更新'
+
+
+def get_word(game: GameLogic, data: Optional[Dict]) -> Result:
+    """获取自己的词语（游戏方，参数来自查询字符串）"""
+    group_name = (data or {}).get('group_name', '').strip()
+
+    if not group_name:
+        return {}, 400, '组名不能为空'
+
+    word = game.get_group_word(group_name)
+    if word:
+        return {'word': word}, 200, 'ok'
+    else:
+        return {}, 404, '未找到该组的词语或游戏未开始'
+
+
+def reset_game(game: GameLogic, data: Optional[Dict] = None) -> Result:
+    """重置游戏（主持方）"""
+    game.reset_game()
+    return {}, 200, '游戏已重置'
+
+
+def report_issue(game: GameLogic, data: Optional[Dict]) -> Result:
+    """异常上报（游戏方）"""
+    data = data or {}
+    group_name = data.get('group_name') or data.get('group_id', '')
+    group_name = group_name.strip() if isinstance(group_name, str) else ''
+    report_type = data.get('type', 'general').strip() or 'general'
+    detail = data.get('detail', '').strip()
+
+    if not detail:
+        return {}, 400, 'detail不能为空'
+
+    report_entry = game.add_report(group_name, report_type, detail)
+    return {
+        'ticket': report_entry['ticket'],
+        'recorded_at': report_entry['time']
+    }, 200, '异常已记录'
+
+
+# 批量接口单次最多的操作数
+MAX_BATCH_OPS = 50
+
+# 批量接口可用的操作：操作名 -> (处理函数, 是否需要主持方令牌)
+BATCH_OPS = {
+    'register': (register, False),
+    'start_game': (start_game, True),
+    'start_round': (start_round, True),
+    'describe': (submit_description, False),
+    'vote': (submit_vote, False),
+    'process_voting': (process_voting, True),
+    'get_settings': (get_settings, True),
+    'update_settings': (update_settings, True),
+    'word': (get_word, False),
+    'reset': (reset_game, True),
+    'report': (report_issue, False),
+}
+
+
+def run_batch(game: GameLogic, data: Optional[Dict], is_admin: bool = False) -> Result:
+    """
+    批量执行操作（调用方只获取一次房间锁）
+    请求数据：{"ops": [{"op": 操作名, "data": 参数}, ...], "atomic": 是否全部成功才生效}
+    - 普通模式按顺序执行每个操作，某个操作失败不影响后续操作
+    - atomic 模式先在游戏状态副本上试运行，全部成功后再按试运行产生的操作记录应用到真实状态
+      （随机结果和时间与试运行完全一致）；任何一个操作失败则什么都不改变，并跳过其后的操作
+    :param is_admin: 请求是否带有主持方令牌，需要令牌的操作没有令牌时失败（403）
+    :return: 响应数据包含每个操作的结果 {op, code, message, data}
+    """
+    data = data or {}
+    if not isinstance(data, dict):
+        return {}, 400, '请求数据格式错误'
+    ops = data.get('ops')
+    atomic = data.get('atomic', False)
+    if not isinstance(ops, list) or not ops:
+        return {}, 400, 'ops 必须是非空的操作列表'
+    if len(ops) > MAX_BATCH_OPS:
+        return {}, 400, f'单次最多{MAX_BATCH_OPS}个操作'
+    if not isinstance(atomic, bool):
+        return {}, 400, 'atomic 必须是布尔值'
+
+    records = []
+    target = game
+    if atomic:
+        target = game.fork()
+        target.set_journal(records.append)
+
+    results = []
+    failed = None  # atomic 模式下第一个失败的操作序号
+    for index, item in enumerate(ops):
+        op = item.get('op') if isinstance(item, dict) else None
+        if not isinstance(op, str):
+            op = None  # 结果中只回显合法的操作名
+        if failed is not None:
+            results.append({'op': op, 'code': 409, 'message': '未执行：前面的操作失败', 'data': {}})
+            continue
+        params = item.get('data') if isinstance(item, dict) else None
+        entry = BATCH_OPS.get(op)
+        if not isinstance(item, dict):
+            op_data, code, message = {}, 400, '请求数据格式错误：操作必须是 {"op": 操作名, "data": 参数} 对象'
+        elif op is None:
+            op_data, code, message = {}, 400, '请求数据格式错误：op 必须是操作名字符串'
+        elif entry is None:
+            op_data, code, message = {}, 400, f'未知操作：{op}'
+        elif params is not None and not isinstance(params, dict):
+            op_data, code, message = {}, 400, '请求数据格式错误：data 必须是对象'
+        elif entry[1] and not is_admin:
+            op_data, code, message = {}, 403, '无权限：需要主持方令牌'
+        else:
+            try:
+                op_data, code, message = entry[0](target, params or {})
+            except Exception as e:
+                logger.exception("批量操作异常", extra={"fields": {"op": op, "index": index}})
+                op_data, code, message = {}, 500, f'服务器内部错误 - {type(e).__name__}: {str(e)}'
+        results.append({'op': op, 'code': code, 'message': message, 'data': op_data or {}})
+        if atomic and code != 200:
+            failed = index
+
+    succeeded = sum(1 for result in results if result['code'] == 200)
+    if atomic:
+        if failed is not None:
+            return {'atomic': True, 'applied': False, 'results': results}, 400, \
+                f'批量操作未生效：第{failed + 1}个操作（{results[failed]["op"]}）失败 - {results[failed]["message"]}'
+        game.apply_records(records)
+    # applied：操作结果是否已作用于真实状态（只有 atomic 模式失败时为 False）
+    return {'atomic': atomic, 'applied': True, 'results': results}, 200, \
+        f'批量操作完成：成功{succeeded}/{len(results)}'
+
+
+# 公共读接口：从不可变快照构建响应数据，不需要房间锁
+def status_view(snapshot) -> Result:
+    return snapshot.public_status, 200, 'ok'
+
+
+def result_view(snapshot) -> Result:
+    if not snapshot.last_result:
+        return {}, 404, '当前暂无投票结果'
+    return snapshot.last_result, 200, 'ok'
+
+
+def descriptions_view(snapshot) -> Result:
+    return snapshot.descriptions, 200, 'ok'
+
+
+def groups_view(snapshot) -> Result:
+    return snapshot.groups, 200, 'ok'
+
+
+def round_view(snapshot) -> Result:
+    """
+    游戏方刷新界面所需的全部数据（/api/round/view），取自同一个快照，彼此一致
+    status 与 /api/status 相同，descriptions 与 /api/descriptions 相同，last_result 与 /api/result 相同（没有时为None）
+    """
+    status = snapshot.public_status
+    return {
+        'version': snapshot.version,
+        'status': status,
+        'round': status['round'],
+        'describe_order': status['describe_order'],
+        'eliminated_groups': status['eliminated_groups'],
+        'descriptions': snapshot.descriptions,
+        'last_result': snapshot.last_result
+    }, 200, 'ok'
+
+
+def server_time() -> Result:
+    """服务器当前时间戳（秒），游戏方据此计算本机与服务器的时钟偏差"""
+    return {'server_time': time.time()}, 200, 'ok'
+
+
+def parse_room_request(data: Optional[Dict]) -> Tuple[Optional[str], str]:
+    """解析创建房间请求，返回 (房间ID或None, 房间名称)"""
+    data = data or {}
+    room_id = data.get('room_id')
+    room_id = room_id.strip() if isinstance(room_id, str) and room_id.strip() else None
+    name = data.get('name', '')
+    name = name.strip() if isinstance(name, str) else ''
+    return room_id, name
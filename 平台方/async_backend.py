@@ -0,0 +1,614 @@
+"""
+异步后端服务器模块
+与 backend.py 提供完全相同的接口（路由、参数、返回数据、ETag），但由单个 asyncio 事件循环驱动：
+所有游戏逻辑都在事件循环线程中执行，天然串行，不需要房间锁；
+长轮询和事件推送挂起时只占用一个 Future/队列，不占用线程，适合成百上千个同时在线的轮询客户端
+
+运行方式（在 平台方 目录下，只依赖标准库）：
+    python async_backend.py --port 5000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from http import HTTPStatus
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import api_handlers
+from event_store import EventLog
+from events import AsyncSubscription, EventBroker, format_sse
+from game_logic import GameLogic
+from log_setup import setup_logging
+from metrics import UNKNOWN_ROOM, UNMATCHED_ROUTE, ServerMetrics
+from response_cache import CachedResponse
+from rooms import DEFAULT_ROOM_ID, MAX_ROOMS, ROOM_ID_PATTERN, Room, restore_from_log
+
+logger = logging.getLogger(__name__)
+
+# 管理员令牌（主持方专用），与 backend.py 相同
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "host-secret")
+
+# 事件日志目录，与 backend.py 含义相同；两个服务器不要同时使用同一个目录
+EVENT_LOG_DIR = os.environ.get("EVENT_LOG_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+
+# 长轮询最长挂起时间（秒）
+MAX_LONG_POLL_WAIT = 30
+
+# 事件流心跳间隔（秒）
+SSE_HEARTBEAT_INTERVAL = 15
+
+# 请求头最大长度（字节）
+MAX_HEADER_SIZE = 64 * 1024
+
+# 请求体最大长度（字节）
+MAX_BODY_SIZE = 1024 * 1024
+
+# 需要主持方令牌的接口
+ADMIN_ROUTES = {
+    ('POST', '/api/game/start'), ('POST', '/api/game/round/start'), ('POST', '/api/game/voting/process'),
+    ('GET', '/api/game/settings'), ('POST', '/api/game/settings'), ('GET', '/api/game/state'),
+    ('POST', '/api/game/reset'),
+}
+
+# 写接口及查询接口：(方法, 路径) -> 处理函数，处理函数直接读写游戏状态
+GAME_ROUTES = {
+    ('POST', '/api/register'): api_handlers.register,
+    ('POST', '/api/game/start'): api_handlers.start_game,
+    ('POST', '/api/game/round/start'): api_handlers.start_round,
+    ('POST', '/api/describe'): api_handlers.submit_description,
+    ('POST', '/api/vote'): api_handlers.submit_vote,
+    ('POST', '/api/game/voting/process'): api_handlers.process_voting,
+    ('GET', '/api/game/settings'): api_handlers.get_settings,
+    ('POST', '/api/game/settings'): api_handlers.update_settings,
+    ('GET', '/api/word'): api_handlers.get_word,
+    ('POST', '/api/game/reset'): api_handlers.reset_game,
+    ('POST', '/api/report'): api_handlers.report_issue,
+}
+
+# 可缓存的公共读接口：路径 -> (缓存标识, 构建函数)
+CACHED_ROUTES = {
+    '/api/status': ('status', api_handlers.status_view),
+    '/api/result': ('result', api_handlers.result_view),
+    '/api/descriptions': ('descriptions', api_handlers.descriptions_view),
+    '/api/groups': ('groups', api_handlers.groups_view),
+    '/api/round/view': ('round_view', api_handlers.round_view),
+}
+
+# 支持 since/wait 长轮询的接口
+LONG_POLL_ROUTES = {'/api/status', '/api/round/view'}
+
+CORS_HEADERS = [
+    ('Access-Control-Allow-Origin', '*'),
+]
+
+
+def encode_payload(data=None, code=200, message="ok") -> bytes:
+    """按 Flask 默认的 JSON 编码方式编码响应体，同一份数据两个服务器的 ETag 相同"""
+    payload = {"code": code, "message": message, "data": data or {}}
+    return (json.dumps(payload, ensure_ascii=True, sort_keys=True, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class AsyncRoom:
+    """
+    异步服务器中的游戏房间
+    所有方法都只在事件循环线程中调用，游戏状态不需要加锁
+    """
+
+    info = Room.info
+
+    def __init__(self, room_id: str, name: str = "", log_dir: Optional[str] = None):
+        """
+        :param room_id: 房间ID
+        :param name: 房间名称
+        :param log_dir: 事件日志目录，None 表示不记录
+        """
+        self.room_id = room_id
+        self.name = name or room_id
+        self.game = GameLogic()
+        self.log: Optional[EventLog] = None
+        if log_dir is not None:
+            self.log, self.name = restore_from_log(self.game, log_dir, room_id, self.name)
+        self.created_time = datetime.now().isoformat()
+        self.events = EventBroker(subscription_class=AsyncSubscription)  # SSE 事件分发
+        self._responses: Dict[str, CachedResponse] = {}  # 公共读接口的编码响应，按版本失效
+        self._waiters: Set[asyncio.Future] = set()  # 挂起中的长轮询
+        self._loop = asyncio.get_running_loop()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._armed_deadline: Optional[float] = None
+        self.game.add_listener(self._on_game_changed)
+        self._arm_deadline()  # 重放恢复的对局可能正处于描述阶段
+
+    def _on_game_changed(self, version: int, event_type: str, data: Dict):
+        """游戏状态变更回调：唤醒长轮询、推送事件、重新登记截止时间"""
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+        self.events.publish(version, event_type, data)
+        self._arm_deadline()
+
+    def _arm_deadline(self):
+        """按游戏的下一个截止时间重新登记事件循环定时器"""
+        deadline = self.game.next_deadline()
+        if deadline == self._armed_deadline:
+            return
+        self._armed_deadline = deadline
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if deadline is not None:
+            # 游戏逻辑使用 time.monotonic，换算成事件循环的时钟
+            delay = max(0.0, deadline - time.monotonic())
+            self._timer = self._loop.call_at(self._loop.time() + delay, self._on_deadline)
+
+    def _on_deadline(self):
+        """截止时间到达"""
+        self._timer = None
+        self._armed_deadline = None
+        try:
+            self.game.advance_phase()
+        finally:
+            self._arm_deadline()
+
+    def cached_response(self, key: str, build_data) -> CachedResponse:
+        """
+        获取当前版本的编码响应，没有时构建
+        :param key: 接口标识
+        :param build_data: 构建函数 build_data(snapshot) -> (data, code, message)
+        """
+        snapshot = self.game.snapshot
+        entry = self._responses.get(key)
+        if entry is None or entry.version != snapshot.version:
+            data, code, message = build_data(snapshot)
+            entry = CachedResponse(snapshot.version, code, encode_payload(data, code, message))
+            self._responses[key] = entry
+        return entry
+
+    async def wait_for_version_change(self, since: int, timeout: float) -> bool:
+        """
+        等待游戏状态版本发生变化
+        :param since: 客户端已知的版本号
+        :param timeout: 最长等待时间（秒）
+        :return: 版本是否已变化
+        """
+        if self.game.version != since:
+            return True
+        waiter = self._loop.create_future()
+        self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._waiters.discard(waiter)
+        return self.game.version != since
+
+    def close(self, delete_log: bool = False):
+        """
+        关闭房间，取消定时器
+        :param delete_log: 是否删除事件日志
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._armed_deadline = None
+        if self.log is not None:
+            self.game.set_journal(None)
+            self.log.close()
+            if delete_log:
+                os.remove(self.log.path)
+            self.log = None
+
+
+class AsyncRoomRegistry:
+    """异步服务器的房间注册表（单进程，可选事件日志持久化）"""
+
+    def __init__(self, max_rooms: int = MAX_ROOMS, log_dir: Optional[str] = None):
+        """
+        :param max_rooms: 最大房间数
+        :param log_dir: 事件日志目录，启动时从中恢复所有房间；None 表示不持久化
+        """
+        self.max_rooms = max_rooms
+        self.log_dir = log_dir
+        self._rooms: Dict[str, AsyncRoom] = {}
+        self.create_room(DEFAULT_ROOM_ID, "默认房间")
+        if log_dir is not None:
+            for filename in sorted(os.listdir(log_dir)):
+                room_id, ext = os.path.splitext(filename)
+                if ext == ".log" and room_id != DEFAULT_ROOM_ID:
+                    self.create_room(room_id)
+
+    def create_room(self, room_id: Optional[str] = None, name: str = "") -> Optional[AsyncRoom]:
+        """
+        创建房间
+        :return: 新房间，ID非法、已存在或房间数已满时返回None
+        """
+        if room_id is None:
+            room_id = uuid.uuid4().hex[:8]
+        if not ROOM_ID_PATTERN.match(room_id) or room_id in self._rooms or len(self._rooms) >= self.max_rooms:
+            return None
+        room = AsyncRoom(room_id, name, self.log_dir)
+        self._rooms[room_id] = room
+        return room
+
+    def get_room(self, room_id: str) -> Optional[AsyncRoom]:
+        return self._rooms.get(room_id)
+
+    def list_rooms(self) -> List[AsyncRoom]:
+        return list(self._rooms.values())
+
+    def close_room(self, room_id: str) -> bool:
+        """关闭房间（默认房间不可关闭）"""
+        if room_id == DEFAULT_ROOM_ID:
+            return False
+        room = self._rooms.pop(room_id, None)
+        if room is None:
+            return False
+        room.close(delete_log=True)
+        return True
+
+    def close_all(self):
+        for room in self.list_rooms():
+            room.close()
+
+
+class Request:
+    """解析好的 HTTP 请求"""
+    __slots__ = ("method", "path", "query", "headers", "body", "_json")
+
+    def __init__(self, method: str, path: str, query: Dict[str, str], headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers  # 头部名称统一为小写
+        self.body = body
+        self._json = None
+
+    def json(self):
+        """请求体 JSON（解析一次后缓存），没有请求体返回None，格式错误抛出 ValueError"""
+        if not self.body:
+            return None
+        if self._json is None:
+            self._json = json.loads(self.body)
+        return self._json
+
+    def arg(self, name: str, cast, default=None):
+        """按类型读取查询参数，缺失或无法转换时返回默认值（与 Flask request.args.get(type=...) 相同）"""
+        try:
+            return cast(self.query[name])
+        except (KeyError, ValueError):
+            return default
+
+
+# 响应：(状态码, 额外头部, 响应体)
+Reply = Tuple[int, List[Tuple[str, str]], bytes]
+
+
+def json_reply(data=None, code=200, message="ok") -> Reply:
+    return code, [('Content-Type', 'application/json')], encode_payload(data, code, message)
+
+
+class AsyncGameServer:
+    """HTTP/1.1 服务器：保持连接、按 Content-Length 读取请求体，路由与 backend.py 一致"""
+
+    def __init__(self, log_dir: Optional[str] = None):
+        self.rooms = AsyncRoomRegistry(log_dir=log_dir)
+        self.metrics = ServerMetrics()  # 与 backend.py 相同的指标（单事件循环没有房间锁，不记录锁指标）
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """处理一个 TCP 连接上的所有请求"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                request, version = self._parse_head(head)
+                length = self._content_length(request) if request is not None else None
+                if length is None:
+                    # 头部格式错误、Content-Length 非法或使用了不支持的 Transfer-Encoding：
+                    # 请求体边界无法确定，回复后关闭连接
+                    writer.write(self._serialize(*json_reply({}, 400, '请求格式错误'), keep_alive=False))
+                    return
+                if length > MAX_BODY_SIZE:
+                    writer.write(self._serialize(*json_reply({}, 413, '请求体过大'), keep_alive=False))
+                    return
+                if length:
+                    request.body = await reader.readexactly(length)
+
+                connection = request.headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                if request.method == 'GET' and self._route_of(request.path)[1] == '/api/events':
+                    started = self.start_metrics(request) if self.metrics.enabled else None
+                    try:
+                        await self._stream_events(request, writer)
+                    finally:
+                        if started is not None:
+                            self.finish_metrics(request, started, 200)
+                    return
+                status, headers, body = await self.dispatch(request)
+                writer.write(self._serialize(status, headers, body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _content_length(request: Request) -> Optional[int]:
+        """请求体长度；不支持 Transfer-Encoding（如 chunked），Content-Length 非数字或为负数时返回 None"""
+        if 'transfer-encoding' in request.headers:
+            return None
+        value = request.headers.get('content-length', '') or '0'
+        if not (value.isascii() and value.isdigit()):
+            return None
+        return int(value)
+
+    @staticmethod
+    def _parse_head(head: bytes) -> Tuple[Optional[Request], str]:
+        """解析请求行和头部，格式错误返回 (None, '')"""
+        try:
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, version = lines[0].split(" ", 2)
+            headers = {}
+            for line in lines[1:]:
+                if line:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+            url = urlsplit(target)
+            query = dict(parse_qsl(url.query, keep_blank_values=True))
+            return Request(method.upper(), url.path, query, headers, b""), version
+        except ValueError:
+            return None, ''
+
+    @staticmethod
+    def _serialize(status: int, headers: List[Tuple[str, str]], body: bytes, keep_alive: bool) -> bytes:
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}", f"Content-Length: {len(body)}"]
+        lines.extend(f"{name}: {value}" for name, value in headers + CORS_HEADERS)
+        if not keep_alive:
+            lines.append("Connection: close")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    @staticmethod
+    def _route_of(path: str) -> Tuple[str, str]:
+        """
+        把房间作用域路径换算成默认路径
+        /api/rooms/<room_id>/<rule> -> (room_id, /api/<rule>)，其余路径属于默认房间
+        """
+        if path.startswith('/api/rooms/'):
+            room_id, slash, rest = path[len('/api/rooms/'):].partition('/')
+            if slash and rest:
+                return room_id, '/api/' + rest
+        return DEFAULT_ROOM_ID, path
+
+    def _metrics_route(self, request: Request) -> Tuple[str, str]:
+        """
+        指标中的 (房间ID, 路由名)，路由名与 backend.py 的路由模板一致，未知路径统一为 unmatched，
+        不存在的房间统一为 unknown
+        """
+        path = request.path
+        if path in ('/api/time', '/api/rooms', '/metrics'):
+            return DEFAULT_ROOM_ID, path
+        room_id, rule = self._route_of(path)
+        if path.startswith('/api/rooms/') and rule == path:
+            room_id, rule = path[len('/api/rooms/'):], '/api/rooms/<room_id>'
+        if self.rooms.get_room(room_id) is None:
+            room_id = UNKNOWN_ROOM
+        if rule == '/api/rooms/<room_id>':
+            return room_id, rule
+        key = (request.method, rule)
+        if key in GAME_ROUTES or key == ('POST', '/api/batch') or rule in CACHED_ROUTES or \
+                rule in ('/api/game/state', '/api/events'):
+            return room_id, rule
+        return room_id, UNMATCHED_ROUTE
+
+    def _metrics_group_name(self, request: Request) -> Optional[str]:
+        """请求参数中的组名（查询参数或 POST 的 JSON 请求体），没有时返回 None"""
+        group_name = request.query.get('group_name')
+        if group_name is None and request.method == 'POST' and request.body:
+            try:
+                data = request.json()
+            except ValueError:
+                return None
+            if isinstance(data, dict):
+                group_name = data.get('group_name') or data.get('voter_group')
+        return group_name if isinstance(group_name, str) else None
+
+    def start_metrics(self, request: Request) -> Tuple[str, str, float]:
+        """请求开始：增加处理中计数，返回 (房间ID, 路由名, 开始时间)"""
+        room_id, route = self._metrics_route(request)
+        self.metrics.request_started(route)
+        return room_id, route, time.perf_counter()
+
+    def finish_metrics(self, request: Request, started: Tuple[str, str, float], code: int):
+        room_id, route, start = started
+        group_name = self._metrics_group_name(request) if route != UNMATCHED_ROUTE else None
+        self.metrics.request_finished(route, request.method, code, time.perf_counter() - start, room_id, group_name)
+
+    async def dispatch(self, request: Request) -> Reply:
+        """按路由处理请求，异常返回与 backend.py 全局异常处理相同的 500 响应"""
+        started = self.start_metrics(request) if self.metrics.enabled else None
+        try:
+            reply = await self._dispatch(request)
+        except Exception as e:
+            logger.exception("请求处理异常", extra={"fields": {"method": request.method, "path": request.path}})
+            reply = json_reply({}, 500, f'服务器内部错误 - {type(e).__name__}: {str(e)}')
+        if started is not None:
+            self.finish_metrics(request, started, reply[0])
+        return reply
+
+    async def _dispatch(self, request: Request) -> Reply:
+        method, path = request.method, request.path
+        if method == 'OPTIONS':
+            return 200, [('Access-Control-Allow-Methods', 'GET, POST, DELETE, OPTIONS'),
+                         ('Access-Control-Allow-Headers', request.headers.get(
+                             'access-control-request-headers', 'Content-Type, X-Admin-Token'))], b""
+        is_admin = request.headers.get('x-admin-token', '') == ADMIN_TOKEN
+
+        if path == '/metrics' and method == 'GET':
+            return 200, [('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')], \
+                self.metrics.render().encode("utf-8")
+        if path == '/api/time' and method == 'GET':
+            code, headers, body = json_reply(*api_handlers.server_time())
+            return code, headers + [('Cache-Control', 'no-store')], body
+        if path == '/api/rooms':
+            if method == 'GET':
+                rooms_info = [room.info() for room in self.rooms.list_rooms()]
+                return json_reply({'rooms': rooms_info, 'total': len(rooms_info)})
+            if method == 'POST':
+                if not is_admin:
+                    return json_reply({}, 403, '无权限：需要主持方令牌')
+                room_id, name = api_handlers.parse_room_request(request.json())
+                room = self.rooms.create_room(room_id, name)
+                if room is None:
+                    return json_reply({}, 400,
+                                      f'创建房间失败：房间ID非法、已存在或已达到最大房间数({self.rooms.max_rooms})')
+                return json_reply(room.info(), 200, '房间已创建')
+        if method == 'DELETE' and path.startswith('/api/rooms/') and '/' not in path[len('/api/rooms/'):]:
+            room_id = path[len('/api/rooms/'):]
+            if not is_admin:
+                return json_reply({}, 403, '无权限：需要主持方令牌')
+            if room_id == DEFAULT_ROOM_ID:
+                return json_reply({}, 400, '默认房间不可关闭')
+            if not self.rooms.close_room(room_id):
+                return json_reply({}, 404, f'房间不存在：{room_id}')
+            return json_reply({'room_id': room_id}, 200, '房间已关闭')
+
+        room_id, rule = self._route_of(path)
+        key = (method, rule)
+        if key not in GAME_ROUTES and key != ('POST', '/api/batch') and \
+                not (method == 'GET' and (rule in CACHED_ROUTES or rule == '/api/game/state')):
+            return json_reply({}, 404, f'接口不存在：{method} {path}')
+        room = self.rooms.get_room(room_id)
+        if room is None:
+            return json_reply({}, 404, f'房间不存在：{room_id}')
+        if key in ADMIN_ROUTES and not is_admin:
+            return json_reply({}, 403, '无权限：需要主持方令牌')
+
+        if key in GAME_ROUTES:
+            try:
+                data = request.query if method == 'GET' else request.json()
+            except ValueError:
+                return json_reply({}, 400, '请求体不是合法的JSON')
+            return json_reply(*GAME_ROUTES[key](room.game, data))
+        if key == ('POST', '/api/batch'):
+            try:
+                data = request.json()
+            except ValueError:
+                return json_reply({}, 400, '请求体不是合法的JSON')
+            return json_reply(*api_handlers.run_batch(room.game, data, is_admin))
+        if rule == '/api/game/state':
+            return json_reply(room.game.snapshot.game_state)
+
+        if rule in LONG_POLL_ROUTES:
+            since = request.arg('since', int)
+            wait = max(0.0, min(request.arg('wait', float, 0.0), MAX_LONG_POLL_WAIT))
+            if since is not None and wait > 0:
+                await room.wait_for_version_change(since, wait)
+        cache_key, build_data = CACHED_ROUTES[rule]
+        entry = room.cached_response(cache_key, build_data)
+        if entry.status_code != 200:
+            return entry.status_code, [('Content-Type', 'application/json')], entry.body
+        headers = [('ETag', f'"{entry.etag}"'), ('Cache-Control', 'no-cache')]
+        if_none_match = request.headers.get('if-none-match', '')
+        if if_none_match and entry.etag in {tag.strip().lstrip('W/').strip('"') for tag in if_none_match.split(',')}:
+            return 304, headers, b""
+        return 200, headers + [('Content-Type', 'application/json')], entry.body
+
+    async def _stream_events(self, request: Request, writer: asyncio.StreamWriter):
+        """游戏事件推送（Server-Sent Events），事件与补发规则同 backend.py /api/events"""
+        room_id, _ = self._route_of(request.path)
+        room = self.rooms.get_room(room_id)
+        if room is None:
+            writer.write(self._serialize(*json_reply({}, 404, f'房间不存在：{room_id}'), keep_alive=False))
+            await writer.drain()
+            return
+        last_event_id = None
+        if 'last-event-id' in request.headers:
+            try:
+                last_event_id = int(request.headers['last-event-id'])
+            except ValueError:
+                pass
+        if last_event_id is None:
+            last_event_id = request.arg('since', int)
+
+        game = room.game
+        subscription, missed = room.events.subscribe(last_event_id)
+        hello = {
+            'version': game.version,
+            'status': game.game_status.value,
+            'round': game.current_round,
+            'resync': missed is None
+        }
+        head = ["HTTP/1.1 200 OK", "Content-Type: text/event-stream; charset=utf-8", "Cache-Control: no-cache",
+                "X-Accel-Buffering: no", "Connection: close"]
+        head.extend(f"{name}: {value}" for name, value in CORS_HEADERS)
+        try:
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+            writer.write(format_sse('hello', hello, None if missed else hello['version']).encode("utf-8"))
+            for version, event_type, data in missed or []:
+                writer.write(format_sse(event_type, data, version).encode("utf-8"))
+            await writer.drain()
+            while True:
+                if subscription.overflowed and subscription.queue.empty():
+                    writer.write(format_sse('resync', {'version': game.version}).encode("utf-8"))
+                    await writer.drain()
+                    return
+                event = await subscription.get(timeout=SSE_HEARTBEAT_INTERVAL)
+                if event is None:
+                    writer.write(b": keepalive\n\n")
+                else:
+                    version, event_type, data = event
+                    writer.write(format_sse(event_type, data, version).encode("utf-8"))
+                await writer.drain()
+        finally:
+            room.events.unsubscribe(subscription)
+
+
+async def serve(host: str, port: int, log_dir: Optional[str], ready: Optional[asyncio.Event] = None):
+    """
+    启动服务器并一直运行
+    :param ready: 开始监听后置位（嵌入其他程序时使用）
+    """
+    game_server = AsyncGameServer(log_dir)
+    server = await asyncio.start_server(game_server.handle_connection, host, port,
+                                        limit=MAX_HEADER_SIZE, backlog=4096)
+    try:
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+    finally:
+        game_server.rooms.close_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="谁是卧底 - 主持方平台（asyncio 单事件循环版本）")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+
+    setup_logging()
+    log_dir = EVENT_LOG_DIR or None
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+    print(f"=" * 50)
+    print(f"谁是卧底 - 主持方平台（asyncio）")
+    print(f"监听: http://{args.host}:{args.port}")
+    print(f"=" * 50)
+    try:
+        asyncio.run(serve(args.host, args.port, log_dir))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -2,25 +2,56 @@
 后端服务器模块
 提供RESTful API接口，处理游戏方的请求
 """
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-from game_logic import GameLogic, GameStatus
-from datetime import datetime
+from rooms import RoomRegistry, DEFAULT_ROOM_ID
+from metrics import UNKNOWN_ROOM, UNMATCHED_ROUTE, ServerMetrics, WSGIMetricsMiddleware
+from shared_state import SharedStore
+from events import format_sse
+from log_setup import setup_logging
+import api_handlers
+import atexit
+import functools
+import logging
 import os
-import threading
 import socket
 
 app = Flask(__name__)
 CORS(app)  # 允许跨域请求
 
+# 结构化日志：后台线程写出，请求线程只入队（LOG_LEVEL、LOG_FILE、LOG_SAMPLE_RATES 见 log_setup.py）
+setup_logging()
+logger = logging.getLogger(__name__)
+
 # 管理员令牌（主持方专用）
 ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "host-secret")
 
-# 全局游戏逻辑实例
-game = GameLogic()
+# 事件日志目录：每个房间的操作追加写入 <目录>/<房间ID>.log，重启时重放恢复对局；设为空字符串关闭持久化
+EVENT_LOG_DIR = os.environ.get("EVENT_LOG_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+if EVENT_LOG_DIR:
+    os.makedirs(EVENT_LOG_DIR, exist_ok=True)
+
+# 多进程共享状态数据库（SQLite）：多工作进程部署时由 wsgi.py 设置，所有工作进程共享房间和游戏状态，
+# 设置后不再使用 EVENT_LOG_DIR；单进程开发服务器不需要
+SHARED_STATE_DB = os.environ.get("SHARED_STATE_DB", "")
+
+# 运行指标（/metrics）：接口耗时、处理中请求数、房间锁等待/持有时间、各组请求数；METRICS_ENABLED=0 关闭
+# 多工作进程部署时每个进程单独统计，/metrics 返回的是处理该请求的工作进程的数据
+metrics = ServerMetrics()
+_metrics_routes = set()  # 指标中使用的路由名（不带房间前缀的路由模板），所有路由注册完后填充
+
+# 房间注册表：每个房间拥有独立的游戏逻辑实例和锁
+if SHARED_STATE_DB:
+    rooms = RoomRegistry(store=SharedStore(SHARED_STATE_DB), metrics=metrics)
+else:
+    rooms = RoomRegistry(log_dir=EVENT_LOG_DIR or None, metrics=metrics)
+atexit.register(rooms.close_all)
 
-# 线程锁，保证线程安全
-game_lock = threading.Lock()
+# 长轮询最长挂起时间（秒）
+MAX_LONG_POLL_WAIT = 30
+
+# 事件流心跳间隔（秒），防止中间代理断开空闲连接
+SSE_HEARTBEAT_INTERVAL = 15
 
 
 def get_local_ip():
@@ -45,340 +76,364 @@ def _admin_forbidden_response():
     return make_response({}, 403, '无权限：需要主持方令牌')
 
 
-def make_response(data=None, code=200, message="ok"):
-    payload = {
+def _build_payload(data=None, code=200, message="ok"):
+    return {
         "code": code,
         "message": message,
         "data": data or {}
     }
-    return jsonify(payload), code
 
 
-@app.route('/api/register', methods=['POST'])
-def register():
+def make_response(data=None, code=200, message="ok"):
+    return jsonify(_build_payload(data, code, message)), code
+
+
+def make_cached_response(room, key, snapshot, build_data):
+    """
+    生成公共读接口的可缓存响应
+    编码好的响应体按 (接口, 快照版本) 缓存在房间里，状态变更时失效；
+    请求携带的 If-None-Match 与 ETag 一致时直接返回 304，不再发送响应体
+    :param room: 房间
+    :param key: 接口标识
+    :param snapshot: 本次请求读取的快照，缓存版本与它一致
+    :param build_data: 构建函数 build_data(snapshot) -> (data, code, message)
+    """
+    def build():
+        data, code, message = build_data(snapshot)
+        body = app.json.dumps(_build_payload(data, code, message), separators=(",", ":")) + "\n"
+        return code, body.encode("utf-8")
+
+    entry = room.responses.get(key, snapshot.version, build)
+    if entry.status_code == 200 and request.if_none_match.contains_weak(entry.etag):
+        response = Response(status=304)
+    else:
+        response = Response(entry.body, status=entry.status_code, mimetype='application/json')
+    if entry.status_code == 200:
+        response.set_etag(entry.etag)
+        response.headers['Cache-Control'] = 'no-cache'  # 允许缓存但每次都要用 ETag 重新验证
+    return response
+
+
+def _long_poll_snapshot(room):
+    """
+    按请求的 since/wait 参数长轮询，返回要响应的快照
+    当状态版本仍等于 since 时挂起请求，直到版本变化或等待超时
+    """
+    game = room.game
+    since = request.args.get('since', type=int)
+    wait = request.args.get('wait', default=0, type=float)
+    wait = max(0.0, min(wait, MAX_LONG_POLL_WAIT))
+
+    snapshot = game.snapshot
+    if since is not None and wait > 0 and snapshot.version == since:
+        # 只等待进程内的变更通知，不获取房间锁（共享存储下房间锁是数据库写锁）
+        room.wait_for_version_change(since, wait)
+        snapshot = game.snapshot
+    return snapshot
+
+
+def _metrics_route(path):
+    """
+    指标中的 (房间ID, 路由名)：按请求路径换算，房间作用域路径去掉房间前缀，不是已注册路由的路径统一为 unmatched，
+    不存在的房间统一为 unknown（任意请求路径都不会产生新的标签值）
+    只做字符串处理和一次房间字典查找，不经过 Flask 的路由匹配
+    """
+    room_id = DEFAULT_ROOM_ID
+    if path.startswith('/api/rooms/'):
+        room_id, slash, rest = path[len('/api/rooms/'):].partition('/')
+        path = '/api/' + rest if slash else '/api/rooms/<room_id>'
+        if rooms.get_room(room_id) is None:
+            room_id = UNKNOWN_ROOM
+    return room_id, path if path in _metrics_routes else UNMATCHED_ROUTE
+
+
+def room_route(rule, **options):
+    """
+    注册房间作用域路由
+    同一个视图同时挂在 /api/<rule> （默认房间）和 /api/rooms/<room_id>/<rule> 上，
+    视图函数接收解析好的 Room 对象
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(room_id=DEFAULT_ROOM_ID):
+            rooms.refresh()  # 多进程共享状态下先同步其他工作进程的变更，保证读到自己刚写入的结果
+            room = rooms.get_room(room_id)
+            if room is None:
+                return make_response({}, 404, f'房间不存在：{room_id}')
+            return func(room)
+
+        app.add_url_rule(rule, view_func=wrapper, **options)
+        app.add_url_rule('/api/rooms/<room_id>' + rule[len('/api'):], view_func=wrapper, **options)
+        return wrapper
+    return decorator
+
+
+@app.route('/api/rooms', methods=['POST'])
+def create_room():
+    """创建房间接口（主持方调用）"""
+    if not _require_admin():
+        return _admin_forbidden_response()
+    room_id, name = api_handlers.parse_room_request(request.json)
+
+    room = rooms.create_room(room_id, name)
+    if room is None:
+        return make_response({}, 400, f'创建房间失败：房间ID非法、已存在或已达到最大房间数({rooms.max_rooms})')
+    return make_response(room.info(), 200, '房间已创建')
+
+
+@app.route('/api/rooms', methods=['GET'])
+def list_rooms():
+    """获取所有房间接口"""
+    rooms.refresh()
+    rooms_info = [room.info() for room in rooms.list_rooms()]
+    return make_response({
+        'rooms': rooms_info,
+        'total': len(rooms_info)
+    })
+
+
+@app.route('/api/rooms/<room_id>', methods=['DELETE'])
+def close_room(room_id):
+    """关闭房间接口（主持方调用）"""
+    if not _require_admin():
+        return _admin_forbidden_response()
+    if room_id == DEFAULT_ROOM_ID:
+        return make_response({}, 400, '默认房间不可关闭')
+    if not rooms.close_room(room_id):
+        return make_response({}, 404, f'房间不存在：{room_id}')
+    return make_response({'room_id': room_id}, 200, '房间已关闭')
+
+
+@app.route('/api/time', methods=['GET'])
+def server_time():
+    """
+    时间同步接口：返回服务器当前时间戳，不缓存
+    /api/status 中的 deadline、describe_deadlines 都是服务器时间戳，游戏方用往返时间的中点估算时钟偏差后换算成本机时间
+    """
+    response, code = make_response(*api_handlers.server_time())
+    response.headers['Cache-Control'] = 'no-store'
+    return response, code
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """运行指标接口（Prometheus 文本格式）"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+@room_route('/api/register', methods=['POST'])
+def register(room):
     """游戏方注册接口"""
-    data = request.json
-    group_name = data.get('group_name') or data.get('group_id', '')
-    group_name = group_name.strip() if isinstance(group_name, str) else ''
-    
-    if not group_name:
-        return make_response({}, 400, '组名不能为空')
-    
-    with game_lock:
-        success = game.register_group(group_name)
-        if success:
-            return make_response({
-                'group_name': group_name,
-                'total_groups': len(game.groups)
-            }, 200, '注册成功')
-        else:
-            return make_response({}, 400, '注册失败：组名已存在或已达到最大组数(5组)')
-
-
-@app.route('/api/game/start', methods=['POST'])
-def start_game():
+    with room.lock:
+        return make_response(*api_handlers.register(room.game, request.json))
+
+
+@room_route('/api/game/start', methods=['POST'])
+def start_game(room):
     """开始游戏接口（主持方调用）"""
     if not _require_admin():
         return _admin_forbidden_response()
-    data = request.json
-    undercover_word = data.get('undercover_word', '').strip()
-    civilian_word = data.get('civilian_word', '').strip()
-    
-    if not undercover_word or not civilian_word:
-        return make_response({}, 400, '词语不能为空')
-    
-    with game_lock:
-        success = game.start_game(undercover_word, civilian_word)
-        if success:
-            return make_response({
-                'undercover_group': game.undercover_group,
-                'groups': {name: info['role'] for name, info in game.groups.items()}
-            }, 200, '游戏已开始')
-        else:
-            return make_response({}, 400, '无法开始游戏：游戏状态不正确或没有注册的组')
-
-
-@app.route('/api/game/round/start', methods=['POST'])
-def start_round():
+    with room.lock:
+        return make_response(*api_handlers.start_game(room.game, request.json))
+
+
+@room_route('/api/game/round/start', methods=['POST'])
+def start_round(room):
     """开始新回合接口（主持方调用）"""
     if not _require_admin():
         return _admin_forbidden_response()
-    with game_lock:
-        order = game.start_round()
-        if order:
-            return make_response({
-                'round': game.current_round,
-                'order': order
-            }, 200, '回合已开始')
-        else:
-            return make_response({}, 400, '无法开始回合：游戏状态不正确或活跃组数不足')
-
-
-@app.route('/api/describe', methods=['POST'])
-def submit_description():
+    with room.lock:
+        return make_response(*api_handlers.start_round(room.game))
+
+
+@room_route('/api/describe', methods=['POST'])
+def submit_description(room):
     """提交描述接口（游戏方调用）"""
-    data = request.json
-    group_name = data.get('group_name', '').strip()
-    description = data.get('description', '').strip()
-    
-    if not group_name or not description:
-        return make_response({}, 400, '组名和描述不能为空')
-    
-    with game_lock:
-        success = game.submit_description(group_name, description)
-        if success:
-            # 获取当前描述列表
-            current_descriptions = game.descriptions.get(game.current_round, [])
-            return make_response({
-                'round': game.current_round,
-                'total_descriptions': len(current_descriptions)
-            }, 200, '描述提交成功')
-        else:
-            # 检查具体失败原因
-            if game.game_status != GameStatus.DESCRIBING:
-                return make_response({}, 400, '描述提交失败：当前不在描述阶段')
-            if group_name in [d['group'] for d in game.descriptions.get(game.current_round, [])]:
-                return make_response({}, 400, '描述提交失败：已提交过描述')
-            # 可能是超时
-            return make_response({}, 400, '描述提交失败：已超时（3秒限制）、组名无效或游戏状态不正确')
-
-
-@app.route('/api/vote', methods=['POST'])
-def submit_vote():
+    with room.lock:
+        return make_response(*api_handlers.submit_description(room.game, request.json))
+
+
+@room_route('/api/vote', methods=['POST'])
+def submit_vote(room):
     """提交投票接口（游戏方调用）"""
-    try:
-        data = request.json
-        print(f"[投票请求] 收到投票请求: {data}")  # 调试日志
-        if not data:
-            print("[投票请求] 错误: 请求数据为空")
-            return make_response({}, 400, '请求数据为空')
-        
-        voter_group = data.get('voter_group', '').strip()
-        target_group = data.get('target_group', '').strip()
-        
-        print(f"[投票请求] 投票者: {voter_group}, 目标: {target_group}")
-        
-        if not voter_group or not target_group:
-            print("[投票请求] 错误: 投票者和被投票者不能为空")
-            return make_response({}, 400, '投票者和被投票者不能为空')
-        
-        with game_lock:
-            # 防御性检查：确保game对象和关键属性存在
-            if game is None:
-                return make_response({}, 500, '投票提交失败：游戏对象未初始化')
-            if not hasattr(game, 'groups') or game.groups is None:
-                return make_response({}, 500, '投票提交失败：游戏组数据未初始化')
-            if not hasattr(game, 'eliminated_groups') or not isinstance(game.eliminated_groups, list):
-                return make_response({}, 500, '投票提交失败：淘汰组数据异常')
-            if not hasattr(game, 'votes') or game.votes is None:
-                return make_response({}, 500, '投票提交失败：投票数据未初始化')
-            if not hasattr(game, 'current_round') or game.current_round is None:
-                return make_response({}, 500, '投票提交失败：当前回合数异常')
-            
-            # 确保current_round是有效的整数
-            if not isinstance(game.current_round, int) or game.current_round < 0:
-                return make_response({}, 500, f'投票提交失败：当前回合数无效（{game.current_round}）')
-            
-            # 先检查游戏状态，如果不是投票阶段，尝试自动转换
-            if game.game_status == GameStatus.DESCRIBING:
-                # 检查是否应该自动进入投票阶段
-                if not hasattr(game, 'describe_order') or game.describe_order is None:
-                    game.describe_order = []
-                active_groups_in_order = [g for g in game.describe_order if g not in game.eliminated_groups]
-                submitted_count = len(game.descriptions.get(game.current_round, []))
-                if submitted_count >= len(active_groups_in_order):
-                    game.game_status = GameStatus.VOTING
-                elif game.round_start_time:
-                    try:
-                        elapsed_time = (datetime.now() - game.round_start_time).total_seconds()
-                        max_time = len(active_groups_in_order) * game.description_timeout
-                        if elapsed_time > max_time:
-                            game.game_status = GameStatus.VOTING
-                    except Exception as e:
-                        # 时间计算出错，记录但不影响流程
-                        print(f"时间计算错误: {e}")
-            
-            # 详细检查失败原因（在调用submit_vote之前）
-            if game.game_status != GameStatus.VOTING:
-                return make_response({}, 400, '投票提交失败：当前不在投票阶段（状态：' + game.game_status.value + '）')
-            
-            # 确保当前回合的投票字典存在
-            if game.current_round not in game.votes:
-                game.votes[game.current_round] = {}
-            
-            # 检查是否已经投过票了
-            current_round_votes = game.votes.get(game.current_round, {})
-            print(f"[投票请求] 当前回合: {game.current_round}, 已投票记录: {current_round_votes}")
-            if voter_group in current_round_votes:
-                print(f"[投票请求] 错误: {voter_group} 已投过票，目标: {current_round_votes.get(voter_group)}")
-                return make_response({}, 400, '投票提交失败：已投过票')
-            if voter_group == target_group:
-                return make_response({}, 400, '投票提交失败：不能投自己')
-            if voter_group in game.eliminated_groups:
-                return make_response({}, 400, '投票提交失败：投票者已淘汰')
-            if target_group in game.eliminated_groups:
-                return make_response({}, 400, '投票提交失败：被投票者已淘汰')
-            if voter_group not in game.groups:
-                return make_response({}, 400, f'投票提交失败：投票者组名无效（注册的组：{list(game.groups.keys())}）')
-            if target_group not in game.groups:
-                return make_response({}, 400, f'投票提交失败：目标组名无效（注册的组：{list(game.groups.keys())}）')
-            active_groups = [g for g in game.groups.keys() if g not in game.eliminated_groups]
-            if target_group not in active_groups:
-                return make_response({}, 400, f'投票提交失败：目标组不在存活组中（存活组：{active_groups}，目标：{target_group}）')
-            
-            # 所有检查都通过，调用submit_vote
-            success = game.submit_vote(voter_group, target_group)
-            if success:
-                print(f"[投票请求] 成功: {voter_group} 投票给 {target_group}")
-                return make_response({}, 200, '投票提交成功')
-            else:
-                # 如果submit_vote返回False，但前面的检查都通过了，说明有内部逻辑问题
-                print(f"[投票请求] 错误: submit_vote返回False，但前面的检查都通过了")
-                return make_response({}, 400, f'投票提交失败：内部逻辑错误（请检查游戏状态和投票记录）')
-    except KeyError as e:
-        # 处理KeyError异常
-        import traceback
-        error_detail = f"KeyError: {str(e)}"
-        traceback.print_exc()
-        return make_response({}, 500, f'投票提交失败：数据访问错误 - {error_detail}')
-    except AttributeError as e:
-        # 处理AttributeError异常
-        import traceback
-        error_detail = f"AttributeError: {str(e)}"
-        traceback.print_exc()
-        return make_response({}, 500, f'投票提交失败：属性访问错误 - {error_detail}')
-    except Exception as e:
-        # 捕获所有其他异常，避免500错误
-        import traceback
-        error_detail = f"{type(e).__name__}: {str(e)}"
-        traceback.print_exc()
-        return make_response({}, 500, f'投票提交失败：服务器内部错误 - {error_detail}')
-
-
-@app.route('/api/game/voting/process', methods=['POST'])
-def process_voting():
+    data = request.get_json(silent=True)
+    with room.lock:
+        return make_response(*api_handlers.submit_vote(room.game, data))
+
+
+@room_route('/api/game/voting/process', methods=['POST'])
+def process_voting(room):
     """处理投票结果接口（主持方调用）"""
     if not _require_admin():
         return _admin_forbidden_response()
-    with game_lock:
-        result = game.process_voting_result()
-        if 'error' in result:
-            return make_response(result, 400, result.get('error', '投票处理失败'))
-        return make_response(result, 200, '投票结果已生成')
+    with room.lock:
+        return make_response(*api_handlers.process_voting(room.game))
 
 
-@app.route('/api/game/state', methods=['GET'])
-def get_game_state():
-    """获取游戏状态接口"""
+@room_route('/api/game/settings', methods=['GET'])
+def get_settings(room):
+    """获取房间设置接口（主持方调用）"""
     if not _require_admin():
         return _admin_forbidden_response()
-    with game_lock:
-        state = game.get_game_state()
-        return make_response(state)
+    with room.lock:
+        return make_response(*api_handlers.get_settings(room.game))
 
 
-@app.route('/api/status', methods=['GET'])
-def public_status():
-    """游戏方公共状态接口"""
-    with game_lock:
-        status = game.get_public_status()
-        return make_response(status)
+@room_route('/api/game/settings', methods=['POST'])
+def update_settings(room):
+    """更新房间设置接口（主持方调用）"""
+    if not _require_admin():
+        return _admin_forbidden_response()
+    with room.lock:
+        return make_response(*api_handlers.update_settings(room.game, request.json))
+
 
+@room_route('/api/batch', methods=['POST'])
+def batch(room):
+    """
+    批量操作接口：按顺序执行多个操作，只获取一次房间锁
+    请求体 {"ops": [{"op": "register", "data": {"group_name": "A"}}, ...], "atomic": false}，
+    atomic 为 true 时全部成功才生效；需要主持方令牌的操作（开始游戏等）要在请求头带上令牌
+    """
+    data = request.get_json(silent=True)
+    is_admin = _require_admin()
+    with room.lock:
+        return make_response(*api_handlers.run_batch(room.game, data, is_admin))
 
-@app.route('/api/result', methods=['GET'])
-def public_result():
+
+@room_route('/api/game/state', methods=['GET'])
+def get_game_state(room):
+    """获取游戏状态接口"""
+    game = room.game
+    if not _require_admin():
+        return _admin_forbidden_response()
+    # 读取已发布的快照，无需获取房间锁
+    return make_response(game.snapshot.game_state)
+
+
+@room_route('/api/status', methods=['GET'])
+def public_status(room):
+    """
+    游戏方公共状态接口
+    支持长轮询：/api/status?since=<version>&wait=<秒>
+    当状态版本仍等于 since 时挂起请求，直到版本变化或等待超时后返回最新状态
+    """
+    return make_cached_response(room, 'status', _long_poll_snapshot(room), api_handlers.status_view)
+
+
+@room_route('/api/round/view', methods=['GET'])
+def round_view(room):
+    """
+    游戏方回合视图接口：状态、描述顺序、本回合描述、淘汰列表和最近一次投票结果，一次请求取自同一个快照
+    与 /api/status 一样支持长轮询：/api/round/view?since=<version>&wait=<秒>
+    """
+    return make_cached_response(room, 'round_view', _long_poll_snapshot(room), api_handlers.round_view)
+
+
+@room_route('/api/events', methods=['GET'])
+def event_stream(room):
+    """
+    游戏事件推送接口（Server-Sent Events）
+    连接建立后先推送 hello 事件（当前版本、阶段、回合），之后按发生顺序推送类型化事件：
+    group_registered / status / round_started / describe_turn / description / describe_timeout /
+    vote / votes_complete / vote_result / report / reset
+    事件 id 即状态版本号，断线重连时浏览器会带上 Last-Event-ID 补发期间错过的事件
+    """
+    game = room.game
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    if last_event_id is None:
+        last_event_id = request.args.get('since', type=int)
+
+    with room.lock:
+        subscription, missed = room.events.subscribe(last_event_id)
+        hello = {
+            'version': game.version,
+            'status': game.game_status.value,
+            'round': game.current_round,
+            'resync': missed is None
+        }
+
+    def generate():
+        try:
+            # 需要补发事件时 hello 不带 id，由补发的事件推进客户端的 Last-Event-ID
+            yield format_sse('hello', hello, None if missed else hello['version'])
+            for version, event_type, data in missed or []:
+                yield format_sse(event_type, data, version)
+            while True:
+                if subscription.overflowed and subscription.queue.empty():
+                    # 订阅者消费太慢，通知客户端重新拉取完整状态后断开
+                    yield format_sse('resync', {'version': game.version})
+                    return
+                event = subscription.get(timeout=SSE_HEARTBEAT_INTERVAL)
+                if event is None:
+                    yield ': keepalive\n\n'
+                    continue
+                version, event_type, data = event
+                yield format_sse(event_type, data, version)
+        finally:
+            room.events.unsubscribe(subscription)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+@room_route('/api/result', methods=['GET'])
+def public_result(room):
     """最近一次投票结果"""
-    with game_lock:
-        result = game.get_last_result()
-        if not result:
-            return make_response({}, 404, '当前暂无投票结果')
-        return make_response(result)
+    return make_cached_response(room, 'result', room.game.snapshot, api_handlers.result_view)
 
 
-@app.route('/api/descriptions', methods=['GET'])
-def get_descriptions():
+@room_route('/api/descriptions', methods=['GET'])
+def get_descriptions(room):
     """获取当前回合的所有描述（游戏方调用）"""
-    with game_lock:
-        descriptions = game.get_current_round_descriptions()
-        return make_response({
-            'round': game.current_round,
-            'descriptions': descriptions
-        })
+    return make_cached_response(room, 'descriptions', room.game.snapshot, api_handlers.descriptions_view)
 
 
-@app.route('/api/word', methods=['GET'])
-def get_word():
+@room_route('/api/word', methods=['GET'])
+def get_word(room):
     """获取词语接口（游戏方调用，仅返回自己的词语）"""
-    group_name = request.args.get('group_name', '').strip()
-    
-    if not group_name:
-        return make_response({}, 400, '组名不能为空')
-    
-    with game_lock:
-        word = game.get_group_word(group_name)
-        if word:
-            return make_response({'word': word})
-        else:
-            return make_response({}, 404, '未找到该组的词语或游戏未开始')
+    with room.lock:
+        return make_response(*api_handlers.get_word(room.game, request.args))
 
 
-@app.route('/api/game/reset', methods=['POST'])
-def reset_game():
+@room_route('/api/game/reset', methods=['POST'])
+def reset_game(room):
     """重置游戏接口（主持方调用）"""
     if not _require_admin():
         return _admin_forbidden_response()
-    with game_lock:
-        game.reset_game()
-        return make_response({}, 200, '游戏已重置')
+    with room.lock:
+        return make_response(*api_handlers.reset_game(room.game))
 
 
-@app.route('/api/report', methods=['POST'])
-def report_issue():
+@room_route('/api/report', methods=['POST'])
+def report_issue(room):
     """异常上报接口（游戏方调用）"""
-    data = request.json or {}
-    group_name = data.get('group_name') or data.get('group_id', '')
-    group_name = group_name.strip() if isinstance(group_name, str) else ''
-    report_type = data.get('type', 'general').strip() or 'general'
-    detail = data.get('detail', '').strip()
-
-    if not detail:
-        return make_response({}, 400, 'detail不能为空')
+    with room.lock:
+        return make_response(*api_handlers.report_issue(room.game, request.json))
 
-    with game_lock:
-        report_entry = game.add_report(group_name, report_type, detail)
-
-    return make_response({
-        'ticket': report_entry['ticket'],
-        'recorded_at': report_entry['time']
-    }, 200, '异常已记录')
 
-
-@app.route('/api/groups', methods=['GET'])
-def get_groups():
+@room_route('/api/groups', methods=['GET'])
+def get_groups(room):
     """获取所有注册的组接口"""
-    with game_lock:
-        groups_info = []
-        for name, info in game.groups.items():
-            groups_info.append({
-                'name': name,
-                'registered_time': info['registered_time'],
-                'eliminated': name in game.eliminated_groups
-            })
-        return make_response({
-            'groups': groups_info,
-            'total': len(groups_info)
-        })
+    return make_cached_response(room, 'groups', room.game.snapshot, api_handlers.groups_view)
 
 
 @app.errorhandler(Exception)
 def handle_exception(e):
     """全局异常处理"""
-    import traceback
     error_detail = f"{type(e).__name__}: {str(e)}"
-    traceback.print_exc()
+    logger.exception("请求处理异常", extra={"fields": {"method": request.method, "path": request.path}})
     return make_response({}, 500, f'服务器内部错误 - {error_detail}')
 
 
+_metrics_routes.update(rule.rule for rule in app.url_map.iter_rules() if '<' not in rule.rule)
+_metrics_routes.add('/api/rooms/<room_id>')
+if metrics.enabled:
+    app.wsgi_app = WSGIMetricsMiddleware(app.wsgi_app, metrics, _metrics_route)
+
+
 if __name__ == '__main__':
     local_ip = get_local_ip()
     print(f"=" * 50)
@@ -392,5 +447,6 @@ if __name__ == '__main__':
     print(f"=" * 50)
     
     # 运行服务器，允许局域网访问
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # 关闭自动重载：重载器的父进程也会导入本模块，两个进程会重放同一份事件日志、各自启动调度线程并向日志追加记录
+    app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
 
@@ -0,0 +1,221 @@
+"""
+长轮询并发基准测试：asyncio 单事件循环后端 vs 多线程 Flask 后端
+N 个客户端各自保持一个连接，循环发起 /api/status?since=<版本>&wait=<秒> 长轮询；
+一个写入方每隔固定时间提交一次异常上报（改变状态版本），测量：
+  唤醒延迟 - 写请求发出到每个轮询客户端收到新版本的时间（p50/p99）
+  完成轮询 - 每秒完成的长轮询数（理想值 = 轮询数 × 写入频率）
+  错误     - 连接失败、超时或非200响应
+  内存/线程 - 服务器进程的常驻内存和线程数（挂起的轮询在 Flask 中各占一个线程）
+
+被测服务器：
+  async - python async_backend.py
+  flask - python backend.py 同样的 Werkzeug 开发服务器（threaded=True，不启用自动重载）
+
+运行方式（在 平台方 目录下）：
+    python benchmarks/bench_async_pollers.py --pollers 10,100,1000 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FLASK_SERVER = ("from backend import app; "
+                "app.run(host='127.0.0.1', port={port}, debug=True, use_reloader=False, threaded=True)")
+
+# 轮询请求的挂起时间（秒），大于写入间隔，正常情况下每次轮询都由写入唤醒
+POLL_WAIT = 10
+
+
+def start_server(kind: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, EVENT_LOG_DIR="")
+    if kind == "async":
+        cmd = [sys.executable, "async_backend.py", "--host", "127.0.0.1", "--port", str(port)]
+    else:
+        cmd = [sys.executable, "-c", FLASK_SERVER.format(port=port)]
+    process = subprocess.Popen(cmd, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            asyncio.run(_probe(port))
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{kind} 服务器启动失败")
+
+
+async def _probe(port: int):
+    connection = HTTPConnection("127.0.0.1", port)
+    try:
+        await connection.request("GET", "/api/status")
+    finally:
+        connection.close()
+
+
+def process_stats(pid: int) -> Tuple[float, int]:
+    """进程常驻内存（MB）和线程数，读取 /proc（非 Linux 返回 0）"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            fields = dict(line.split(":", 1) for line in f)
+        return int(fields["VmRSS"].split()[0]) / 1024, int(fields["Threads"])
+    except (OSError, KeyError, ValueError):
+        return 0.0, 0
+
+
+class HTTPConnection:
+    """最小的 HTTP/1.1 保持连接客户端，只支持带 Content-Length 的响应"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, body: bytes = b"") -> Tuple[int, bytes]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+        if body:
+            head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        self._writer.write((head + "\r\n").encode("latin-1") + body)
+        await self._writer.drain()
+        status_line = await self._reader.readuntil(b"\r\n")
+        headers = await self._reader.readuntil(b"\r\n\r\n")
+        length = 0
+        close = False
+        for line in headers.split(b"\r\n"):
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            if name == b"content-length":
+                length = int(value)
+            elif name == b"connection" and value.strip().lower() == b"close":
+                close = True
+        data = await self._reader.readexactly(length) if length else b""
+        if close or status_line.startswith(b"HTTP/1.0"):
+            self.close()
+        return int(status_line.split()[1]), data
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def parse_version(body: bytes) -> int:
+    """从 /api/status 响应中取出版本号（避免完整 JSON 解码拖慢客户端）"""
+    start = body.index(b'"version":') + len(b'"version":')
+    end = start
+    while body[end:end + 1].isdigit():
+        end += 1
+    return int(body[start:end])
+
+
+async def run_pollers(port: int, pollers: int, duration: float, write_interval: float, pid: int) -> dict:
+    write_times: List[Tuple[int, float]] = []  # (写入序号, 发出时间)
+    wake_latencies: List[float] = []
+    errors = [0]
+    completed = [0]
+    stop = asyncio.Event()
+
+    async def poller():
+        connection = HTTPConnection("127.0.0.1", port)
+        version = None
+        while not stop.is_set():
+            try:
+                if version is None:
+                    status, body = await connection.request("GET", "/api/status")
+                else:
+                    status, body = await asyncio.wait_for(
+                        connection.request("GET", f"/api/status?since={version}&wait={POLL_WAIT}"), POLL_WAIT + 10)
+                received = time.perf_counter()
+                if status != 200:
+                    errors[0] += 1
+                    continue
+                new_version = parse_version(body)
+                if version is not None and new_version != version and write_times:
+                    completed[0] += 1
+                    wake_latencies.append(received - write_times[-1][1])
+                version = new_version
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                errors[0] += 1
+                connection.close()
+                await asyncio.sleep(0.1)
+        connection.close()
+
+    async def writer():
+        connection = HTTPConnection("127.0.0.1", port)
+        index = 0
+        while not stop.is_set():
+            await asyncio.sleep(write_interval)
+            write_times.append((index, time.perf_counter()))
+            body = f'{{"group_name":"bench","type":"bench","detail":"write {index}"}}'.encode()
+            try:
+                await connection.request("POST", "/api/report", body)
+            except (OSError, asyncio.IncompleteReadError):
+                errors[0] += 1
+                connection.close()
+            index += 1
+        connection.close()
+
+    tasks = [asyncio.create_task(poller()) for _ in range(pollers)]
+    await asyncio.sleep(min(2.0, 0.5 + pollers / 500))  # 等待连接建立、进入挂起状态
+    rss_mb, threads = process_stats(pid)
+    wake_latencies.clear()
+    completed[0] = 0
+    errors[0] = 0
+    writer_task = asyncio.create_task(writer())
+    await asyncio.sleep(duration)
+    stop.set()
+    writes = len(write_times)
+    measured = list(wake_latencies)
+    for task in tasks + [writer_task]:
+        task.cancel()
+    await asyncio.gather(*tasks, writer_task, return_exceptions=True)
+
+    measured.sort()
+    return {
+        "writes": writes,
+        "wakes_per_sec": completed[0] / duration,
+        "p50_ms": measured[len(measured) // 2] * 1000 if measured else 0,
+        "p99_ms": measured[int(len(measured) * 0.99)] * 1000 if measured else 0,
+        "errors": errors[0],
+        "rss_mb": rss_mb,
+        "threads": threads
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="长轮询并发基准测试：asyncio 后端 vs 多线程 Flask 后端")
+    parser.add_argument("--pollers", default="10,100,1000", help="并发轮询客户端数，逗号分隔")
+    parser.add_argument("--duration", type=float, default=10.0, help="每项测试的秒数")
+    parser.add_argument("--write-interval", type=float, default=0.5, help="写入间隔（秒）")
+    parser.add_argument("--servers", default="async,flask", help="被测服务器，逗号分隔")
+    args = parser.parse_args()
+
+    print(f"时长: {args.duration}s  写入间隔: {args.write_interval}s  轮询挂起: {POLL_WAIT}s")
+    print(f"{'服务器':<8}{'轮询数':>8}{'写入':>6}{'唤醒/秒':>10}{'p50(ms)':>10}{'p99(ms)':>10}"
+          f"{'错误':>6}{'内存(MB)':>10}{'线程':>6}")
+    for index, kind in enumerate(args.servers.split(",")):
+        for pollers in (int(value) for value in args.pollers.split(",")):
+            port = 5290 + index
+            server = start_server(kind, port)
+            try:
+                result = asyncio.run(run_pollers(port, pollers, args.duration, args.write_interval, server.pid))
+                print(f"{kind:<8}{pollers:>8}{result['writes']:>6}{result['wakes_per_sec']:>10,.0f}"
+                      f"{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['errors']:>6}"
+                      f"{result['rss_mb']:>10.1f}{result['threads']:>6}")
+            finally:
+                server.terminate()
+                try:
+                    server.wait(10)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+
+
+if __name__ == '__main__':
+    main()
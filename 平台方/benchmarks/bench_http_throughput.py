@@ -0,0 +1,141 @@
+"""
+HTTP 吞吐基准测试：开发服务器 vs 多工作进程生产部署
+分别启动被测服务器，用多个客户端进程（每个进程多个保持连接的线程）压测：
+  read  - 只读：GET /api/status
+  mixed - 读写混合：90% GET /api/status、/api/descriptions，10% POST /api/game/settings（写操作，走房间锁和状态记录）
+
+被测服务器：
+  dev      - python backend.py 同样的 Werkzeug 开发服务器（debug=True，不启用自动重载）
+  gunicorn - gunicorn -c gunicorn.conf.py wsgi:app（SQLite 共享状态）
+
+运行方式（在 平台方 目录下，需要安装 gunicorn）：
+    python benchmarks/bench_http_throughput.py --duration 5 --clients 4 --threads 8 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADMIN_HEADERS = {'X-Admin-Token': os.environ.get("ADMIN_TOKEN", "host-secret")}
+
+DEV_SERVER = ("from backend import app; "
+              "app.run(host='127.0.0.1', port={port}, debug=True, use_reloader=False, threaded=True)")
+
+
+def start_server(kind: str, port: int, workers: int, data_dir: str) -> subprocess.Popen:
+    env = dict(os.environ, EVENT_LOG_DIR=data_dir)
+    if kind == "dev":
+        cmd = [sys.executable, "-c", DEV_SERVER.format(port=port)]
+    else:
+        env.update(SHARED_STATE_DB=os.path.join(data_dir, "state.sqlite3"), WORKERS=str(workers),
+                   BIND=f"127.0.0.1:{port}")
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"]
+    process = subprocess.Popen(cmd, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            requests.get(base_url + "/api/status", timeout=1)
+            return process
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{kind} 服务器启动失败")
+
+
+def client_process(base_url: str, mode: str, threads: int, duration: float, queue):
+    """一个客户端进程：多个线程各自用保持连接的会话循环请求"""
+    results = [None] * threads
+
+    def worker(index):
+        session = requests.Session()
+        latencies = []
+        errors = 0
+        count = 0
+        end = time.perf_counter() + duration
+        while time.perf_counter() < end:
+            start = time.perf_counter()
+            try:
+                if mode == "mixed" and count % 10 == 9:
+                    response = session.post(base_url + "/api/game/settings", headers=ADMIN_HEADERS,
+                                            json={"next_round_delay": count % 7})
+                elif mode == "mixed" and count % 2:
+                    response = session.get(base_url + "/api/descriptions")
+                else:
+                    response = session.get(base_url + "/api/status")
+                if response.status_code != 200:
+                    errors += 1
+            except requests.exceptions.RequestException:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+            count += 1
+        results[index] = (latencies, errors)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    latencies = [sample for samples, _ in results for sample in samples]
+    queue.put((latencies, sum(errors for _, errors in results)))
+
+
+def run_load(base_url: str, mode: str, clients: int, threads: int, duration: float) -> dict:
+    queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=client_process, args=(base_url, mode, threads, duration, queue))
+                 for _ in range(clients)]
+    for process in processes:
+        process.start()
+    latencies, errors = [], 0
+    for _ in processes:
+        samples, process_errors = queue.get()
+        latencies.extend(samples)
+        errors += process_errors
+    for process in processes:
+        process.join()
+    latencies.sort()
+    return {
+        "requests_per_sec": len(latencies) / duration,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0,
+        "errors": errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP 吞吐基准测试：开发服务器 vs gunicorn")
+    parser.add_argument("--duration", type=float, default=5.0, help="每项测试的秒数")
+    parser.add_argument("--clients", type=int, default=4, help="客户端进程数")
+    parser.add_argument("--threads", type=int, default=8, help="每个客户端进程的线程数（并发连接数）")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn 工作进程数")
+    parser.add_argument("--servers", default="dev,gunicorn", help="被测服务器，逗号分隔")
+    args = parser.parse_args()
+
+    print(f"并发连接: {args.clients * args.threads}  时长: {args.duration}s  gunicorn 工作进程: {args.workers}")
+    print(f"{'服务器':<12}{'场景':<8}{'请求/秒':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'错误':>8}")
+    for index, kind in enumerate(args.servers.split(",")):
+        port = 5190 + index
+        with tempfile.TemporaryDirectory() as data_dir:
+            server = start_server(kind, port, args.workers, data_dir)
+            try:
+                for mode in ("read", "mixed"):
+                    result = run_load(f"http://127.0.0.1:{port}", mode, args.clients, args.threads, args.duration)
+                    print(f"{kind:<12}{mode:<8}{result['requests_per_sec']:>10,.0f}{result['p50_ms']:>10.2f}"
+                          f"{result['p99_ms']:>10.2f}{result['errors']:>8}")
+            finally:
+                server.terminate()
+                try:
+                    server.wait(10)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+
+
+if __name__ == '__main__':
+    main()
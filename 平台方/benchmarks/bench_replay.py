@@ -0,0 +1,91 @@
+"""
+事件日志重放基准测试
+先用 GameLogic 生成指定数量的操作记录写入临时日志，再测量启动时读取并重放日志的耗时：
+  games   - 反复进行完整对局（注册/开始/描述/投票/结算/重置），重放时从最后一次重置开始
+  full    - 同样的日志，但强制从头重放所有记录（最坏情况：日志中没有可以跳过的重置）
+  reports - 一局中不断追加异常上报，没有重置可以跳过，状态随记录数增长
+另外测量对局场景的写入吞吐（包含游戏逻辑本身；每条记录一次 os.write，后台批量 fsync）
+
+运行方式（在 平台方 目录下）：
+    python benchmarks/bench_replay.py --events 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_store import EventLog, load_log  # noqa: E402
+from game_logic import GameLogic  # noqa: E402
+from bench_snapshot_reads import GROUPS, write_step  # noqa: E402
+
+
+def generate(path: str, scenario: str, events: int) -> float:
+    """生成日志，返回写入耗时（秒）"""
+    log = EventLog(path, header={"op": "room", "room_id": "bench", "name": "bench"})
+    count = [0]
+
+    def journal(record):
+        log.append(record)
+        count[0] += 1
+
+    # 固定时钟：描述窗口永不超时
+    game = GameLogic(clock=lambda: 0.0)
+    game.set_journal(journal)
+    start = time.perf_counter()
+    if scenario == "reports":
+        # 直接写记录：每次上报都会复制整个上报列表构建快照，通过游戏逻辑生成十万条太慢
+        for name in GROUPS:
+            game.register_group(name)
+        while count[0] < events:
+            index = count[0]
+            journal({"op": "report", "t": time.time(), "group": GROUPS[index % len(GROUPS)], "type": "bench",
+                     "detail": "基准测试上报", "ticket": f"RPT-BENCH-{index:06d}", "time": "2025-01-01T00:00:00"})
+    else:
+        while count[0] < events:
+            write_step(game)
+    elapsed = time.perf_counter() - start
+    log.close()
+    return elapsed
+
+
+def replay(path: str, since_last_reset: bool) -> dict:
+    start = time.perf_counter()
+    _, records = load_log(path, since_last_reset)
+    loaded = time.perf_counter()
+    game = GameLogic(clock=lambda: 0.0)
+    replayed = game.replay(records)
+    done = time.perf_counter()
+    return {
+        "records": replayed,
+        "load_ms": (loaded - start) * 1000,
+        "replay_ms": (done - loaded) * 1000,
+        "total_ms": (done - start) * 1000,
+        "status": game.game_status.value
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="事件日志重放基准测试")
+    parser.add_argument("--events", type=int, default=100000, help="生成的记录数")
+    args = parser.parse_args()
+
+    print(f"记录数: {args.events:,}")
+    print(f"{'场景':<10}{'文件(MB)':>10}{'写入/秒':>12}{'重放记录':>10}{'读取(ms)':>10}{'重放(ms)':>10}"
+          f"{'合计(ms)':>10}{'重放/秒':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scenario in ("games", "full", "reports"):
+            path = os.path.join(tmp, f"{scenario}.log")
+            write_elapsed = generate(path, "reports" if scenario == "reports" else "games", args.events)
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            result = replay(path, since_last_reset=scenario == "games")
+            rate = result["records"] / (result["total_ms"] / 1000) if result["total_ms"] else 0
+            write_rate = f"{args.events / write_elapsed:,.0f}" if scenario != "reports" else "-"
+            print(f"{scenario:<10}{size_mb:>10.1f}{write_rate:>12}{result['records']:>10,}"
+                  f"{result['load_ms']:>10.1f}{result['replay_ms']:>10.1f}{result['total_ms']:>10.1f}{rate:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+快照读取基准测试
+对比两种读取 /api/status 数据的方式在并发投票写入下的读吞吐：
+  locked   - 旧方式：获取房间锁后调用 get_public_status() 并编码JSON
+  snapshot - 新方式：不持锁读取已发布的不可变快照并编码JSON
+写线程模拟投票请求：每次持锁推进一步游戏（注册/开始/描述/投票/处理结果/重置），循环往复，
+并在锁内停留 --write-hold-ms 毫秒，模拟写接口在锁内做的 I/O（如 /api/vote 在锁内打印日志）
+注意：读线程是不做 I/O 的死循环，snapshot 模式下写线程的吞吐主要受 GIL 调度影响，不代表锁等待
+
+运行方式（在 平台方 目录下）：
+    python benchmarks/bench_snapshot_reads.py --readers 8 --writers 4 --duration 3
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logic import GameLogic, GameStatus  # noqa: E402
+
+GROUPS = ["组1", "组2", "组3", "组4", "组5"]
+
+
+def write_step(game: GameLogic):
+    """按当前阶段推进一步游戏，调用方持有锁"""
+    status = game.game_status
+    if status in (GameStatus.WAITING, GameStatus.REGISTERED) and len(game.groups) < len(GROUPS):
+        game.register_group(GROUPS[len(game.groups)])
+    elif status == GameStatus.REGISTERED:
+        game.start_game("卧底词", "平民词")
+    elif status in (GameStatus.WORD_ASSIGNED, GameStatus.ROUND_END):
+        game.start_round()
+    elif status == GameStatus.DESCRIBING:
+        submitted = {d["group"] for d in game.descriptions[game.current_round]}
+        group_name = next(g for g in game.get_active_describe_order() if g not in submitted)
+        game.submit_description(group_name, "描述")
+    elif status == GameStatus.VOTING:
+        round_votes = game.votes[game.current_round]
+        active = game.get_active_describe_order()
+        voters = [g for g in active if g not in round_votes]
+        if voters:
+            # 第1回合集中投一个平民，之后集中投卧底，保证每局两回合结束，状态不会无限增长
+            civilians = [g for g in active if g != game.undercover_group]
+            preferred = civilians[0] if game.current_round == 1 else game.undercover_group
+            voter = voters[0]
+            target = preferred if voter != preferred else next(g for g in active if g != voter)
+            game.submit_vote(voter, target)
+        else:
+            game.process_voting_result()
+    else:
+        game.reset_game()
+
+
+def percentile(samples: list, p: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def run(mode: str, readers: int, writers: int, duration: float, write_hold: float) -> dict:
+    # 固定时钟：描述窗口永不超时，写线程的节奏只取决于锁竞争
+    game = GameLogic(clock=lambda: 0.0)
+    lock = threading.Lock()
+    stop = threading.Event()
+    read_counts = [0] * readers
+    write_counts = [0] * writers
+    latencies = [[] for _ in range(readers)]
+
+    def reader(index):
+        count = 0
+        samples = latencies[index]
+        while not stop.is_set():
+            start = time.perf_counter()
+            if mode == "locked":
+                with lock:
+                    data = game.get_public_status()
+                    body = json.dumps(data)
+            else:
+                body = json.dumps(game.snapshot.public_status)
+            count += 1
+            if count % 16 == 0:
+                samples.append(time.perf_counter() - start)
+        read_counts[index] = count
+
+    def writer(index):
+        count = 0
+        while not stop.is_set():
+            with lock:
+                write_step(game)
+                if write_hold:
+                    time.sleep(write_hold)
+            count += 1
+        write_counts[index] = count
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    samples = [sample for reader_samples in latencies for sample in reader_samples]
+    return {
+        "mode": mode,
+        "reads_per_sec": sum(read_counts) / duration,
+        "writes_per_sec": sum(write_counts) / duration,
+        "read_p50_us": percentile(samples, 0.50) * 1e6,
+        "read_p99_us": percentile(samples, 0.99) * 1e6
+    }
+
+
+def run_http(readers: int, writers: int, duration: float, write_hold: float) -> dict:
+    """端到端：通过 Flask 测试客户端并发请求 /api/status，同时写线程直接推进默认房间的游戏"""
+    os.environ.setdefault("EVENT_LOG_DIR", "")  # 基准测试不写事件日志
+    from backend import app, rooms
+    from rooms import DEFAULT_ROOM_ID
+
+    room = rooms.get_room(DEFAULT_ROOM_ID)
+    room.game.description_timeout = 3600  # 避免描述窗口在测试期间超时
+    stop = threading.Event()
+    read_counts = [0] * readers
+    write_counts = [0] * writers
+    latencies = [[] for _ in range(readers)]
+
+    def reader(index):
+        client = app.test_client()
+        count = 0
+        samples = latencies[index]
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.get('/api/status')
+            samples.append(time.perf_counter() - start)
+            count += 1
+        read_counts[index] = count
+
+    def writer(index):
+        count = 0
+        while not stop.is_set():
+            with room.lock:
+                write_step(room.game)
+                if write_hold:
+                    time.sleep(write_hold)
+            count += 1
+        write_counts[index] = count
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    samples = [sample for reader_samples in latencies for sample in reader_samples]
+    return {
+        "mode": "http/snapshot",
+        "reads_per_sec": sum(read_counts) / duration,
+        "writes_per_sec": sum(write_counts) / duration,
+        "read_p50_us": percentile(samples, 0.50) * 1e6,
+        "read_p99_us": percentile(samples, 0.99) * 1e6
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="快照读取基准测试")
+    parser.add_argument("--readers", type=int, default=8, help="读线程数")
+    parser.add_argument("--writers", type=int, default=4, help="写（投票）线程数")
+    parser.add_argument("--duration", type=float, default=3.0, help="每种模式的运行秒数")
+    parser.add_argument("--write-hold-ms", type=float, default=0.2, help="写线程每次在锁内停留的毫秒数")
+    parser.add_argument("--http", action="store_true", help="额外运行经过 Flask 的端到端测试")
+    args = parser.parse_args()
+    write_hold = args.write_hold_ms / 1000
+
+    print(f"读线程: {args.readers}  写线程: {args.writers}  锁内停留: {args.write_hold_ms}ms  时长: {args.duration}s")
+    print(f"{'模式':<16}{'读/秒':>12}{'写/秒':>10}{'读p50(us)':>12}{'读p99(us)':>12}")
+    results = [run(mode, args.readers, args.writers, args.duration, write_hold) for mode in ("locked", "snapshot")]
+    if args.http:
+        results.append(run_http(args.readers, args.writers, args.duration, write_hold))
+    for result in results:
+        print(f"{result['mode']:<16}{result['reads_per_sec']:>12,.0f}{result['writes_per_sec']:>10,.0f}"
+              f"{result['read_p50_us']:>12,.1f}{result['read_p99_us']:>12,.1f}")
+
+
+if __name__ == '__main__':
+    main()
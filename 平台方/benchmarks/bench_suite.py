@@ -0,0 +1,332 @@
+"""
+进程内微基准测试套件（带回归基线）
+直接调用 GameLogic 的方法，以及通过 Flask 测试客户端调用 backend.py 的接口（不经过网络），测量每秒操作数：
+  logic.*  - get_public_status、get_game_state、submit_description、submit_vote、process_voting_result、完整对局
+  http.*   - /api/status、/api/game/state、/api/describe、/api/vote、通过接口进行的完整对局
+只计时被测操作本身，准备状态（注册、开始回合等）不计入
+
+基线保存在 benchmarks/baseline.json。不同机器的绝对速度不同，比较前先用一段固定的纯 Python 负载（calibration）
+测出本机相对基线机器的速度，按比例换算后再比较；任何一项低于基线超过阈值（默认25%）时以退出码1结束
+
+运行方式（在 平台方 目录下）：
+    python benchmarks/bench_suite.py                   # 与基线比较
+    python benchmarks/bench_suite.py --update-baseline # 重新生成基线（确认性能变化符合预期后）
+    python benchmarks/bench_suite.py --cases logic     # 只运行名称包含 logic 的项目
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+# 在导入 backend 之前设置：不写事件日志，不输出每次投票的日志
+os.environ.setdefault("EVENT_LOG_DIR", "")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from game_logic import GameLogic, GameStatus  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+GROUPS = ["组1", "组2", "组3", "组4", "组5"]
+ADMIN_HEADERS = {'X-Admin-Token': os.environ.get("ADMIN_TOKEN", "host-secret")}
+BENCH_ROOM = "bench"
+
+# 每个项目：名称 -> run(n)，执行 n 次被测操作并返回其中被测部分的总耗时（秒）
+CASES: Dict[str, Callable[[int], float]] = {}
+
+
+def case(name: str):
+    def decorator(func):
+        CASES[name] = func
+        return func
+    return decorator
+
+
+def new_game() -> GameLogic:
+    """5个组已注册并开始游戏（固定时钟：描述窗口永不超时，阶段不会自动推进）"""
+    game = GameLogic(clock=lambda: 0.0)
+    for name in GROUPS:
+        game.register_group(name)
+    game.start_game("卧底词", "平民词")
+    return game
+
+
+def vote_target(game: GameLogic, voter: str) -> str:
+    """确定性的投票对象：第一个存活的平民（投票者本人就是它时顺延），每回合淘汰一个平民"""
+    civilians = [name for name in game.get_active_groups() if name != game.undercover_group]
+    return next(name for name in civilians + [game.undercover_group] if name != voter)
+
+
+def describe_all(game: GameLogic):
+    for name in list(game.describe_order):
+        game.submit_description(name, f"{name}的描述")
+
+
+def vote_all(game: GameLogic):
+    for name in game.get_active_groups():
+        game.submit_vote(name, vote_target(game, name))
+
+
+def play_game(game: GameLogic) -> int:
+    """按回合进行到游戏结束，返回回合数"""
+    rounds = 0
+    while game.game_status != GameStatus.GAME_END and rounds < 10:
+        game.start_round()
+        describe_all(game)
+        vote_all(game)
+        game.process_voting_result()
+        rounds += 1
+    return rounds
+
+
+def timed_loop(n: int, func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return time.perf_counter() - start
+
+
+@case("logic.get_public_status")
+def bench_logic_public_status(n: int) -> float:
+    game = new_game()
+    game.start_round()
+    return timed_loop(n, game.get_public_status)
+
+
+@case("logic.get_game_state")
+def bench_logic_game_state(n: int) -> float:
+    game = new_game()
+    game.start_round()
+    describe_all(game)
+    return timed_loop(n, game.get_game_state)
+
+
+@case("logic.submit_description")
+def bench_logic_describe(n: int) -> float:
+    elapsed = 0.0
+    for _ in range(0, n, len(GROUPS)):
+        game = new_game()
+        order = game.start_round()
+        start = time.perf_counter()
+        for name in order:
+            game.submit_description(name, f"{name}的描述")
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+@case("logic.submit_vote")
+def bench_logic_vote(n: int) -> float:
+    elapsed = 0.0
+    for _ in range(0, n, len(GROUPS)):
+        game = new_game()
+        game.start_round()
+        describe_all(game)
+        votes = [(name, vote_target(game, name)) for name in game.get_active_groups()]
+        start = time.perf_counter()
+        for voter, target in votes:
+            game.submit_vote(voter, target)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+@case("logic.process_voting_result")
+def bench_logic_process(n: int) -> float:
+    elapsed = 0.0
+    for _ in range(n):
+        game = new_game()
+        game.start_round()
+        describe_all(game)
+        vote_all(game)
+        start = time.perf_counter()
+        game.process_voting_result()
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+@case("logic.full_game")
+def bench_logic_full_game(n: int) -> float:
+    return timed_loop(n, lambda: play_game(new_game()))
+
+
+def _bench_room():
+    """backend.py 中供基准测试使用的房间（首次调用时导入 backend 并创建房间）"""
+    from backend import app, rooms
+    room = rooms.get_room(BENCH_ROOM) or rooms.create_room(BENCH_ROOM, "基准测试")
+    return app.test_client(), room
+
+
+def _prepare_room(room, describe: bool = False):
+    """把房间重置到已开始第一回合的状态（直接操作房间里的游戏逻辑，不计时）"""
+    with room.lock:
+        game = room.game
+        game.reset_game()
+        for name in GROUPS:
+            game.register_group(name)
+        game.start_game("卧底词", "平民词")
+        game.start_round()
+        if describe:
+            describe_all(game)
+
+
+def _request(client, method: str, path: str, **kwargs) -> Dict:
+    response = client.open(f"/api/rooms/{BENCH_ROOM}{path}", method=method, **kwargs)
+    try:
+        return response.get_json()
+    finally:
+        response.close()
+
+
+@case("http.status")
+def bench_http_status(n: int) -> float:
+    client, room = _bench_room()
+    _prepare_room(room)
+    return timed_loop(n, lambda: _request(client, 'GET', '/status'))
+
+
+@case("http.game_state")
+def bench_http_game_state(n: int) -> float:
+    client, room = _bench_room()
+    _prepare_room(room, describe=True)
+    return timed_loop(n, lambda: _request(client, 'GET', '/game/state', headers=ADMIN_HEADERS))
+
+
+@case("http.describe")
+def bench_http_describe(n: int) -> float:
+    client, room = _bench_room()
+    elapsed = 0.0
+    for _ in range(0, n, len(GROUPS)):
+        _prepare_room(room)
+        order = list(room.game.describe_order)
+        start = time.perf_counter()
+        for name in order:
+            _request(client, 'POST', '/describe', json={'group_name': name, 'description': f"{name}的描述"})
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+@case("http.vote")
+def bench_http_vote(n: int) -> float:
+    client, room = _bench_room()
+    elapsed = 0.0
+    for _ in range(0, n, len(GROUPS)):
+        _prepare_room(room, describe=True)
+        votes = [(name, vote_target(room.game, name)) for name in room.game.get_active_groups()]
+        start = time.perf_counter()
+        for voter, target in votes:
+            _request(client, 'POST', '/vote', json={'voter_group': voter, 'target_group': target})
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+@case("http.full_game")
+def bench_http_full_game(n: int) -> float:
+    client, room = _bench_room()
+
+    def full_game():
+        _request(client, 'POST', '/game/reset', headers=ADMIN_HEADERS)
+        for name in GROUPS:
+            _request(client, 'POST', '/register', json={'group_name': name})
+        _request(client, 'POST', '/game/start', headers=ADMIN_HEADERS,
+                 json={'undercover_word': "卧底词", 'civilian_word': "平民词"})
+        for _ in range(10):
+            order = _request(client, 'POST', '/game/round/start', headers=ADMIN_HEADERS)['data']['order']
+            for name in order:
+                _request(client, 'POST', '/describe', json={'group_name': name, 'description': f"{name}的描述"})
+            for name in order:
+                _request(client, 'POST', '/vote', json={'voter_group': name,
+                                                        'target_group': vote_target(room.game, name)})
+            result = _request(client, 'POST', '/game/voting/process', headers=ADMIN_HEADERS)
+            if result['data'].get('game_ended'):
+                break
+
+    return timed_loop(n, full_game)
+
+
+def calibration(n: int) -> float:
+    """固定的纯 Python 负载（字典、列表、字符串、JSON 编码），用来换算不同机器的速度"""
+    data = {f"key{index}": [index, str(index), {"value": index * 1.5}] for index in range(50)}
+    start = time.perf_counter()
+    for _ in range(n):
+        sorted(data.items(), key=lambda item: item[1][1])
+        json.dumps(data, ensure_ascii=False)
+    return time.perf_counter() - start
+
+
+def measure(run: Callable[[int], float], seconds: float, repeats: int) -> float:
+    """
+    测量每秒操作数：先找到耗时约 seconds 的操作次数，再重复 repeats 次取最快的一次（排除偶发干扰）
+    """
+    n = 5
+    while True:
+        elapsed = run(n)
+        if elapsed >= seconds / 4 or n >= 10_000_000:
+            break
+        n *= 4 if elapsed < seconds / 40 else 2
+    n = max(5, int(n * seconds / max(elapsed, 1e-9)))
+    return max(n / max(run(n), 1e-9) for _ in range(repeats))
+
+
+def load_baseline(path: str) -> Dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="进程内微基准测试套件（与基线比较，退化超过阈值时失败）")
+    parser.add_argument("--cases", default="", help="只运行名称包含该字符串的项目")
+    parser.add_argument("--time", type=float, default=0.5, help="每次测量的目标时长（秒）")
+    parser.add_argument("--repeats", type=int, default=3, help="每个项目的测量次数（取最快）")
+    parser.add_argument("--threshold", type=float, default=0.25, help="允许的每秒操作数下降比例")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基线文件")
+    parser.add_argument("--update-baseline", action="store_true", help="把本次结果写入基线文件")
+    args = parser.parse_args()
+
+    names = [name for name in CASES if args.cases in name]
+    baseline = load_baseline(args.baseline)
+    calibration_ops = measure(calibration, args.time, args.repeats)
+    # 本机速度 / 基线机器速度
+    speed = calibration_ops / baseline["calibration"] if baseline.get("calibration") else 1.0
+    print(f"calibration: {calibration_ops:,.0f} ops/s（相对基线机器 {speed:.2f}x）  阈值: -{args.threshold:.0%}")
+    print(f"{'项目':<30}{'ops/s':>14}{'基线(换算)':>14}{'变化':>10}")
+
+    results: Dict[str, float] = {}
+    regressions: List[str] = []
+    for name in names:
+        ops = measure(CASES[name], args.time, args.repeats)
+        results[name] = ops
+        expected = baseline.get("cases", {}).get(name)
+        if expected is None:
+            print(f"{name:<30}{ops:>14,.0f}{'-':>14}{'新增':>10}")
+            continue
+        expected *= speed
+        change = ops / expected - 1
+        mark = ""
+        if change < -args.threshold:
+            regressions.append(name)
+            mark = "  退化"
+        print(f"{name:<30}{ops:>14,.0f}{expected:>14,.0f}{change:>+10.1%}{mark}")
+
+    if args.update_baseline:
+        cases = dict(baseline.get("cases", {}), **results) if args.cases else results
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"calibration": round(calibration_ops), "python": sys.version.split()[0],
+                       "cases": {name: round(ops, 1) for name, ops in cases.items()}},
+                      f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"基线已更新：{args.baseline}")
+        return 0
+    if regressions:
+        print(f"性能退化超过 {args.threshold:.0%}：{', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+事件推送模块
+把游戏逻辑产生的类型化事件分发给 Server-Sent Events 订阅者
+"""
+import asyncio
+import json
+import queue
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# 每个订阅者最多缓存的未发送事件数，超过说明订阅者太慢，直接断开让其重新同步
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# 保留最近的事件，用于断线重连时按 Last-Event-ID 补发
+HISTORY_SIZE = 256
+
+# 事件元组：(版本号, 事件类型, 事件数据)
+Event = Tuple[int, str, Dict]
+
+
+class Subscription:
+    """单个订阅者的事件队列"""
+
+    def __init__(self, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue: "queue.Queue[Event]" = queue.Queue(maxsize)
+        self.overflowed = False  # 队列溢出后订阅失效，需要客户端重新同步
+
+    def offer(self, event: Event) -> bool:
+        """非阻塞入队，队列已满返回False"""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            return False
+
+    def get(self, timeout: float) -> Optional[Event]:
+        """取下一个事件，超时返回None"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription:
+    """单个订阅者的事件队列（asyncio 版本，发布和消费都必须在同一个事件循环中）"""
+
+    def __init__(self, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def offer(self, event: Event) -> bool:
+        """非阻塞入队，队列已满返回False"""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        """取下一个事件，超时返回None"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """事件分发器：发布操作只做非阻塞入队，可以在房间锁内调用"""
+
+    def __init__(self, history_size: int = HISTORY_SIZE, subscription_class=Subscription):
+        """
+        :param history_size: 保留的最近事件数
+        :param subscription_class: 订阅者队列类型（多线程服务器用 Subscription，asyncio 服务器用 AsyncSubscription）
+        """
+        self._subscription_class = subscription_class
+        self._subscribers: List[Subscription] = []
+        self._history: "deque[Event]" = deque(maxlen=history_size)
+        self._last_version = 0  # 最近发布的事件版本号
+        self._lock = threading.Lock()
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Tuple[Subscription, Optional[List[Event]]]:
+        """
+        新增订阅者
+        :param last_event_id: 客户端断线前收到的最后一个事件版本号
+        :return: (订阅对象, 需要补发的事件)；补发事件为None表示历史已不完整，客户端需要重新同步
+        """
+        subscription = self._subscription_class()
+        with self._lock:
+            self._subscribers.append(subscription)
+            if last_event_id is None:
+                return subscription, []
+            # 版本号连续递增：客户端版本比服务器新（服务器重启过），或历史最早的事件之前有缺口，都无法补发
+            if last_event_id > self._last_version:
+                return subscription, None
+            oldest = self._history[0][0] if self._history else self._last_version + 1
+            if oldest > last_event_id + 1:
+                return subscription, None
+            return subscription, [event for event in self._history if event[0] > last_event_id]
+
+    def unsubscribe(self, subscription: Subscription):
+        """移除订阅者"""
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def publish(self, version: int, event_type: str, data: Dict):
+        """发布事件给所有订阅者"""
+        event = (version, event_type, data)
+        with self._lock:
+            self._last_version = version
+            self._history.append(event)
+            for subscription in list(self._subscribers):
+                if not subscription.offer(event):
+                    subscription.overflowed = True
+                    self._subscribers.remove(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+def format_sse(event_type: str, data: Dict, event_id: Optional[int] = None) -> str:
+    """按 text/event-stream 格式编码一个事件"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append("data: " + json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+    return "\n".join(lines) + "\n\n"
@@ -1,40 +1,205 @@
 """
 前端界面模块
 提供可视化的游戏管理界面
+
+对后端的代理：
+  - 所有请求共用一个保持连接的会话（连接池），不再每次刷新都新建 TCP 连接
+  - /api/game/state 的结果在进程内缓存 STATE_CACHE_TTL 秒，多个管理页面（标签页）的定时刷新共用一次后端请求；
+    缓存过期时并发的刷新只有一个去请求后端，其余等待同一个结果；管理操作成功后立即失效
+  - 后端的状态码和错误信息原样返回给页面；连接失败、超时、响应不是 JSON 时返回 502/504 和原因，并记录日志
+  - 后端请求耗时、错误和缓存命中按 Prometheus 文本格式在 /metrics 导出
 """
-from flask import Flask, render_template_string, jsonify
+from flask import Flask, Response, render_template_string, jsonify, request
+import json
+import logging
 import os
 import requests
 import threading
 import time
-from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+
+from log_setup import setup_logging
+from metrics import METRICS_ENABLED, LATENCY_BUCKETS, Counter, Histogram, MetricsRegistry
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 # 前端服务器（用于展示界面）
 frontend_app = Flask(__name__)
 
 # 后端API地址
-BACKEND_URL = "http://127.0.0.1:5000"
+BACKEND_URL = os.environ.get("BACKEND_URL", "http://127.0.0.1:5000")
 ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "host-secret")
 ADMIN_HEADERS = {'X-Admin-Token': ADMIN_TOKEN}
 
+# 后端请求的连接超时和读超时（秒）
+CONNECT_TIMEOUT = 1.0
+READ_TIMEOUT = 5.0
 
-def get_backend_data(endpoint, use_admin=False):
-    """从后端获取数据"""
-    try:
-        headers = ADMIN_HEADERS if use_admin else None
-        response = requests.get(f"{BACKEND_URL}{endpoint}", headers=headers, timeout=2)
-        return response.json()
-    except:
-        return None
+# 连接池保持的空闲连接数（同时进行中的后端请求超过时临时新建连接，用完关闭）
+POOL_SIZE = 8
+
+# /api/game/state 的缓存时间（秒），页面每2秒刷新一次
+STATE_CACHE_TTL = float(os.environ.get("STATE_CACHE_TTL", "0.5"))
+
+JSON_MIMETYPE = 'application/json'
+
+
+def _create_session() -> requests.Session:
+    """保持连接的会话；requests 的连接池是线程安全的，Flask 的各个请求线程共用"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+session = _create_session()
+
+
+class ProxyMetrics:
+    """前端代理的指标"""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self.registry = MetricsRegistry()
+        register = self.registry.register
+        self.upstream_duration = register(Histogram(
+            "undercover_frontend_upstream_duration_seconds", "请求后端的耗时（秒），code 为后端状态码，未得到响应时为 error",
+            ("endpoint", "method", "code"), LATENCY_BUCKETS))
+        self.upstream_errors = register(Counter(
+            "undercover_frontend_upstream_errors_total", "请求后端失败的次数（连接失败、超时、响应不是 JSON）",
+            ("endpoint", "reason")))
+        self.state_cache = register(Counter(
+            "undercover_frontend_state_cache_total", "/api/game/state 缓存：hit 命中，shared 等待其他请求的结果，miss 请求后端",
+            ("result",)))
+
+    def render(self) -> str:
+        return self.registry.render() if self.enabled else ""
+
+
+metrics = ProxyMetrics()
+
+
+def _error_body(code: int, message: str) -> bytes:
+    return json.dumps({"code": code, "message": message, "data": {}}, ensure_ascii=False).encode('utf-8')
 
 
-def post_backend_data(endpoint, data):
-    """向后端发送POST请求"""
+def backend_request(method: str, endpoint: str, data: Optional[Dict] = None,
+                    use_admin: bool = False) -> Tuple[int, bytes]:
+    """
+    请求后端，返回可以直接交给页面的 (状态码, JSON 响应体)
+    后端有响应时原样返回它的状态码和响应体；没有响应时返回 502（连接失败、响应不是 JSON）或 504（超时）
+    :param method: GET / POST
+    :param endpoint: 接口路径，例如 /api/game/state
+    :param data: POST 的 JSON 数据
+    :param use_admin: 是否带管理员令牌
+    :return: (HTTP状态码, 响应体)
+    """
+    started = time.perf_counter()
+    code = 'error'
     try:
-        response = requests.post(f"{BACKEND_URL}{endpoint}", json=data, timeout=2)
-        return response.json()
-    except:
-        return None
+        response = session.request(method, f"{BACKEND_URL}{endpoint}", json=data,
+                                   headers=ADMIN_HEADERS if use_admin else None,
+                                   timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        code = str(response.status_code)
+        if not response.headers.get('Content-Type', '').startswith(JSON_MIMETYPE):
+            return _upstream_error(endpoint, 'invalid_response', 502,
+                                   f"后端返回的不是 JSON（HTTP {response.status_code}）")
+        return response.status_code, response.content
+    except requests.exceptions.Timeout as e:
+        return _upstream_error(endpoint, 'timeout', 504, "后端响应超时", e)
+    except requests.exceptions.RequestException as e:
+        return _upstream_error(endpoint, 'connection', 502, "无法连接后端", e)
+    finally:
+        metrics.upstream_duration.observe((endpoint, method, code), time.perf_counter() - started)
+
+
+def _upstream_error(endpoint: str, reason: str, code: int, message: str,
+                    error: Optional[Exception] = None) -> Tuple[int, bytes]:
+    metrics.upstream_errors.inc((endpoint, reason))
+    logger.warning("后端请求失败", extra={"fields": {
+        "endpoint": endpoint, "reason": reason, "error": str(error) if error else None}})
+    return code, _error_body(code, f"{message}: {error}" if error else message)
+
+
+class MicroCache:
+    """
+    一个接口结果的短时缓存（多个页面共用）
+    过期后第一个请求去请求后端，同时到达的其他请求等待这次的结果，不会同时向后端发出多个相同请求
+    """
+
+    def __init__(self, ttl: float, fetch, counter: Counter):
+        """
+        :param ttl: 缓存时间（秒），0 表示不缓存（仍合并同时到达的请求）
+        :param fetch: 请求后端的函数，返回 (状态码, 响应体)
+        :param counter: 按 hit / shared / miss 计数
+        """
+        self.ttl = ttl
+        self.fetch = fetch
+        self.counter = counter
+        self._lock = threading.Lock()
+        self._value: Optional[Tuple[int, bytes]] = None
+        self._expires = 0.0
+        self._generation = 0  # 每次失效加一，失效前发出的请求的结果不再写入缓存
+        self._flight: Optional[threading.Event] = None
+
+    def get(self) -> Tuple[int, bytes]:
+        while True:
+            with self._lock:
+                if self._value is not None and time.monotonic() < self._expires:
+                    self.counter.inc(("hit",))
+                    return self._value
+                flight = self._flight
+                if flight is None:
+                    flight = self._flight = threading.Event()
+                    generation = self._generation
+                    break
+            self.counter.inc(("shared",))
+            if not flight.wait(CONNECT_TIMEOUT + READ_TIMEOUT + 1):
+                return self.fetch()  # 正在进行的请求超出了后端超时还没结束，自己请求（不写入缓存）
+            value = self._value
+            if value is not None:
+                return value
+            # 那次请求出错，或期间缓存被管理操作失效，重新读取
+
+        self.counter.inc(("miss",))
+        value = None
+        try:
+            value = self.fetch()
+            return value
+        finally:
+            with self._lock:
+                if value is not None and generation == self._generation:
+                    self._value = value
+                    self._expires = time.monotonic() + self.ttl
+                self._flight = None
+            flight.set()
+
+    def invalidate(self):
+        """管理操作改变了游戏状态，下一次读取重新请求后端"""
+        with self._lock:
+            self._value = None
+            self._generation += 1
+
+
+state_cache = MicroCache(STATE_CACHE_TTL, lambda: backend_request('GET', '/api/game/state', use_admin=True),
+                         metrics.state_cache)
+
+
+def json_response(result: Tuple[int, bytes]) -> Response:
+    status_code, body = result
+    return Response(body, status=status_code, mimetype=JSON_MIMETYPE)
+
+
+def admin_post(endpoint: str, data: Optional[Dict] = None) -> Response:
+    """代理管理操作（POST），成功后让状态缓存失效，页面随后的刷新能看到操作结果"""
+    result = backend_request('POST', endpoint, data, use_admin=True)
+    if result[0] < 400:
+        state_cache.invalidate()
+    return json_response(result)
 
 
 # HTML模板
@@ -253,6 +418,10 @@ HTML_TEMPLATE = """
             <button onclick="startRound()">开始新回合</button>
             <button onclick="processVoting()">处理投票结果</button>
             <button onclick="resetGame()">重置游戏</button>
+            <div class="form-group">
+                <label><input type="checkbox" id="auto-advance" onchange="updateSettings()"> 全部投票后自动处理结果</label>
+                <label><input type="checkbox" id="auto-next-round" onchange="updateSettings()"> 回合结束后自动开始下一回合</label>
+            </div>
         </div>
         
         <!-- 游戏状态 -->
@@ -297,8 +466,40 @@ HTML_TEMPLATE = """
     </div>
     
     <script>
-        // 自动刷新游戏状态
-        setInterval(updateGameState, 2000);
+        // 自动刷新游戏状态：优先使用后端事件推送，只在收到事件时刷新；推送不可用时退回2秒轮询
+        const GAME_EVENTS = ['group_registered', 'status', 'round_started', 'description', 'describe_timeout',
+                             'vote', 'votes_complete', 'vote_result', 'report', 'settings', 'reset', 'resync'];
+        let pollTimer = null;
+        let refreshTimer = null;
+
+        function startPolling(interval) {
+            if (pollTimer) {
+                clearInterval(pollTimer);
+            }
+            pollTimer = setInterval(updateGameState, interval);
+        }
+
+        function scheduleRefresh() {
+            // 合并短时间内连续到达的事件，只刷新一次
+            if (refreshTimer) {
+                return;
+            }
+            refreshTimer = setTimeout(() => {
+                refreshTimer = null;
+                updateGameState();
+            }, 100);
+        }
+
+        if (window.EventSource) {
+            const source = new EventSource('/api/events');
+            source.onopen = () => startPolling(10000);  // 推送正常时只保留低频兜底刷新
+            source.onerror = () => startPolling(2000);
+            source.addEventListener('hello', scheduleRefresh);
+            for (const eventType of GAME_EVENTS) {
+                source.addEventListener(eventType, scheduleRefresh);
+            }
+        }
+        startPolling(2000);
         updateGameState();
         
         function updateGameState() {
@@ -313,6 +514,7 @@ HTML_TEMPLATE = """
                         updateVotes(data);  // 添加实时投票显示
                         updateReports(data);
                         updateScores(data);
+                        updateSettingsView(data);
                     } else {
                         console.error('状态刷新失败：', resp ? resp.message : '未知错误');
                     }
@@ -543,6 +745,33 @@ HTML_TEMPLATE = """
             scoresDiv.innerHTML = html;
         }
         
+        function updateSettingsView(data) {
+            const settings = data.settings || {};
+            document.getElementById('auto-advance').checked = !!settings.auto_advance;
+            document.getElementById('auto-next-round').checked = !!settings.auto_next_round;
+        }
+        
+        function updateSettings() {
+            fetch('/api/game/settings', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({
+                    auto_advance: document.getElementById('auto-advance').checked,
+                    auto_next_round: document.getElementById('auto-next-round').checked
+                })
+            })
+            .then(response => response.json())
+            .then(resp => {
+                if (!resp || resp.code !== 200) {
+                    alert('错误：' + (resp ? resp.message : '后端无响应'));
+                }
+                updateGameState();
+            })
+            .catch(error => {
+                alert('请求失败：' + error);
+            });
+        }
+        
         function startGame() {
             const undercoverWord = document.getElementById('undercover-word').value;
             const civilianWord = document.getElementById('civilian-word').value;
@@ -665,58 +894,73 @@ def index():
 
 @frontend_app.route('/api/game/state')
 def api_game_state():
-    """代理后端API"""
-    data = get_backend_data('/api/game/state', use_admin=True)
-    if data is None:
-        return jsonify({"code": 500, "message": "后端状态接口无响应", "data": {}}), 500
-    return jsonify(data)
+    """代理后端API（短时缓存，多个页面共用）"""
+    return json_response(state_cache.get())
+
+
+@frontend_app.route('/metrics')
+def metrics_endpoint():
+    """前端代理的运行指标（Prometheus 文本格式）"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+@frontend_app.route('/api/events')
+def api_events():
+    """代理后端事件推送流"""
+    headers = {}
+    last_event_id = request.headers.get('Last-Event-ID')
+    if last_event_id:
+        headers['Last-Event-ID'] = last_event_id
+    try:
+        # 后端每15秒发送心跳，读超时留足余量
+        upstream = session.get(f"{BACKEND_URL}/api/events", headers=headers, stream=True,
+                               timeout=(CONNECT_TIMEOUT, 60))
+    except requests.exceptions.RequestException as e:
+        metrics.upstream_errors.inc(('/api/events', 'connection'))
+        logger.warning("后端请求失败", extra={"fields": {"endpoint": "/api/events", "reason": "connection",
+                                                         "error": str(e)}})
+        return jsonify({"code": 502, "message": "后端事件接口无响应", "data": {}}), 502
+
+    def generate():
+        try:
+            for chunk in upstream.iter_content(chunk_size=None):
+                yield chunk
+        except requests.exceptions.RequestException:
+            return
+        finally:
+            upstream.close()
+
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
 
 
 @frontend_app.route('/api/game/start', methods=['POST'])
 def api_start_game():
     """代理后端API"""
-    from flask import request
-    data = request.json
-    response = requests.post(
-        f"{BACKEND_URL}/api/game/start",
-        json=data,
-        headers=ADMIN_HEADERS,
-        timeout=2
-    )
-    return jsonify(response.json()), response.status_code
+    return admin_post('/api/game/start', request.get_json(silent=True))
 
 
 @frontend_app.route('/api/game/round/start', methods=['POST'])
 def api_start_round():
     """代理后端API"""
-    response = requests.post(
-        f"{BACKEND_URL}/api/game/round/start",
-        headers=ADMIN_HEADERS,
-        timeout=2
-    )
-    return jsonify(response.json()), response.status_code
+    return admin_post('/api/game/round/start')
 
 
 @frontend_app.route('/api/game/voting/process', methods=['POST'])
 def api_process_voting():
     """代理后端API"""
-    response = requests.post(
-        f"{BACKEND_URL}/api/game/voting/process",
-        headers=ADMIN_HEADERS,
-        timeout=2
-    )
-    return jsonify(response.json()), response.status_code
+    return admin_post('/api/game/voting/process')
+
+
+@frontend_app.route('/api/game/settings', methods=['POST'])
+def api_update_settings():
+    """代理后端API"""
+    return admin_post('/api/game/settings', request.get_json(silent=True))
 
 
 @frontend_app.route('/api/game/reset', methods=['POST'])
 def api_reset_game():
     """代理后端API"""
-    response = requests.post(
-        f"{BACKEND_URL}/api/game/reset",
-        headers=ADMIN_HEADERS,
-        timeout=2
-    )
-    return jsonify(response.json()), response.status_code
+    return admin_post('/api/game/reset')
 
 
 if __name__ == '__main__':
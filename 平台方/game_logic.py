@@ -2,8 +2,10 @@
 游戏逻辑模块
 负责游戏状态管理、投票判定、得分计算等核心逻辑
 """
+import copy
 import random
-from typing import Dict, List, Optional, Tuple
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 from datetime import datetime
 from enum import Enum
 
@@ -19,10 +21,35 @@ class GameStatus(Enum):
     GAME_END = "game_end"  # 游戏结束
 
 
+class GameSnapshot:
+    """
+    某一版本游戏状态的不可变快照
+    每次状态变更后整体重建并原子替换，字段中的字典和列表都是独立副本，
+    读取方可以不持锁直接使用（只读，不得修改）
+    """
+    __slots__ = ("version", "public_status", "descriptions", "last_result", "groups", "game_state")
+
+    def __init__(self, version: int, public_status: Dict, descriptions: Dict,
+                 last_result: Optional[Dict], groups: Dict, game_state: Dict):
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "public_status", public_status)  # /api/status
+        object.__setattr__(self, "descriptions", descriptions)  # /api/descriptions
+        object.__setattr__(self, "last_result", last_result)  # /api/result
+        object.__setattr__(self, "groups", groups)  # /api/groups
+        object.__setattr__(self, "game_state", game_state)  # /api/game/state（主持方）
+
+    def __setattr__(self, name, value):
+        raise AttributeError("快照不可修改")
+
+
 class GameLogic:
     """游戏逻辑核心类"""
     
-    def __init__(self):
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        :param clock: 单调时钟，用于计算描述时间窗口（测试和基准测试可以注入假时钟）
+        """
+        self._clock = clock
         self.groups: Dict[str, Dict] = {}  # 组名 -> 组信息
         self.game_status = GameStatus.WAITING
         self.undercover_group: Optional[str] = None  # 卧底组名
@@ -33,12 +60,251 @@ class GameLogic:
         self.descriptions: Dict[str, List[Dict]] = {}  # 每回合的描述 {round: [{group, desc, time}]}
         self.votes: Dict[int, Dict[str, str]] = {}  # 每回合的投票 {round: {voter: target}}
         self.eliminated_groups: List[str] = []  # 已淘汰的组
+        # 增量维护的派生状态，热路径上的成员判断和计数都是 O(1)，不再反复扫描列表
+        self._eliminated: Set[str] = set()  # 已淘汰的组（与 eliminated_groups 同步）
+        self._active_groups: Dict[str, None] = {}  # 存活的组，按注册顺序（字典当有序集合用）
+        self._active_describe_order: Dict[str, None] = {}  # 本回合描述顺序中存活的组
+        self._submitted: Set[str] = set()  # 本回合已提交描述的组
+        self._vote_tally: Dict[str, int] = {}  # 本回合实时票数 {group: votes}，随 submit_vote 更新
         self.scores: Dict[str, int] = {}  # 得分 {group: score}
         self.reports: List[Dict] = []  # 异常上报记录
         self.last_vote_result: Optional[Dict] = None  # 最近一次投票结果
         self.round_start_time: Optional[datetime] = None  # 回合开始时间
         self.description_timeout = 3  # 描述超时时间（秒）
+        self.describe_deadlines: Dict[str, Tuple[float, float]] = {}  # 本回合每组的描述时间窗口 {group: (开始, 结束)}，单调时钟
+        self._public_deadlines: Dict[str, List[float]] = {}  # 同一张窗口表换算成服务器时间戳（秒）公开给游戏方
+        self._epoch_offset = time.time() - clock()  # 墙上时间减单调时间，用于把其他截止时间换算成服务器时间戳
+        self._turn_index = 0  # 当前轮到描述的组在 describe_order 中的位置
+        # 房间设置（重置游戏后保留）
+        self.auto_advance = False  # 本回合最后一个投票者投票后自动处理投票结果
+        self.auto_next_round = False  # 回合结束后自动开始下一回合
+        self.next_round_delay = 5.0  # 自动开始下一回合前留给各组查看结果的时间（秒）
+        self._next_round_at: Optional[float] = None  # 自动开始下一回合的时间点，单调时钟
+        self.version = 0  # 状态版本号，每个事件使其加一（重置游戏也不会归零）
+        self._listeners: List[Callable[[int, str, Dict], None]] = []  # 状态变更监听器
+        self._journal: Optional[Callable[[Dict], None]] = None  # 操作日志写入函数
+        self._replay_record: Optional[Dict] = None  # 正在重放的日志记录，重放期间不为None
+        self._replay_now: float = 0.0  # 正在重放的记录发生时刻（换算到本进程的单调时钟）
+        self._replay_silent = False  # 重放时是否跳过快照构建和监听器通知
+        self.snapshot: GameSnapshot = self._build_snapshot()  # 最新发布的只读快照
+        
+    def add_listener(self, callback: Callable[[int, str, Dict], None]):
+        """
+        注册状态变更监听器
+        :param callback: 回调函数，参数为 (版本号, 事件类型, 事件数据)；在调用方持有的锁内同步执行，不能阻塞
+        """
+        self._listeners.append(callback)
+    
+    def set_journal(self, journal: Optional[Callable[[Dict], None]]):
+        """
+        设置操作日志：每个成功改变状态的操作都会以一条记录调用 journal（调用方持有的锁内执行）
+        记录包含操作参数和随机/时间相关的结果，重放时据此得到完全相同的状态
+        :param journal: 写入函数，例如 EventLog.append；None 表示不记录
+        """
+        self._journal = journal
+    
+    def _record(self, op: str, **fields):
+        """写入一条操作记录（重放期间不写）"""
+        if self._journal is not None and self._replay_record is None:
+            self._journal({"op": op, "t": time.time(), **fields})
+    
+    def _replayed(self, key: str, produce: Callable[[], Any]) -> Any:
+        """重放时取日志中记录的值，否则调用 produce 生成（随机结果、墙上时间等）"""
+        if self._replay_record is not None:
+            return self._replay_record[key]
+        return produce()
+    
+    def _now(self) -> float:
+        """当前单调时间；重放时为记录发生的时刻"""
+        if self._replay_record is not None:
+            return self._replay_now
+        return self._clock()
+    
+    def replay(self, records: Iterable[Dict], notify: bool = False) -> int:
+        """
+        重放操作日志，重建状态
+        所有状态变化（包括描述窗口到期的推进）都有对应的记录，重放结果只取决于记录序列，
+        同一序列在任何进程中重放得到相同的状态和版本号；描述时间窗口按记录的墙上时间换算到本进程的单调时钟
+        :param records: 操作记录，按写入顺序
+        :param notify: 是否像正常操作一样发布快照并通知监听器（追上其他进程写入的记录时使用）；
+                       启动时整体重放传 False，结束后只构建一次快照
+        :return: 重放的记录数
+        """
+        handlers = {
+            "register": lambda r: self.register_group(r["group"]),
+            "start_game": lambda r: self.start_game(r["undercover_word"], r["civilian_word"]),
+            "start_round": lambda r: self.start_round(),
+            "describe": lambda r: self.submit_description(r["group"], r["description"]),
+            "vote": lambda r: self.submit_vote(r["voter"], r["target"]),
+            "process": lambda r: self.process_voting_result(),
+            "report": lambda r: self.add_report(r["group"], r["type"], r["detail"]),
+            "settings": lambda r: self.update_settings(**r["settings"]),
+            "reset": lambda r: self.reset_game(),
+            "advance": lambda r: self.advance_phase(),
+        }
+        clock_offset = self._clock() - time.time()
+        count = 0
+        self._replay_silent = not notify
+        try:
+            for record in records:
+                handler = handlers.get(record.get("op"))
+                if handler is None:
+                    continue
+                self._replay_record = record
+                self._replay_now = record["t"] + clock_offset
+                handler(record)
+                count += 1
+        finally:
+            self._replay_record = None
+            self._replay_silent = False
+        if not notify:
+            self.snapshot = self._build_snapshot()
+        return count
+
+    def fork(self) -> "GameLogic":
+        """
+        复制一份独立的游戏状态用于试运行
+        副本没有监听器和操作日志，状态变更时不构建快照；在副本上执行的操作不影响本实例
+        :return: 游戏逻辑副本
+        """
+        excluded = ("_clock", "_listeners", "_journal", "snapshot")
+        trial = copy.copy(self)
+        # 一次整体深拷贝，保留容器之间的共享引用
+        state = copy.deepcopy({name: value for name, value in self.__dict__.items() if name not in excluded})
+        trial.__dict__.update(state)
+        trial._listeners = []
+        trial._journal = None
+        trial._replay_silent = True
+        return trial
+
+    def apply_records(self, records: List[Dict]) -> int:
+        """
+        应用在副本（fork）上试运行得到的操作记录：按记录重放并通知监听器，同时写入本实例的操作日志
+        :param records: 操作记录，按产生顺序
+        :return: 应用的记录数
+        """
+        count = self.replay(records, notify=True)
+        if self._journal is not None:
+            for record in records:
+                self._journal(record)
+        return count
+
+    def _emit(self, event_type: str, data: Dict):
+        """
+        状态发生变更：版本号加一并向监听器发布类型化事件
+        事件数据必须是新构造的对象，不能引用内部可变状态
+        """
+        self.version += 1
+        if self._replay_silent:
+            # 启动时重放只重建状态，结束后统一构建一次快照
+            return
+        # 先发布快照再通知监听器，被唤醒的读取方能看到本次变更
+        self.snapshot = self._build_snapshot()
+        for callback in self._listeners:
+            callback(self.version, event_type, data)
+    
+    def _build_snapshot(self) -> GameSnapshot:
+        """
+        按当前状态构造快照
+        只复制之后会被原地修改的容器；描述条目、上报条目和投票结果创建后不再修改，可以在快照间共享
+        """
+        public_status = self.get_public_status()
+        public_status["describe_order"] = list(public_status["describe_order"])
+        public_status["eliminated_groups"] = list(self.eliminated_groups)
+        
+        game_state = self.get_game_state()
+        game_state.update({
+            "describe_order": list(self.describe_order),
+            "eliminated_groups": list(self.eliminated_groups),
+            "scores": dict(self.scores),
+            "descriptions": {round_num: list(entries) for round_num, entries in self.descriptions.items()},
+            "votes": {round_num: dict(round_votes) for round_num, round_votes in self.votes.items()},
+            "reports": list(self.reports)
+        })
+        
+        return GameSnapshot(
+            version=self.version,
+            public_status=public_status,
+            descriptions={
+                "round": self.current_round,
+                "descriptions": list(self.get_current_round_descriptions())
+            },
+            last_result=self.last_vote_result,
+            groups=self.get_groups_info(),
+            game_state=game_state
+        )
+    
+    def _eliminate(self, group_names: List[str]):
+        """淘汰若干组，同步更新派生状态"""
+        for group_name in group_names:
+            if group_name in self._eliminated:
+                continue
+            self.eliminated_groups.append(group_name)
+            self._eliminated.add(group_name)
+            self._active_groups.pop(group_name, None)
+            self._active_describe_order.pop(group_name, None)
+    
+    def is_active(self, group_name: str) -> bool:
+        """组是否已注册且未被淘汰"""
+        return group_name in self._active_groups
+    
+    def get_active_groups(self) -> List[str]:
+        """存活的组（按注册顺序）"""
+        return list(self._active_groups)
+    
+    def is_eligible_voter(self, group_name: str) -> bool:
+        """
+        是否是本回合的投票者：本回合描述顺序中仍存活的组
+        回合开始后才注册的组不参加本回合，既不能投票，也不计入“所有人都已投票”的人数
+        """
+        return group_name in self._active_describe_order
+    
+    def get_active_describe_order(self) -> List[str]:
+        """本回合描述顺序中存活的组"""
+        return list(self._active_describe_order)
+    
+    def get_settings(self) -> Dict:
+        """房间设置"""
+        return {
+            "auto_advance": self.auto_advance,
+            "auto_next_round": self.auto_next_round,
+            "next_round_delay": self.next_round_delay
+        }
+    
+    def update_settings(self, auto_advance: Optional[bool] = None, auto_next_round: Optional[bool] = None,
+                        next_round_delay: Optional[float] = None) -> Dict:
+        """
+        更新房间设置，参数为None的项保持不变
+        :param auto_advance: 是否在本回合最后一个投票者投票后自动处理投票结果
+        :param auto_next_round: 是否在回合结束后自动开始下一回合
+        :param next_round_delay: 自动开始下一回合前的等待秒数
+        :return: 更新后的设置
+        """
+        if auto_advance is not None:
+            self.auto_advance = auto_advance
+        if auto_next_round is not None:
+            self.auto_next_round = auto_next_round
+        if next_round_delay is not None:
+            self.next_round_delay = next_round_delay
+        
+        # 已经处于回合结束阶段时，按新设置安排或取消自动开始下一回合
+        if self.game_status == GameStatus.ROUND_END and self.auto_next_round:
+            self._next_round_at = self._now() + self.next_round_delay
+        else:
+            self._next_round_at = None
         
+        settings = self.get_settings()
+        self._record("settings", settings=dict(settings))
+        self._emit("settings", dict(settings))
+        return settings
+    
+    def _set_status(self, status: GameStatus):
+        """切换游戏阶段，阶段变化时发布 status 事件"""
+        if self.game_status == status:
+            return
+        self.game_status = status
+        self._emit("status", {"status": status.value, "round": self.current_round})
+    
     def register_group(self, group_name: str) -> bool:
         """
         注册游戏组
@@ -54,11 +320,15 @@ class GameLogic:
             "name": group_name,
             "role": None,  # "undercover" 或 "civilian"
             "word": "",
-            "registered_time": datetime.now().isoformat()
+            "registered_time": self._replayed("time", lambda: datetime.now().isoformat())
         }
+        self._active_groups[group_name] = None
+        self._record("register", group=group_name, time=self.groups[group_name]["registered_time"])
         
-        if len(self.groups) > 0:
-            self.game_status = GameStatus.REGISTERED
+        self._emit("group_registered", {"group": group_name, "total_groups": len(self.groups)})
+        if self.game_status == GameStatus.WAITING:
+            # 游戏进行中注册的组不改变当前阶段（不参加进行中的回合，见 is_eligible_voter）
+            self._set_status(GameStatus.REGISTERED)
         
         return True
     
@@ -79,7 +349,9 @@ class GameLogic:
         
         # 随机选择卧底
         group_names = list(self.groups.keys())
-        self.undercover_group = random.choice(group_names)
+        self.undercover_group = self._replayed("undercover", lambda: random.choice(group_names))
+        self._record("start_game", undercover_word=undercover_word, civilian_word=civilian_word,
+                     undercover=self.undercover_group)
         
         # 分配身份和词语
         for group_name in group_names:
@@ -92,7 +364,7 @@ class GameLogic:
         
         self.current_round = 1
         self.scores = {group_name: 0 for group_name in group_names}
-        self.game_status = GameStatus.WORD_ASSIGNED
+        self._set_status(GameStatus.WORD_ASSIGNED)
         return True
     
     def start_round(self) -> List[str]:
@@ -104,22 +376,49 @@ class GameLogic:
             return []
         
         # 获取未淘汰的组
-        active_groups = [g for g in self.groups.keys() if g not in self.eliminated_groups]
-        if len(active_groups) < 2:
+        if len(self._active_groups) < 2:
             return []
         
         # 随机排序
-        self.describe_order = active_groups.copy()
+        self.describe_order = list(self._active_groups)
         random.shuffle(self.describe_order)
+        self.describe_order = self._replayed("order", lambda: self.describe_order)
+        self.description_timeout = self._replayed("timeout", lambda: self.description_timeout)
+        self._active_describe_order = dict.fromkeys(self.describe_order)
         
         # 初始化本回合的描述和投票
         self.descriptions[self.current_round] = []
         self.votes[self.current_round] = {}
+        self._submitted = set()
+        self._vote_tally = {}
+        self._next_round_at = None
         
-        # 记录回合开始时间
+        # 记录回合开始时间，预先计算每个组的时间窗口：
+        # 第 i 个组的窗口为回合开始后 [i*3, (i+1)*3) 秒
         self.round_start_time = datetime.now()
+        round_start = self._now()
+        self.describe_deadlines = {
+            group_name: (round_start + index * self.description_timeout,
+                         round_start + (index + 1) * self.description_timeout)
+            for index, group_name in enumerate(self.describe_order)
+        }
+        # 公开的窗口表以记录的回合开始时间戳为准，所有进程重放得到完全相同的值
+        if self._replay_record is not None:
+            started_at = self._replay_record.get("started_at", self._replay_record["t"])
+        else:
+            started_at = time.time()
+        self._epoch_offset = started_at - round_start
+        self._public_deadlines = {
+            group_name: [self._to_epoch(start), self._to_epoch(end)]
+            for group_name, (start, end) in self.describe_deadlines.items()
+        }
+        self._turn_index = 0
+        self._record("start_round", order=list(self.describe_order), timeout=self.description_timeout,
+                     started_at=started_at)
         
-        self.game_status = GameStatus.DESCRIBING
+        self._emit("round_started", {"round": self.current_round, "describe_order": list(self.describe_order)})
+        self._set_status(GameStatus.DESCRIBING)
+        self._emit("describe_turn", {"round": self.current_round, "group": self.describe_order[0], "index": 0})
         return self.describe_order
     
     def submit_description(self, group_name: str, description: str) -> bool:
@@ -131,44 +430,36 @@ class GameLogic:
         """
         if self.game_status != GameStatus.DESCRIBING:
             return False
-        if group_name not in self.describe_order:
-            return False
-        if group_name in self.eliminated_groups:
+        if group_name not in self._active_describe_order:
+            # 不在本回合描述顺序中，或已被淘汰
             return False
         
         # 检查是否已经提交过
-        for desc in self.descriptions[self.current_round]:
-            if desc["group"] == group_name:
-                return False
+        if group_name in self._submitted:
+            return False
         
-        # 检查时间限制：每个组有3秒时间提交描述
-        # 计算该组在顺序中的位置，从回合开始时间计算
-        if self.round_start_time:
-            elapsed_time = (datetime.now() - self.round_start_time).total_seconds()
-            # 找到该组在顺序中的位置
-            try:
-                group_index = self.describe_order.index(group_name)
-                # 每个组有3秒时间窗口，从回合开始后 group_index * 3 秒开始
-                group_start_time = group_index * self.description_timeout
-                group_end_time = group_start_time + self.description_timeout
-                
-                if elapsed_time > group_end_time:
-                    # 超时了
-                    return False
-            except ValueError:
-                # 组不在顺序中
-                return False
+        # 检查时间限制：每个组有3秒时间提交描述，窗口在 start_round 中预先计算
+        window = self.describe_deadlines.get(group_name)
+        if window is None:
+            # 组不在顺序中
+            return False
+        if self._now() >= window[1] and self._replay_record is None:
+            # 超时了（重放的记录当时已经通过检查）
+            return False
         
-        self.descriptions[self.current_round].append({
+        entry = {
             "group": group_name,
             "description": description,
-            "time": datetime.now().isoformat()
-        })
+            "time": self._replayed("time", lambda: datetime.now().isoformat())
+        }
+        self.descriptions[self.current_round].append(entry)
+        self._submitted.add(group_name)
+        self._record("describe", group=group_name, description=description, time=entry["time"])
+        self._emit("description", dict(entry, round=self.current_round))
         
         # 检查是否所有人都提交了
-        active_groups = [g for g in self.describe_order if g not in self.eliminated_groups]
-        if len(self.descriptions[self.current_round]) >= len(active_groups):
-            self.game_status = GameStatus.VOTING
+        if len(self._submitted) >= len(self._active_describe_order):
+            self._set_status(GameStatus.VOTING)
         
         return True
     
@@ -191,13 +482,10 @@ class GameLogic:
         if not isinstance(self.current_round, int) or self.current_round < 0:
             return False
         
-        if voter_group in self.eliminated_groups:
+        # 投票者必须参加了本回合，目标组必须已注册且存活
+        if not self.is_eligible_voter(voter_group):
             return False
-        if target_group in self.eliminated_groups:
-            return False
-        if voter_group not in self.groups:
-            return False
-        if target_group not in self.groups:
+        if not self.is_active(target_group):
             return False
         if voter_group == target_group:  # 不能投自己
             return False
@@ -206,17 +494,25 @@ class GameLogic:
         if self.current_round not in self.votes:
             self.votes[self.current_round] = {}
         
-        # 检查是否已经投过票了
+        # 检查是否已经投过票了（本回合的投票字典即已投票组的集合）
         if voter_group in self.votes[self.current_round]:
             return False
         
-        # 检查目标组是否在存活组中
-        active_groups = [g for g in self.groups.keys() if g not in self.eliminated_groups]
-        if target_group not in active_groups:
-            return False
-        
         # 所有检查通过，记录投票
         self.votes[self.current_round][voter_group] = target_group
+        self._vote_tally[target_group] = self._vote_tally.get(target_group, 0) + 1
+        self._record("vote", voter=voter_group, target=target_group)
+        
+        # 只公开投票进度，不公开投票对象
+        voted_count = len(self.votes[self.current_round])
+        total_voters = len(self._active_describe_order)  # 与 process_voting_result 使用同一个投票者集合
+        self._emit("vote", {"round": self.current_round, "voter": voter_group,
+                            "voted": voted_count, "total": total_voters})
+        if voted_count >= total_voters:
+            self._emit("votes_complete", {"round": self.current_round})
+            # 重放时自动结算不单独执行，日志中紧随其后的 process 记录会完成结算
+            if self.auto_advance and self._replay_record is None:
+                self.process_voting_result()
         return True
     
     def process_voting_result(self) -> Dict:
@@ -228,16 +524,14 @@ class GameLogic:
             return {"error": "当前不在投票阶段"}
         
         round_votes = self.votes[self.current_round]
-        active_groups = [g for g in self.describe_order if g not in self.eliminated_groups]
         
-        # 检查是否所有人都投票了
-        if len(round_votes) < len(active_groups):
+        # 检查是否所有人都投票了（投票者为本回合描述顺序中存活的组，见 is_eligible_voter）
+        if len(round_votes) < len(self._active_describe_order):
             return {"error": "还有组未投票"}
         
-        # 统计票数
-        vote_count: Dict[str, int] = {}
-        for target in round_votes.values():
-            vote_count[target] = vote_count.get(target, 0) + 1
+        # 票数在投票时已实时统计
+        vote_count = dict(self._vote_tally)
+        self._record("process")
         
         # 找出得票最多的组
         max_votes = max(vote_count.values()) if vote_count else 0
@@ -257,68 +551,75 @@ class GameLogic:
         if len(max_voted_groups) == 1:
             # 情况a：票数最多的有1组
             eliminated = max_voted_groups[0]
-            self.eliminated_groups.append(eliminated)
+            self._eliminate([eliminated])
             result["eliminated"] = [eliminated]
             
             if eliminated == self.undercover_group:
                 # 卧底被淘汰，游戏结束
                 result["game_ended"] = True
                 result["winner"] = "civilian"
-                self.game_status = GameStatus.GAME_END
+                self._set_status(GameStatus.GAME_END)
                 self._calculate_scores()
             else:
                 # 平民被淘汰，继续游戏
-                remaining_civilians = [g for g in self.groups.keys() 
-                                     if g not in self.eliminated_groups and g != self.undercover_group]
-                if len(remaining_civilians) == 0:
+                remaining_civilians = len(self._active_groups) - (self.undercover_group in self._active_groups)
+                if remaining_civilians == 0:
                     # 平民全部淘汰，游戏结束
                     result["game_ended"] = True
                     result["winner"] = "undercover"
-                    self.game_status = GameStatus.GAME_END
+                    self._set_status(GameStatus.GAME_END)
                     self._calculate_scores()
                 else:
                     # 继续下一轮
                     self.current_round += 1
-                    self.game_status = GameStatus.ROUND_END
+                    self._set_status(GameStatus.ROUND_END)
                     
         elif len(max_voted_groups) == 3:
             # 情况b：得票最多有3组（新规则）
             all_civilians = all(g != self.undercover_group for g in max_voted_groups)
             if all_civilians:
                 # 都是平民，3组都淘汰，游戏结束
-                self.eliminated_groups.extend(max_voted_groups)
+                self._eliminate(max_voted_groups)
                 result["eliminated"] = max_voted_groups
                 result["game_ended"] = True
                 result["winner"] = "undercover"
-                self.game_status = GameStatus.GAME_END
+                self._set_status(GameStatus.GAME_END)
                 self._calculate_scores()
             else:
                 # 包含卧底，进入下一轮
                 self.current_round += 1
-                self.game_status = GameStatus.ROUND_END
+                self._set_status(GameStatus.ROUND_END)
         elif len(max_voted_groups) == 2:
             # 情况c：票数最多的组有2组（新规则），进入下一轮
             self.current_round += 1
-            self.game_status = GameStatus.ROUND_END
+            self._set_status(GameStatus.ROUND_END)
         else:
             # 其他情况（得票最多的组超过3组），进入下一轮
             self.current_round += 1
-            self.game_status = GameStatus.ROUND_END
+            self._set_status(GameStatus.ROUND_END)
+        
+        if self.game_status == GameStatus.ROUND_END and self.auto_next_round:
+            self._next_round_at = self._now() + self.next_round_delay
         
         self.last_vote_result = result
+        self._emit("vote_result", copy.deepcopy(result))
         return result
 
     def add_report(self, group_name: str, report_type: str, detail: str) -> Dict:
         """记录异常报告"""
-        ticket = f"RPT-{datetime.now().strftime('%Y%m%d%H%M%S')}-{len(self.reports)+1:03d}"
+        ticket = self._replayed(
+            "ticket", lambda: f"RPT-{datetime.now().strftime('%Y%m%d%H%M%S')}-{len(self.reports)+1:03d}")
         entry = {
             "ticket": ticket,
             "group": group_name or "unknown",
             "type": report_type,
             "detail": detail,
-            "time": datetime.now().isoformat()
+            "time": self._replayed("time", lambda: datetime.now().isoformat())
         }
         self.reports.append(entry)
+        self._record("report", group=group_name, type=report_type, detail=detail,
+                     ticket=ticket, time=entry["time"])
+        self._emit("report", {"ticket": ticket, "group": entry["group"], "type": report_type})
         return entry
     
     def _calculate_scores(self):
@@ -330,9 +631,8 @@ class GameLogic:
         survival_score = self.current_round
         
         # 计算胜利分
-        remaining_civilians = [g for g in self.groups.keys() 
-                             if g not in self.eliminated_groups and g != self.undercover_group]
-        victory_score = 3 if len(remaining_civilians) == 1 else 0
+        remaining_civilians = len(self._active_groups) - (self.undercover_group in self._active_groups)
+        victory_score = 3 if remaining_civilians == 1 else 0
         
         # 卧底得分 = 胜利分 + 生存分（求和，不再是取较大值）
         self.scores[self.undercover_group] = victory_score + survival_score
@@ -350,7 +650,7 @@ class GameLogic:
             "groups": {name: {
                 "name": info["name"],
                 "role": info["role"],
-                "eliminated": name in self.eliminated_groups
+                "eliminated": name in self._eliminated
             } for name, info in self.groups.items()},
             "undercover_group": self.undercover_group if self.game_status != GameStatus.WAITING else None,
             "current_round": self.current_round,
@@ -360,39 +660,99 @@ class GameLogic:
             "descriptions": self.descriptions,
             "votes": self.votes,
             "reports": self.reports,
-            "last_vote_result": self.last_vote_result  # 添加最近一次投票结果
+            "last_vote_result": self.last_vote_result,  # 添加最近一次投票结果
+            "settings": self.get_settings()
         }
 
+    def next_deadline(self) -> Optional[float]:
+        """
+        下一次需要自动切换阶段的时间点（单调时钟）
+        :return: 描述阶段返回当前描述组的窗口结束时间，回合结束阶段返回自动开始下一回合的时间，其他情况返回None
+        """
+        if self.game_status == GameStatus.ROUND_END:
+            return self._next_round_at
+        if self.game_status != GameStatus.DESCRIBING:
+            return None
+        if self._turn_index >= len(self.describe_order):
+            return None
+        return self.describe_deadlines[self.describe_order[self._turn_index]][1]
+
+    def advance_phase(self, now: Optional[float] = None) -> bool:
+        """
+        按时钟推进阶段：处理已到期的组时间窗口，所有窗口结束后进入投票阶段；
+        开启自动开始下一回合时，到点从回合结束阶段开始新回合
+        由截止时间调度器在 next_deadline() 时刻调用；推进结果写入 advance 记录，重放时推进到记录的位置而不再比较时间
+        :param now: 当前单调时间，默认读取时钟
+        :return: 是否发生了状态变化
+        """
+        if now is None:
+            now = self._clock()
+        if self.game_status == GameStatus.ROUND_END:
+            # 重放时自动开始的回合由日志中的 start_round 记录重建
+            if self._next_round_at is None or now < self._next_round_at or self._replay_record is not None:
+                return False
+            self._next_round_at = None
+            return bool(self.start_round())
+        if self.game_status != GameStatus.DESCRIBING:
+            return False
+        
+        changed = False
+        while self._turn_index < len(self.describe_order):
+            group_name = self.describe_order[self._turn_index]
+            if self._replay_record is not None:
+                if self._turn_index >= self._replay_record["turn"]:
+                    break
+            elif now < self.describe_deadlines[group_name][1]:
+                break
+            # 先推进位置再发布事件，保证监听器看到的 next_deadline() 已经是下一个窗口
+            self._turn_index += 1
+            changed = True
+            if group_name not in self._submitted:
+                self._emit("describe_timeout", {"round": self.current_round, "group": group_name})
+            if self._turn_index < len(self.describe_order):
+                self._emit("describe_turn", {"round": self.current_round,
+                                             "group": self.describe_order[self._turn_index],
+                                             "index": self._turn_index})
+        
+        # 所有组的时间窗口都过了（即使没有提交），自动进入投票阶段
+        if self._turn_index >= len(self.describe_order):
+            self._set_status(GameStatus.VOTING)
+            changed = True
+        if changed:
+            self._record("advance", turn=self._turn_index)
+        return changed
+
     def get_public_status(self) -> Dict:
         """面向游戏方的公开状态"""
-        active_groups = [g for g in self.groups.keys() if g not in self.eliminated_groups]
-        
-        # 检查描述阶段是否应该自动进入投票阶段
-        if self.game_status == GameStatus.DESCRIBING:
-            active_groups_in_order = [g for g in self.describe_order if g not in self.eliminated_groups]
-            submitted_count = len(self.descriptions.get(self.current_round, []))
-            
-            # 情况1：所有人都提交了描述
-            if submitted_count >= len(active_groups_in_order):
-                self.game_status = GameStatus.VOTING
-            # 情况2：所有组的时间窗口都过了（即使没有提交）
-            elif self.round_start_time:
-                elapsed_time = (datetime.now() - self.round_start_time).total_seconds()
-                # 计算最后一个组的时间窗口结束时间
-                # 如果有N个组，最后一个组的时间窗口是 (N-1)*3 到 N*3 秒
-                max_time = len(active_groups_in_order) * self.description_timeout
-                if elapsed_time > max_time:
-                    # 所有组的时间窗口都过了，自动进入投票阶段
-                    self.game_status = GameStatus.VOTING
-        
+        current_describer = None
+        if self.game_status == GameStatus.DESCRIBING and self._turn_index < len(self.describe_order):
+            current_describer = self.describe_order[self._turn_index]
+        
+        in_round = self.game_status in [GameStatus.DESCRIBING, GameStatus.VOTING]
+        if self.game_status == GameStatus.DESCRIBING and current_describer is not None:
+            deadline = self._public_deadlines[current_describer][1]
+        elif self.game_status == GameStatus.ROUND_END and self._next_round_at is not None:
+            deadline = self._to_epoch(self._next_round_at)
+        else:
+            deadline = None
         return {
             "status": self.game_status.value,
             "round": self.current_round,
-            "active_groups": active_groups,
-            "describe_order": self.describe_order if self.game_status in [GameStatus.DESCRIBING, GameStatus.VOTING] else [],
+            "active_groups": list(self._active_groups),
+            "describe_order": self.describe_order if in_round else [],
             "eliminated_groups": self.eliminated_groups,
-            "deadline": None  # 可选：预留倒计时
+            # 下一次自动切换阶段的时间（当前描述组的窗口结束，或自动开始下一回合），服务器时间戳（秒）
+            "deadline": deadline,
+            # 本回合每组的描述时间窗口 {group: [开始, 结束]}，服务器时间戳（秒），配合 /api/time 换算成本机时间
+            "describe_deadlines": {group_name: list(window) for group_name, window in self._public_deadlines.items()}
+            if in_round else {},
+            "current_describer": current_describer,
+            "version": self.version
         }
+
+    def _to_epoch(self, monotonic_time: float) -> float:
+        """单调时钟时间换算成服务器墙上时间戳（秒，保留毫秒）"""
+        return round(monotonic_time + self._epoch_offset, 3)
     
     def get_current_round_descriptions(self) -> List[Dict]:
         """获取当前回合的所有描述（游戏方可见）"""
@@ -403,6 +763,20 @@ class GameLogic:
     def get_last_result(self) -> Optional[Dict]:
         """最近一轮的公开投票结果"""
         return self.last_vote_result
+
+    def get_groups_info(self) -> Dict:
+        """所有注册的组及其淘汰情况"""
+        groups_info = []
+        for name, info in self.groups.items():
+            groups_info.append({
+                "name": name,
+                "registered_time": info["registered_time"],
+                "eliminated": name in self._eliminated
+            })
+        return {
+            "groups": groups_info,
+            "total": len(groups_info)
+        }
     
     def get_group_word(self, group_name: str) -> Optional[str]:
         """获取指定组的词语（仅在该组查询时返回）"""
@@ -422,7 +796,45 @@ class GameLogic:
         self.descriptions.clear()
         self.votes.clear()
         self.eliminated_groups = []
+        self._eliminated = set()
+        self._active_groups = {}
+        self._active_describe_order = {}
+        self._submitted = set()
+        self._vote_tally = {}
+        self._next_round_at = None
         self.scores.clear()
         self.reports = []
         self.last_vote_result = None
+        self.round_start_time = None
+        self.describe_deadlines = {}
+        self._public_deadlines = {}
+        self._turn_index = 0
+        # 设置和版本号在重置后保留，写进重置记录，重放时可以从最后一次重置开始
+        self._record("reset", settings=self.get_settings(), version=self.version)
+        if self._replay_record is not None:
+            self.auto_advance = self._replay_record["settings"]["auto_advance"]
+            self.auto_next_round = self._replay_record["settings"]["auto_next_round"]
+            self.next_round_delay = self._replay_record["settings"]["next_round_delay"]
+            self.version = self._replay_record["version"]
+        self._emit("reset", {"status": self.game_status.value})
+
 
+# 测试代码
+if __name__ == '__main__':
+    # 回合开始后才注册的组：不能投票，也不会让开启了自动推进的回合一直等它投票
+    game = GameLogic(clock=lambda: 0.0)  # 固定时钟，描述窗口不会超时
+    for name in ["组1", "组2", "组3"]:
+        game.register_group(name)
+    game.start_game("卧底词", "平民词")
+    game.update_settings(auto_advance=True)
+    order = game.start_round()
+    assert game.register_group("组4"), "游戏进行中允许注册"
+    for name in order:
+        game.submit_description(name, f"{name}的描述")
+    assert game.game_status == GameStatus.VOTING
+    assert not game.is_eligible_voter("组4") and not game.submit_vote("组4", order[0])
+    for voter in order:
+        game.submit_vote(voter, next(name for name in order if name != voter))
+    assert game.game_status != GameStatus.VOTING, "本回合的投票者都投票后应自动结算"
+    assert game.last_vote_result and game.last_vote_result["round"] == 1
+    print("回合中途注册的组不影响自动结算：通过")
@@ -0,0 +1,14 @@
+"""
+gunicorn 配置（生产环境）：gunicorn -c gunicorn.conf.py wsgi:app
+长轮询和事件推送会长时间占用一个线程，因此使用线程工作模式，并给每个进程较多线程
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WORKERS", min(multiprocessing.cpu_count(), 4)))
+worker_class = "gthread"
+threads = int(os.environ.get("THREADS", 32))
+timeout = 60  # 长轮询最多挂起30秒，事件流每15秒有心跳
+keepalive = 30
+preload_app = False  # 每个工作进程在 fork 之后自己初始化共享状态
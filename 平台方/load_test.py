@@ -0,0 +1,354 @@
+"""
+负载测试工具（由 test_client.py 的手动测试流程扩展而来）
+模拟 N 个房间 × 每房间 M 个组同时进行完整对局：
+  主持方 - 创建房间、开启自动推进（最后一票自动结算、自动开始下一回合）、开始游戏和第一回合
+  游戏方 - 注册、轮询状态、获取词语、在自己的描述窗口内提交描述、投票，每一步之间有随机思考时间
+每个游戏方线程使用一个保持连接的会话（连接池），结束后报告：
+  吞吐、各接口的 p50/p95/p99 延迟和失败数、描述窗口错过率（提交被拒或窗口结束前没能提交）
+
+被测服务器：
+  --server http://127.0.0.1:5000  通过网络压测已启动的服务器（backend.py / wsgi.py / async_backend.py）
+  --in-process                    在本进程内加载 backend.py 的 Flask 应用，用测试客户端直接调用，不经过网络
+
+运行方式（在 平台方 目录下）：
+    python load_test.py --in-process --rooms 4 --groups 5 --duration 60
+    python load_test.py --server http://127.0.0.1:5000 --rooms 10 --groups 5 --think 0.5
+"""
+import argparse
+import os
+import random
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "host-secret")
+
+# 请求超时（秒）：长轮询之外的请求都应在此时间内完成
+REQUEST_TIMEOUT = 10
+
+# 测试用的词语
+WORDS = [("苹果", "梨"), ("咖啡", "奶茶"), ("钢琴", "吉他"), ("地铁", "公交"), ("足球", "篮球")]
+
+
+class HTTPTransport:
+    """通过网络访问服务器：一个保持连接的会话（同一线程内复用连接）"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method: str, path: str, json: Optional[Dict] = None, params: Optional[Dict] = None,
+                headers: Optional[Dict] = None) -> Tuple[int, Dict]:
+        response = self.session.request(method, self.base_url + path, json=json, params=params, headers=headers,
+                                        timeout=REQUEST_TIMEOUT)
+        return response.status_code, response.json()
+
+    def close(self):
+        self.session.close()
+
+
+class InProcessTransport:
+    """在本进程内调用 Flask 应用（测试客户端），不经过网络；每个线程使用自己的测试客户端"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method: str, path: str, json: Optional[Dict] = None, params: Optional[Dict] = None,
+                headers: Optional[Dict] = None) -> Tuple[int, Dict]:
+        response = self.client.open(path, method=method, json=json, query_string=params, headers=headers)
+        try:
+            return response.status_code, response.get_json()
+        finally:
+            response.close()
+
+    def close(self):
+        pass
+
+
+class Stats:
+    """一个线程的统计：各接口的延迟、失败数，描述窗口的命中情况（线程结束后合并）"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.failures: Dict[str, int] = {}
+        self.describes = 0  # 应当提交描述的次数
+        self.describe_misses = 0  # 提交被拒或窗口结束前没能提交
+        self.rounds = 0  # 完成的回合数（按主持方统计）
+        self.games = 0  # 结束的对局数
+
+    def record(self, endpoint: str, latency: float, ok: bool):
+        self.latencies.setdefault(endpoint, []).append(latency)
+        if not ok:
+            self.failures[endpoint] = self.failures.get(endpoint, 0) + 1
+
+    def merge(self, other: 'Stats'):
+        for endpoint, values in other.latencies.items():
+            self.latencies.setdefault(endpoint, []).extend(values)
+        for endpoint, count in other.failures.items():
+            self.failures[endpoint] = self.failures.get(endpoint, 0) + count
+        self.describes += other.describes
+        self.describe_misses += other.describe_misses
+        self.rounds += other.rounds
+        self.games += other.games
+
+
+class Client:
+    """带统计的接口调用：路径不带房间前缀，按房间自动加上 /api/rooms/<房间ID>"""
+
+    def __init__(self, transport, room_id: str, stats: Stats):
+        self.transport = transport
+        self.room_id = room_id
+        self.stats = stats
+
+    def call(self, method: str, rule: str, json: Optional[Dict] = None, params: Optional[Dict] = None,
+             admin: bool = False) -> Tuple[int, Optional[Dict]]:
+        """
+        :param rule: 接口路径（例如 /api/status），同时作为统计中的接口名
+        :return: (业务状态码, 响应数据)；网络错误返回 (0, None)
+        """
+        path = f"/api/rooms/{self.room_id}{rule[len('/api'):]}"
+        headers = {'X-Admin-Token': ADMIN_TOKEN} if admin else None
+        start = time.perf_counter()
+        try:
+            status, payload = self.transport.request(method, path, json=json, params=params, headers=headers)
+            code = (payload or {}).get('code', status)
+        except (requests.exceptions.RequestException, ValueError):
+            code, payload = 0, None
+        self.stats.record(f"{method} {rule}", time.perf_counter() - start, code == 200)
+        return code, (payload or {}).get('data') if code == 200 else None
+
+    def server_time_offset(self) -> float:
+        """服务器时间减本机时间（秒），用请求往返的中点估算"""
+        sent = time.time()
+        _, payload = self.transport.request('GET', '/api/time')
+        received = time.time()
+        return payload['data']['server_time'] - (sent + received) / 2
+
+
+class Simulation:
+    """一次负载测试：N 个房间的主持方线程和 N×M 个游戏方线程"""
+
+    def __init__(self, make_transport, rooms: int, groups: int, duration: float, think: float,
+                 poll_interval: float, max_rounds: int):
+        """
+        :param make_transport: 创建传输层的函数（每个线程调用一次）
+        :param think: 平均思考时间（秒），每次在 0.5~1.5 倍之间随机
+        :param poll_interval: 状态轮询间隔（秒）
+        :param max_rounds: 每个房间最多进行的回合数，达到后不再开始新对局
+        """
+        self.make_transport = make_transport
+        self.rooms = rooms
+        self.groups = groups
+        self.duration = duration
+        self.think = think
+        self.poll_interval = poll_interval
+        self.max_rounds = max_rounds
+        self.stop = threading.Event()
+        self.stats: List[Stats] = []
+        self._stats_lock = threading.Lock()
+
+    def think_time(self) -> float:
+        return self.think * random.uniform(0.5, 1.5)
+
+    def run(self) -> Tuple[Stats, float]:
+        """运行测试，返回 (合并后的统计, 实际时长)"""
+        tag = uuid.uuid4().hex[:6]
+        room_ids = [f"load-{tag}-{index}" for index in range(self.rooms)]
+        setup = self.make_transport()
+        for room_id in room_ids:
+            if self._create_room(setup, room_id) != 200:
+                raise RuntimeError(f"创建房间失败：{room_id}")
+
+        threads = []
+        for room_id in room_ids:
+            threads.append(threading.Thread(target=self._host, args=(room_id,), daemon=True))
+            for index in range(self.groups):
+                threads.append(threading.Thread(target=self._player, args=(room_id, f"组{index + 1}"), daemon=True))
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        self.stop.wait(self.duration)
+        self.stop.set()
+        for thread in threads:
+            thread.join(REQUEST_TIMEOUT + 5)
+        elapsed = time.perf_counter() - started
+
+        for room_id in room_ids:
+            setup.request('DELETE', f"/api/rooms/{room_id}", headers={'X-Admin-Token': ADMIN_TOKEN})
+        setup.close()
+        total = Stats()
+        for stats in self.stats:
+            total.merge(stats)
+        return total, elapsed
+
+    @staticmethod
+    def _create_room(transport, room_id: str) -> int:
+        status, payload = transport.request('POST', '/api/rooms', json={'room_id': room_id, 'name': room_id},
+                                            headers={'X-Admin-Token': ADMIN_TOKEN})
+        return (payload or {}).get('code', status)
+
+    def _new_client(self, room_id: str) -> Client:
+        stats = Stats()
+        with self._stats_lock:
+            self.stats.append(stats)
+        return Client(self.make_transport(), room_id, stats)
+
+    def _host(self, room_id: str):
+        """主持方：开启自动推进，所有组注册后开始游戏；一局结束后重置，各组重新注册后开下一局"""
+        client = self._new_client(room_id)
+        try:
+            client.call('POST', '/api/game/settings', admin=True,
+                        json={'auto_advance': True, 'auto_next_round': True, 'next_round_delay': 1.0})
+            while not self.stop.is_set() and client.stats.rounds < self.max_rounds:
+                if not self._wait_for_status(client, lambda status: len(status['active_groups']) >= self.groups):
+                    break
+                undercover_word, civilian_word = random.choice(WORDS)
+                client.call('POST', '/api/game/start', admin=True,
+                            json={'undercover_word': undercover_word, 'civilian_word': civilian_word})
+                self.stop.wait(self.think_time())  # 留时间让各组获取词语
+                client.call('POST', '/api/game/round/start', admin=True)
+                # 之后的回合由服务器自动推进，直到对局结束
+                rounds = [0]
+
+                def game_over(status):
+                    rounds[0] = status['round']
+                    return status['status'] == 'game_end'
+                finished = self._wait_for_status(client, game_over)
+                client.stats.rounds += rounds[0]
+                if not finished:
+                    break
+                client.stats.games += 1
+                client.call('POST', '/api/game/reset', admin=True)
+        finally:
+            client.transport.close()
+
+    def _wait_for_status(self, client: Client, predicate) -> bool:
+        """按轮询间隔查询状态直到满足条件，测试结束时返回 False"""
+        while not self.stop.is_set():
+            code, status = client.call('GET', '/api/status')
+            if code == 200 and predicate(status):
+                return True
+            self.stop.wait(self.poll_interval)
+        return False
+
+    def _player(self, room_id: str, group_name: str):
+        """游戏方：注册、轮询、描述、投票，直到测试结束"""
+        client = self._new_client(room_id)
+        try:
+            offset = client.server_time_offset()
+            registered = False
+            word_round = None  # 已获取词语的对局（按回合开始前的状态判断）
+            described_round = voted_round = 0
+            while not self.stop.is_set():
+                if not registered:
+                    self.stop.wait(self.think_time())
+                    code, _ = client.call('POST', '/api/register', json={'group_name': group_name})
+                    registered = code == 200
+                    continue
+
+                code, status = client.call('GET', '/api/status')
+                if code != 200:
+                    self.stop.wait(self.poll_interval)
+                    continue
+                state, current_round = status['status'], status['round']
+                if state in ('waiting', 'registered') and group_name not in status['active_groups']:
+                    registered = False  # 主持方重置了对局
+                    described_round = voted_round = 0
+                    word_round = None
+                    continue
+                if state == 'word_assigned' and word_round is None:
+                    self.stop.wait(self.think_time())
+                    client.call('GET', '/api/word', params={'group_name': group_name})
+                    word_round = current_round
+
+                if state == 'describing' and described_round != current_round and \
+                        group_name in status['describe_deadlines']:
+                    described_round = current_round
+                    self._describe(client, group_name, status['describe_deadlines'][group_name], offset)
+                    continue
+                if state == 'voting' and voted_round != current_round and group_name in status['active_groups']:
+                    voted_round = current_round
+                    targets = [name for name in status['active_groups'] if name != group_name]
+                    if targets:
+                        self.stop.wait(self.think_time())
+                        client.call('GET', '/api/descriptions')
+                        client.call('POST', '/api/vote', json={'voter_group': group_name,
+                                                               'target_group': random.choice(targets)})
+                    continue
+                self.stop.wait(self.poll_interval)
+        finally:
+            client.transport.close()
+
+    def _describe(self, client: Client, group_name: str, window: List[float], offset: float):
+        """等到自己的窗口开始，思考后提交描述；被拒或窗口已过都算错过"""
+        start, end = window[0] - offset, window[1] - offset  # 换算成本机时间
+        delay = start - time.time()
+        if delay > 0 and self.stop.wait(delay):
+            return
+        time.sleep(min(self.think_time(), 1.0))  # 描述窗口只有3秒，思考时间最多1秒
+        client.stats.describes += 1
+        code, _ = client.call('POST', '/api/describe',
+                              json={'group_name': group_name, 'description': f"{group_name}的描述"})
+        if code != 200 or time.time() >= end:
+            client.stats.describe_misses += 1
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def print_report(stats: Stats, elapsed: float, args):
+    total = sum(len(values) for values in stats.latencies.values())
+    print(f"房间: {args.rooms}  每房间组数: {args.groups}  时长: {elapsed:.1f}s  "
+          f"思考时间: {args.think}s  轮询间隔: {args.poll_interval}s")
+    print(f"请求: {total}  吞吐: {total / elapsed:,.1f} 请求/秒  "
+          f"进行回合: {stats.rounds}  结束对局: {stats.games}")
+    print(f"{'接口':<32}{'请求数':>8}{'失败':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}")
+    for endpoint in sorted(stats.latencies):
+        values = sorted(stats.latencies[endpoint])
+        print(f"{endpoint:<32}{len(values):>8}{stats.failures.get(endpoint, 0):>6}"
+              f"{percentile(values, 0.5) * 1000:>10.2f}{percentile(values, 0.95) * 1000:>10.2f}"
+              f"{percentile(values, 0.99) * 1000:>10.2f}")
+    miss_rate = stats.describe_misses / stats.describes if stats.describes else 0.0
+    print(f"描述: 应提交 {stats.describes}  错过 {stats.describe_misses}  错过率 {miss_rate:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="谁是卧底 - 负载测试（N 个房间 × M 个组的完整对局）")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--server", default="http://127.0.0.1:5000", help="服务器地址")
+    target.add_argument("--in-process", action="store_true", help="在本进程内加载 backend.py，不经过网络")
+    parser.add_argument("--rooms", type=int, default=4, help="房间数")
+    parser.add_argument("--groups", type=int, default=5, help="每个房间的组数（最多5）")
+    parser.add_argument("--duration", type=float, default=60.0, help="测试时长（秒）")
+    parser.add_argument("--think", type=float, default=0.5, help="平均思考时间（秒）")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="状态轮询间隔（秒）")
+    parser.add_argument("--max-rounds", type=int, default=1000, help="每个房间最多进行的回合数")
+    args = parser.parse_args()
+
+    if args.in_process:
+        os.environ.setdefault("EVENT_LOG_DIR", "")  # 不写事件日志
+        from backend import app, rooms
+        rooms.max_rooms = max(rooms.max_rooms, args.rooms + 1)
+
+        def make_transport():
+            return InProcessTransport(app)
+    else:
+        def make_transport():
+            return HTTPTransport(args.server)
+
+    simulation = Simulation(make_transport, args.rooms, args.groups, args.duration, args.think,
+                            args.poll_interval, args.max_rounds)
+    stats, elapsed = simulation.run()
+    print_report(stats, elapsed, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+结构化日志模块
+日志记录在调用线程里只做级别判断、采样和入队（不格式化、不写输出），
+由后台线程统一格式化成一行一条的 JSON 写到标准错误或文件，请求线程和房间锁内不会因为写日志而阻塞
+
+用法：
+    logger = logging.getLogger(__name__)
+    logger.info("投票成功", extra={"fields": {"voter": "A", "target": "B"}})
+    logger.debug("状态轮询", extra={"sample": "poll"})   # 高频事件按采样率只保留一部分
+"""
+import atexit
+import copy
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime
+from typing import Dict, Optional
+
+# 日志级别（环境变量 LOG_LEVEL，默认 INFO）
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+
+# 日志文件（环境变量 LOG_FILE），不设置时写到标准错误
+LOG_FILE = os.environ.get("LOG_FILE", "")
+
+# 高频事件的采样率：每 N 条保留 1 条；环境变量 LOG_SAMPLE_RATES 覆盖，例如 "poll=100,access=10"
+DEFAULT_SAMPLE_RATES = {"poll": 50}
+
+# 开发服务器访问日志中按 poll 采样的轮询接口
+POLL_PATHS = ("/status", "/round/view", "/game/state", "/descriptions", "/result")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[logging.Handler] = None
+
+
+def parse_sample_rates(text: str) -> Dict[str, int]:
+    """解析 "poll=100,access=10" 形式的采样率配置，格式错误的项忽略"""
+    rates = {}
+    for item in text.split(","):
+        key, _, value = item.partition("=")
+        try:
+            rates[key.strip()] = max(1, int(value))
+        except ValueError:
+            continue
+    return rates
+
+
+def sample_key(record: logging.LogRecord) -> Optional[str]:
+    """
+    记录的采样类别：extra 中的 sample 字段；Werkzeug 开发服务器对轮询接口的访问日志归为 poll
+    :return: 类别，不参与采样时返回 None
+    """
+    key = getattr(record, "sample", None)
+    if key is not None:
+        return key
+    if record.name == "werkzeug" and isinstance(record.args, tuple) and record.args:
+        request_line = str(record.args[0])
+        if request_line.startswith("GET "):
+            path = request_line[4:].split("?", 1)[0].split(" ", 1)[0]
+            if path.endswith(POLL_PATHS):
+                return "poll"
+    return None
+
+
+class SamplingFilter(logging.Filter):
+    """按类别采样：同一类别每 N 条保留 1 条，保留的记录带上 sampled=N 字段"""
+
+    def __init__(self, rates: Dict[str, int]):
+        super().__init__()
+        self.rates = rates
+        self._counters: Dict[str, itertools.count] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = sample_key(record)
+        if key is None:
+            return True
+        rate = self.rates.get(key, 1)
+        if rate <= 1:
+            return True
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters.setdefault(key, itertools.count())
+        if next(counter) % rate:
+            return False
+        record.sampled = rate
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """一条记录格式化成一行 JSON：时间、级别、模块、消息、extra 中的 fields，异常时附带完整堆栈"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName
+        }
+        fields = getattr(record, "fields", None)
+        if isinstance(fields, dict):
+            entry.update(fields)
+        sampled = getattr(record, "sampled", None)
+        if sampled is not None:
+            entry["sampled"] = sampled
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    入队前只把消息参数合并成字符串（参数可能是之后会被修改的游戏数据），
+    堆栈格式化留给后台线程，调用线程不做耗时的格式化
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        fields = getattr(record, "fields", None)
+        if isinstance(fields, dict):
+            record.fields = dict(fields)
+        return record
+
+
+def setup_logging(level: str = LOG_LEVEL, path: str = LOG_FILE,
+                  sample_rates: Optional[Dict[str, int]] = None) -> logging.handlers.QueueListener:
+    """
+    配置根日志记录器：队列处理器 + 后台写入线程（重复调用只配置一次）
+    :param level: 日志级别
+    :param path: 日志文件路径，空字符串表示写到标准错误
+    :param sample_rates: 各类别的采样率，默认使用 DEFAULT_SAMPLE_RATES 并按 LOG_SAMPLE_RATES 覆盖
+    :return: 后台写入线程（进程退出时由 stop_logging 停止并写完剩余日志）
+    """
+    global _listener, _handler
+    if _listener is not None:
+        return _listener
+    if sample_rates is None:
+        sample_rates = dict(DEFAULT_SAMPLE_RATES, **parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES", "")))
+
+    output = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter())
+    log_queue = queue.SimpleQueue()  # 无界队列，入队不会阻塞
+    _handler = _QueueHandler(log_queue)
+    _handler.addFilter(SamplingFilter(sample_rates))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_handler)
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """停止后台写入线程，写完队列中剩余的日志（进程退出时自动调用）"""
+    global _listener, _handler
+    if _listener is not None:
+        logging.getLogger().removeHandler(_handler)
+        _listener.stop()
+        _listener = _handler = None
@@ -0,0 +1,321 @@
+"""
+运行指标模块
+进程内的计数器、仪表和直方图，按 Prometheus 文本格式导出（/metrics）：
+各接口的耗时分布、处理中的请求数、房间锁的等待/持有时间、各组的请求数
+每次记录只是一次二分查找和一次无竞争的加锁累加，开销在微秒以内
+"""
+import bisect
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 是否启用指标采集（环境变量 METRICS_ENABLED=0 关闭，关闭后 /metrics 返回空内容）
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+
+# 接口耗时的直方图桶（秒）；长轮询最多挂起30秒
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 房间锁等待/持有时间的直方图桶（秒）
+LOCK_BUCKETS = (0.000001, 0.000005, 0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+# 组名标签的最大取值数，超过后计入 "other"，防止任意组名撑大指标
+MAX_GROUP_LABELS = 500
+
+# 不是已注册路由的路径统一使用的路由名；不存在的房间统一使用的房间名（路径中的任意值不会变成新的标签）
+UNMATCHED_ROUTE = "unmatched"
+UNKNOWN_ROOM = "unknown"
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    """带标签的指标，标签值按 labelnames 的顺序以元组传入"""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, object] = {}
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.extend(self._render_sample(labels, value))
+        return lines
+
+    def _render_sample(self, labels: Labels, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"]
+
+
+class Counter(Metric):
+    """单调递增计数"""
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    """可增可减的当前值"""
+    kind = "gauge"
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels: Labels = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+    def set(self, labels: Labels, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(Metric):
+    """分布统计：每个标签组合保存各桶计数（非累积）、总和与样本数"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(buckets))
+
+    def observe(self, labels: Labels, value: float):
+        index = bisect.bisect_left(self.bounds, value)  # 第一个 >= value 的桶（le 含等于）
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.bounds) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def _render_sample(self, labels: Labels, state) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), state[:-1]):
+            cumulative += count
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+        label_text = _format_labels(self.labelnames, labels)
+        lines.append(f"{self.name}_sum{label_text} {state[-1]!r}")
+        lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表，按注册顺序导出"""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus 文本格式（text/plain; version=0.0.4）"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class ServerMetrics:
+    """后端服务器的全部指标"""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self.registry = MetricsRegistry()
+        register = self.registry.register
+        self.request_duration = register(Histogram(
+            "undercover_http_request_duration_seconds", "接口处理耗时（秒），长轮询包含挂起时间；_count 即各状态码的请求数",
+            ("route", "method", "code")))
+        self.in_flight = register(Gauge(
+            "undercover_http_requests_in_flight", "正在处理中的请求数（含挂起的长轮询和事件流）", ("route",)))
+        self.group_requests = register(Counter(
+            "undercover_group_requests_total", "各组发起的请求数（按组名参数统计）", ("room", "group", "route")))
+        self.lock_wait = register(Histogram(
+            "undercover_room_lock_wait_seconds", "获取房间锁的等待时间（秒）", ("room",), LOCK_BUCKETS))
+        self.lock_hold = register(Histogram(
+            "undercover_room_lock_hold_seconds", "房间锁的持有时间（秒）", ("room",), LOCK_BUCKETS))
+        self._group_labels = set()
+
+    def group_label(self, group_name: str) -> str:
+        """组名标签，取值数超过上限后统一为 other"""
+        if group_name in self._group_labels:
+            return group_name
+        if len(self._group_labels) >= MAX_GROUP_LABELS:
+            return "other"
+        self._group_labels.add(group_name)
+        return group_name
+
+    def request_started(self, route: str):
+        self.in_flight.inc((route,))
+
+    def request_finished(self, route: str, method: str, code: int, elapsed: float,
+                         room_id: Optional[str] = None, group_name: Optional[str] = None):
+        """
+        记录一个处理完的请求，与 request_started 成对调用
+        :param route: 路由模板（房间前缀已去掉，例如 /api/status）
+        :param elapsed: 处理耗时（秒）
+        :param room_id: 房间ID，调用方要把不存在的房间换成 UNKNOWN_ROOM
+        :param group_name: 请求参数中的组名，没有时或路由未匹配时不计入分组统计
+        """
+        self.in_flight.dec((route,))
+        self.request_duration.observe((route, method, str(code)), elapsed)
+        if group_name and route != UNMATCHED_ROUTE:
+            self.group_requests.inc((room_id or "", self.group_label(group_name), route))
+
+    def render(self) -> str:
+        return self.registry.render() if self.enabled else ""
+
+
+class InstrumentedLock:
+    """
+    记录等待和持有时间的房间锁包装，接口与被包装的锁相同（可以用于 threading.Condition）
+    持有时间从获得锁到释放锁；Condition.wait 期间锁已释放，不计入持有时间
+    """
+
+    def __init__(self, lock, metrics: ServerMetrics, room_id: str):
+        self._lock = lock
+        self._labels = (room_id,)
+        self._wait = metrics.lock_wait
+        self._hold = metrics.lock_hold
+        self._acquired_at = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        start = time.perf_counter()
+        acquired = self._lock.acquire(blocking, timeout)
+        if acquired:
+            self._acquired_at = now = time.perf_counter()
+            self._wait.observe(self._labels, now - start)
+        return acquired
+
+    def release(self):
+        held = time.perf_counter() - self._acquired_at
+        self._lock.release()
+        self._hold.observe(self._labels, held)
+
+    def _is_owned(self) -> bool:
+        """供 threading.Condition 判断当前线程是否持有锁"""
+        is_owned = getattr(self._lock, "_is_owned", None)
+        if is_owned is not None:
+            return is_owned()
+        # 与 threading.Condition 对普通锁的默认判断相同
+        if self._lock.acquire(False):
+            self._lock.release()
+            return False
+        return True
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __getattr__(self, name):
+        # 其他方法（例如共享存储锁的 sync）直接交给被包装的锁
+        return getattr(self._lock, name)
+
+    __enter__ = acquire
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class WSGIMetricsMiddleware:
+    """
+    记录请求指标的 WSGI 中间件（包在 Flask 的 wsgi_app 外面）
+    直接读取 environ，不经过 Flask 的请求上下文代理；响应体被服务器关闭时才算请求结束，事件流的耗时覆盖整个连接
+    """
+
+    def __init__(self, app, metrics: ServerMetrics, route_of: Callable[[str], Tuple[str, str]]):
+        """
+        :param app: 被包装的 WSGI 应用
+        :param route_of: 按请求路径返回 (房间ID, 路由名)
+        """
+        self.app = app
+        self.metrics = metrics
+        self.route_of = route_of
+
+    def __call__(self, environ, start_response):
+        started = time.perf_counter()
+        room_id, route = self.route_of(environ.get("PATH_INFO", ""))
+        self.metrics.request_started(route)
+        status = [500, None]  # 状态码、组名
+
+        def capture_status(status_line, headers, exc_info=None):
+            # Flask 在请求上下文结束时清除 environ 中的请求对象，组名要在这里（上下文仍有效时）取出
+            status[0] = int(status_line[:3])
+            if route != UNMATCHED_ROUTE:
+                status[1] = self._group_name(environ)
+            return start_response(status_line, headers, exc_info)
+
+        try:
+            body = self.app(environ, capture_status)
+        except BaseException:
+            self.metrics.request_finished(route, environ["REQUEST_METHOD"], 500, time.perf_counter() - started)
+            raise
+
+        def finish():
+            self.metrics.request_finished(route, environ["REQUEST_METHOD"], status[0], time.perf_counter() - started,
+                                          room_id, status[1])
+        return _ClosingBody(body, finish)
+
+    @staticmethod
+    def _group_name(environ) -> Optional[str]:
+        """
+        请求参数中的组名：查询参数 group_name，或 POST 的 JSON 请求体中的 group_name / voter_group
+        从 Flask 的请求对象读取，视图已经解析过查询参数和请求体，这里只取缓存；
+        查询字符串里没有 group_name 时不读取查询参数，GET 请求（大部分是状态轮询）不看请求体
+        """
+        request = environ.get("werkzeug.request")
+        if request is None:
+            return None
+        group_name = None
+        if "group_name=" in environ.get("QUERY_STRING", ""):
+            group_name = request.args.get("group_name")
+        if group_name is None and environ.get("REQUEST_METHOD") == "POST" and request.is_json:
+            data = request.get_json(silent=True)
+            if isinstance(data, dict):
+                group_name = data.get("group_name") or data.get("voter_group")
+        return group_name if isinstance(group_name, str) else None
+
+
+class _ClosingBody:
+    """响应体包装：服务器关闭响应时先关闭原响应体，再调用回调"""
+
+    def __init__(self, body, callback):
+        self._body = body
+        self._callback = callback
+
+    def __iter__(self):
+        return iter(self._body)
+
+    def close(self):
+        try:
+            close = getattr(self._body, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._callback()
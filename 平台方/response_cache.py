@@ -0,0 +1,84 @@
+"""
+响应缓存模块
+按 (接口, 状态版本) 缓存编码好的 JSON 响应体和 ETag，状态变更时失效
+"""
+import hashlib
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+
+class CachedResponse:
+    """一份编码好的响应"""
+    __slots__ = ("version", "status_code", "body", "etag")
+
+    def __init__(self, version: int, status_code: int, body: bytes):
+        self.version = version
+        self.status_code = status_code
+        self.body = body
+        self.etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+class _Flight:
+    """正在构建中的响应，同一 (接口, 版本) 的并发请求等待同一次构建"""
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[CachedResponse] = None
+
+
+class ResponseCache:
+    """
+    公共读接口的响应缓存
+    同一接口只保留最新版本的一份响应；并发的相同请求只构建一次（single-flight）
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, CachedResponse] = {}
+        self._flights: Dict[Tuple[str, int], _Flight] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: int, build: Callable[[], Tuple[int, bytes]]) -> CachedResponse:
+        """
+        获取缓存的响应，没有该版本时调用 build 构建
+        :param key: 接口标识
+        :param version: 状态版本号，build 必须基于同一版本的数据构建
+        :param build: 构建函数，返回 (HTTP状态码, 响应体)
+        :return: 缓存的响应
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                return entry
+            flight = self._flights.get((key, version))
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[(key, version)] = flight
+
+        if not leader:
+            flight.done.wait()
+            if flight.result is not None:
+                return flight.result
+            # 构建方出错，自己再构建一次（异常交给调用方处理）
+            status_code, body = build()
+            return CachedResponse(version, status_code, body)
+
+        try:
+            status_code, body = build()
+            entry = CachedResponse(version, status_code, body)
+            flight.result = entry
+            with self._lock:
+                current = self._entries.get(key)
+                if current is None or current.version < version:
+                    self._entries[key] = entry
+            return entry
+        finally:
+            with self._lock:
+                self._flights.pop((key, version), None)
+            flight.done.set()
+
+    def invalidate(self):
+        """状态变更时清空缓存"""
+        with self._lock:
+            self._entries.clear()
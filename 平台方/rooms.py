@@ -0,0 +1,303 @@
+"""
+房间管理模块
+负责多房间的创建、查询与关闭，每个房间拥有独立的游戏逻辑实例和锁
+"""
+import os
+import re
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from event_store import EventLog, load_log
+from events import EventBroker
+from game_logic import GameLogic
+from metrics import InstrumentedLock, ServerMetrics
+from response_cache import ResponseCache
+from scheduler import DeadlineScheduler
+from shared_state import SharedRoomLock, SharedStateSync, SharedStore
+
+# 默认房间ID（兼容不带房间前缀的 /api/* 路由）
+DEFAULT_ROOM_ID = "default"
+
+# 单个进程允许同时存在的最大房间数
+MAX_ROOMS = 100
+
+# 房间ID只允许字母、数字、下划线和短横线
+ROOM_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,32}$')
+
+
+def restore_from_log(game: GameLogic, log_dir: str, room_id: str, name: str) -> Tuple[EventLog, str]:
+    """
+    从房间的事件日志恢复对局，并把之后的操作继续记录到同一日志
+    :param game: 新建的游戏逻辑实例
+    :param log_dir: 事件日志目录
+    :param room_id: 房间ID
+    :param name: 房间名称（日志中记录了名称时以日志为准）
+    :return: (事件日志, 房间名称)
+    """
+    path = os.path.join(log_dir, f"{room_id}.log")
+    header, records = load_log(path)
+    if header is not None:
+        name = header.get("name") or name
+    game.replay(records)
+    log = EventLog(path, header={"op": "room", "room_id": room_id, "name": name})
+    game.set_journal(log.append)
+    return log, name
+
+
+class Room:
+    """游戏房间：一局独立的游戏及其专属锁"""
+
+    def __init__(self, room_id: str, name: str = "", scheduler: Optional[DeadlineScheduler] = None,
+                 log_dir: Optional[str] = None, store: Optional[SharedStore] = None,
+                 created_time: Optional[str] = None, metrics: Optional[ServerMetrics] = None):
+        """
+        :param room_id: 房间ID
+        :param name: 房间名称
+        :param scheduler: 共用的截止时间调度器
+        :param log_dir: 事件日志目录；已有该房间的日志时先重放恢复对局，None 表示不记录
+        :param store: 多进程共享存储；设置后房间状态以数据库中的记录序列为准，log_dir 不再使用
+        :param created_time: 创建时间（共享存储中登记的时间）
+        :param metrics: 运行指标；启用时记录房间锁的等待和持有时间
+        """
+        self.room_id = room_id
+        self.name = name or room_id
+        self.game = GameLogic()
+        self.log: Optional[EventLog] = None
+        self.store = store
+        self.seq = 0  # 共享存储中已应用到本进程的最新记录序号
+        self._pending: List[Dict] = []  # 持锁期间产生、释放锁时提交到共享存储的记录
+        if store is not None:
+            reset_seq = store.last_reset_seq(room_id)
+            events = store.read_events(room_id, max(reset_seq - 1, 0))
+            self.game.replay([record for _, record in events])
+            self.seq = events[-1][0] if events else 0
+            self.game.set_journal(self._pending.append)
+        elif log_dir is not None:
+            self.log, self.name = restore_from_log(self.game, log_dir, room_id, self.name)
+        self.scheduler = scheduler or DeadlineScheduler()  # 到点触发描述窗口和阶段切换
+        self._armed_deadline: Optional[float] = None  # 已向调度器登记的截止时间
+        # 房间锁，只保护本房间的游戏状态；共享存储下同时是跨进程的写锁
+        self.lock = SharedRoomLock(self) if store is not None else threading.Lock()
+        if metrics is not None and metrics.enabled:
+            self.lock = InstrumentedLock(self.lock, metrics, room_id)
+        # 状态版本变化时唤醒长轮询；用进程内的独立锁，等待方不获取房间锁
+        # （共享存储下房间锁是跨进程的数据库写锁，长轮询开始和被唤醒时都不应排在写请求后面）
+        self.changed = threading.Condition(threading.Lock())
+        self.events = EventBroker()  # SSE 事件分发
+        self.responses = ResponseCache()  # 公共读接口的编码响应缓存
+        self.created_time = created_time or datetime.now().isoformat()
+        self.game.add_listener(self._on_game_changed)
+        with self.lock:
+            self._arm_deadline()  # 重放恢复的对局可能正处于描述阶段
+
+    def _on_game_changed(self, version: int, event_type: str, data: Dict):
+        """
+        游戏状态变更回调（调用方已持有房间锁，或在 sync 中追上其他进程的记录）
+        快照已经发布，被唤醒的长轮询直接读取快照
+        """
+        self.responses.invalidate()
+        with self.changed:
+            self.changed.notify_all()
+        self.events.publish(version, event_type, data)
+        self._arm_deadline()
+
+    def _arm_deadline(self):
+        """按游戏的下一个截止时间重新登记调度（调用方已持有房间锁）"""
+        deadline = self.game.next_deadline()
+        if deadline == self._armed_deadline:
+            return
+        self._armed_deadline = deadline
+        if deadline is None:
+            self.scheduler.cancel(self.room_id)
+        else:
+            self.scheduler.schedule(self.room_id, deadline, self._on_deadline)
+
+    def _on_deadline(self):
+        """截止时间到达（调度线程中执行）"""
+        with self.lock:
+            self._armed_deadline = None
+            self.game.advance_phase()
+            self._arm_deadline()
+
+    def catch_up(self):
+        """应用其他进程写入共享存储的新记录（调用方已持有房间锁）"""
+        events = self.store.read_events(self.room_id, self.seq)
+        if events:
+            self.game.replay([record for _, record in events], notify=True)
+            self.seq = events[-1][0]
+
+    def commit_pending(self):
+        """把持锁期间产生的记录追加到共享存储并提交写事务（由 SharedRoomLock 释放时调用）"""
+        try:
+            if self._pending:
+                self.store.append_events(self.room_id, self.seq + 1, self._pending)
+                self.seq += len(self._pending)
+                self._pending.clear()
+            self.store.commit()
+        except Exception:
+            self._pending.clear()
+            self.store.rollback()
+            raise
+
+    def sync(self):
+        """共享存储下追上其他进程的记录（不需要持有房间锁）"""
+        if self.store is not None:
+            self.lock.sync()
+
+    def close(self, delete_log: bool = False):
+        """
+        关闭房间，取消未触发的调度
+        :param delete_log: 是否删除事件日志（房间被主持方关闭时删除，进程退出时保留）
+        """
+        with self.lock:
+            self._armed_deadline = None
+            self.scheduler.cancel(self.room_id)
+            if self.log is not None:
+                self.game.set_journal(None)
+                self.log.close()
+                if delete_log:
+                    os.remove(self.log.path)
+                self.log = None
+
+    def wait_for_version_change(self, since: int, timeout: float) -> bool:
+        """
+        等待已发布的状态快照版本发生变化，不需要（也不应持有）房间锁
+        本进程的写操作和后台同步线程追上其他进程的记录（SharedStateSync）时都会唤醒等待方
+        :param since: 客户端已知的版本号
+        :param timeout: 最长等待时间（秒）
+        :return: 版本是否已变化
+        """
+        with self.changed:
+            return self.changed.wait_for(lambda: self.game.snapshot.version != since, timeout)
+
+    def info(self) -> Dict:
+        """房间概要信息（读取快照，不需要房间锁）"""
+        snapshot = self.game.snapshot
+        return {
+            "room_id": self.room_id,
+            "name": self.name,
+            "created_time": self.created_time,
+            "status": snapshot.public_status["status"],
+            "total_groups": snapshot.groups["total"]
+        }
+
+
+class RoomRegistry:
+    """房间注册表"""
+
+    def __init__(self, max_rooms: int = MAX_ROOMS, log_dir: Optional[str] = None,
+                 store: Optional[SharedStore] = None, metrics: Optional[ServerMetrics] = None):
+        """
+        :param max_rooms: 最大房间数
+        :param log_dir: 事件日志目录，启动时从中恢复所有房间；None 表示不持久化
+        :param store: 多进程共享存储，设置后房间列表和游戏状态在所有工作进程间共享（优先于 log_dir）
+        :param metrics: 运行指标，传给每个房间
+        """
+        self.max_rooms = max_rooms
+        self.log_dir = log_dir if store is None else None
+        self.store = store
+        self.metrics = metrics
+        self._rooms: Dict[str, Room] = {}
+        self._lock = threading.Lock()  # 只保护房间表本身，不保护房间内的游戏状态
+        self._local = threading.local()  # 每个线程上次同步时看到的共享存储版本
+        self.scheduler = DeadlineScheduler()  # 所有房间共用一个调度线程
+        if store is not None:
+            store.add_room(DEFAULT_ROOM_ID, "默认房间", datetime.now().isoformat())
+            self.refresh(force=True)
+            SharedStateSync(self).start()
+            return
+        self.create_room(DEFAULT_ROOM_ID, "默认房间")
+        if self.log_dir is not None:
+            for filename in sorted(os.listdir(log_dir)):
+                room_id, ext = os.path.splitext(filename)
+                if ext == ".log" and room_id != DEFAULT_ROOM_ID:
+                    self.create_room(room_id)
+
+    def create_room(self, room_id: Optional[str] = None, name: str = "") -> Optional[Room]:
+        """
+        创建房间
+        :param room_id: 房间ID，为空时自动生成
+        :param name: 房间名称
+        :return: 新房间，ID非法、已存在或房间数已满时返回None
+        """
+        if room_id is None:
+            room_id = uuid.uuid4().hex[:8]
+        if not ROOM_ID_PATTERN.match(room_id):
+            return None
+
+        if self.store is not None:
+            if self.store.count_rooms() >= self.max_rooms:
+                return None
+            if not self.store.add_room(room_id, name or room_id, datetime.now().isoformat()):
+                return None
+            self.refresh(force=True)
+            return self._rooms.get(room_id)
+
+        with self._lock:
+            if room_id in self._rooms:
+                return None
+            if len(self._rooms) >= self.max_rooms:
+                return None
+            room = Room(room_id, name, self.scheduler, self.log_dir, metrics=self.metrics)
+            self._rooms[room_id] = room
+            return room
+
+    def get_room(self, room_id: str) -> Optional[Room]:
+        """按ID获取房间，不存在返回None"""
+        return self._rooms.get(room_id)
+
+    def refresh(self, force: bool = False):
+        """
+        共享存储下同步其他进程的变更：新建/关闭的房间、各房间的新记录
+        每个请求处理前调用，未变化时只有一次 PRAGMA 查询的开销
+        :param force: 不检查数据库版本，直接同步
+        """
+        if self.store is None:
+            return
+        version = self.store.data_version()
+        if not force and version == getattr(self._local, "data_version", None):
+            return
+        self._local.data_version = version
+
+        rows = self.store.list_rooms()
+        with self._lock:
+            for room_id, name, created_time, seq in rows:
+                room = self._rooms.get(room_id)
+                if room is None:
+                    self._rooms[room_id] = Room(room_id, name, self.scheduler, store=self.store,
+                                                created_time=created_time, metrics=self.metrics)
+                elif room.seq != seq:
+                    room.sync()
+            removed = set(self._rooms) - {row[0] for row in rows}
+            closed = [self._rooms.pop(room_id) for room_id in removed]
+        for room in closed:
+            room.close()
+
+    def list_rooms(self) -> List[Room]:
+        """列出所有房间（按创建顺序）"""
+        with self._lock:
+            return list(self._rooms.values())
+
+    def close_room(self, room_id: str) -> bool:
+        """
+        关闭房间
+        :param room_id: 房间ID
+        :return: 是否关闭成功（默认房间不可关闭）
+        """
+        if room_id == DEFAULT_ROOM_ID:
+            return False
+        with self._lock:
+            room = self._rooms.pop(room_id, None)
+        if room is None:
+            return False
+        room.close(delete_log=True)
+        if self.store is not None:
+            self.store.remove_room(room_id)
+        return True
+
+    def close_all(self):
+        """进程退出前关闭所有房间，事件日志落盘并保留"""
+        for room in self.list_rooms():
+            room.close()
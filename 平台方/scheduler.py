@@ -0,0 +1,78 @@
+"""
+截止时间调度模块
+用一个后台线程在精确的截止时刻触发阶段切换，所有房间共用
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineScheduler:
+    """
+    单线程截止时间调度器
+    每个 key（通常是房间ID）同一时刻最多只有一个待触发的截止时间，重复调度会替换旧的
+    回调在调度线程中执行，执行时不持有调度器内部锁
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._heap: List[Tuple[float, int, Hashable]] = []  # (截止时间, 序号, key)
+        self._entries: Dict[Hashable, Tuple[float, int, Callable[[], None]]] = {}  # key -> 当前有效的调度
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, key: Hashable, deadline: float, callback: Callable[[], None]):
+        """
+        在单调时钟到达 deadline 时执行 callback
+        :param key: 调度标识，同一 key 的旧调度会被替换
+        :param deadline: 截止时间（与 clock 同一时间基准）
+        :param callback: 到期回调
+        """
+        with self._cond:
+            seq = next(self._counter)
+            self._entries[key] = (deadline, seq, callback)
+            heapq.heappush(self._heap, (deadline, seq, key))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="deadline-scheduler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def cancel(self, key: Hashable):
+        """取消 key 对应的调度（堆中的旧条目在弹出时被丢弃）"""
+        with self._cond:
+            self._entries.pop(key, None)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                due = []
+                while not due:
+                    # 丢弃已被替换或取消的条目
+                    while self._heap and self._entries.get(self._heap[0][2], (None, None))[1] != self._heap[0][1]:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    deadline = self._heap[0][0]
+                    now = self._clock()
+                    if now < deadline:
+                        self._cond.wait(deadline - now)
+                        continue
+                    while self._heap and self._heap[0][0] <= now:
+                        _, seq, key = heapq.heappop(self._heap)
+                        entry = self._entries.get(key)
+                        if entry is not None and entry[1] == seq:
+                            del self._entries[key]
+                            due.append(entry[2])
+
+            for callback in due:
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("截止时间回调异常")
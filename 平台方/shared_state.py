@@ -0,0 +1,214 @@
+"""
+共享状态模块
+多个工作进程（gunicorn 等多进程 WSGI 服务器）通过同一个 SQLite 数据库共享房间列表和每个房间的操作记录序列：
+写操作在数据库写事务内先追上其他进程的记录、再执行并追加自己的记录；后台线程发现其他进程提交后同步到本进程
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from event_store import encode_record
+
+logger = logging.getLogger(__name__)
+
+# 后台同步线程检查其他进程提交的间隔（秒），也是跨进程长轮询/事件推送的最大额外延迟
+SYNC_INTERVAL = 0.01
+
+# 等待其他进程释放写锁的最长时间（秒）
+BUSY_TIMEOUT = 10.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rooms (
+    room_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_time TEXT NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0  -- 最新记录的序号
+);
+CREATE TABLE IF NOT EXISTS events (
+    room_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    op TEXT NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (room_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+class SharedStore:
+    """
+    SQLite 共享存储
+    每个线程使用自己的连接；WAL 模式下读不阻塞写，写事务（BEGIN IMMEDIATE）在所有进程间互斥
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: 数据库文件路径，多个工作进程必须指向同一个文件
+        """
+        self.path = path
+        self._local = threading.local()
+        conn = self.connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        """当前线程的数据库连接（自动提交模式，事务由调用方显式开始）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")  # WAL 下提交不 fsync，由检查点落盘；进程崩溃不丢数据
+            self._local.conn = conn
+        return conn
+
+    def data_version(self) -> int:
+        """数据库版本：其他连接提交后变化，用于廉价地判断是否需要同步"""
+        return self.connection().execute("PRAGMA data_version").fetchone()[0]
+
+    def begin(self):
+        """开始写事务，阻塞直到获得跨进程写锁"""
+        self.connection().execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        self.connection().execute("COMMIT")
+
+    def rollback(self):
+        self.connection().execute("ROLLBACK")
+
+    def list_rooms(self) -> List[Tuple[str, str, str, int]]:
+        """所有房间 (room_id, name, created_time, 最新记录序号)，按创建时间排序"""
+        return self.connection().execute(
+            "SELECT room_id, name, created_time, seq FROM rooms ORDER BY created_time, room_id").fetchall()
+
+    def add_room(self, room_id: str, name: str, created_time: str) -> bool:
+        """
+        登记房间
+        :return: 是否新登记（房间已存在返回False）
+        """
+        cursor = self.connection().execute(
+            "INSERT OR IGNORE INTO rooms (room_id, name, created_time) VALUES (?, ?, ?)",
+            (room_id, name, created_time))
+        return cursor.rowcount == 1
+
+    def count_rooms(self) -> int:
+        return self.connection().execute("SELECT COUNT(*) FROM rooms").fetchone()[0]
+
+    def remove_room(self, room_id: str):
+        """删除房间及其全部记录"""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM rooms WHERE room_id = ?", (room_id,))
+            conn.execute("DELETE FROM events WHERE room_id = ?", (room_id,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def last_reset_seq(self, room_id: str) -> int:
+        """房间最后一次重置记录的序号，没有重置返回0"""
+        row = self.connection().execute(
+            "SELECT MAX(seq) FROM events WHERE room_id = ? AND op = 'reset'", (room_id,)).fetchone()
+        return row[0] or 0
+
+    def read_events(self, room_id: str, after_seq: int) -> List[Tuple[int, Dict]]:
+        """读取序号大于 after_seq 的记录 [(序号, 记录)]"""
+        rows = self.connection().execute(
+            "SELECT seq, record FROM events WHERE room_id = ? AND seq > ? ORDER BY seq", (room_id, after_seq))
+        return [(seq, json.loads(record)) for seq, record in rows]
+
+    def append_events(self, room_id: str, first_seq: int, records: List[Dict]):
+        """
+        在当前写事务中追加记录；重置记录之前的记录不再影响状态，一并删除
+        :param first_seq: 第一条记录的序号
+        """
+        conn = self.connection()
+        conn.executemany(
+            "INSERT INTO events (room_id, seq, op, record) VALUES (?, ?, ?, ?)",
+            [(room_id, first_seq + index, record["op"], encode_record(record).decode("utf-8"))
+             for index, record in enumerate(records)])
+        conn.execute("UPDATE rooms SET seq = ? WHERE room_id = ?", (first_seq + len(records) - 1, room_id))
+        reset_seqs = [first_seq + index for index, record in enumerate(records) if record["op"] == "reset"]
+        if reset_seqs:
+            conn.execute("DELETE FROM events WHERE room_id = ? AND seq < ?", (room_id, reset_seqs[-1]))
+
+
+class SharedRoomLock:
+    """
+    共享状态下的房间锁，接口与 threading.Lock 相同，可以用于 threading.Condition
+    获取：进程内互斥 -> 数据库写事务（跨进程互斥）-> 追上其他进程写入的记录
+    释放：把持锁期间本进程产生的记录追加到数据库 -> 提交 -> 释放进程内互斥
+    """
+
+    def __init__(self, room):
+        self._room = room
+        self._mutex = threading.Lock()
+        self._owner: Optional[int] = None
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if not self._mutex.acquire(blocking, timeout):
+            return False
+        self._owner = threading.get_ident()
+        try:
+            self._room.store.begin()
+        except Exception:
+            self._owner = None
+            self._mutex.release()
+            raise
+        try:
+            self._room.catch_up()
+        except Exception:
+            self._room.store.rollback()
+            self._owner = None
+            self._mutex.release()
+            raise
+        return True
+
+    def release(self):
+        try:
+            self._room.commit_pending()
+        finally:
+            self._owner = None
+            self._mutex.release()
+
+    def _is_owned(self) -> bool:
+        """供 threading.Condition 判断当前线程是否持有锁"""
+        return self._owner == threading.get_ident()
+
+    def locked(self) -> bool:
+        return self._mutex.locked()
+
+    def sync(self):
+        """只追上其他进程写入的记录：不开写事务，不阻塞其他进程"""
+        with self._mutex:
+            self._owner = threading.get_ident()
+            try:
+                self._room.catch_up()
+            finally:
+                self._owner = None
+
+    __enter__ = acquire
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class SharedStateSync:
+    """后台同步线程：发现其他进程提交后同步到本进程，唤醒本进程中的长轮询和事件推送"""
+
+    def __init__(self, registry, interval: float = SYNC_INTERVAL):
+        self._registry = registry
+        self._interval = interval
+        self._thread = threading.Thread(target=self._run, name="shared-state-sync", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self._interval)
+            try:
+                self._registry.refresh()
+            except Exception:
+                logger.exception("共享状态同步失败")
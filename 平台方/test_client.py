@@ -1,13 +1,17 @@
 """
 游戏方测试客户端
-用于测试API接口功能
+用于测试API接口功能（手动单组流程；多房间、多组的自动对局压测见 load_test.py）
 """
+import os
 import requests
 import time
 import json
 
-# 配置服务器地址（请修改为实际的主持方服务器IP）
-BASE_URL = "http://192.168.81.102:5000"
+# 配置服务器地址（请修改为实际的主持方服务器IP，或用环境变量 BASE_URL 指定）
+BASE_URL = os.environ.get("BASE_URL", "http://192.168.81.102:5000")
+
+# 所有请求共用一个会话，复用同一个保持连接
+session = requests.Session()
 
 def print_response(response, title=""):
     """打印响应结果"""
@@ -26,7 +30,7 @@ def test_connection():
     """测试服务器连接"""
     print("测试服务器连接...")
     try:
-        response = requests.get(f"{BASE_URL}/api/status", timeout=5)
+        response = session.get(f"{BASE_URL}/api/status", timeout=5)
         if response.status_code == 200 and response.json().get('code') == 200:
             print("✓ 服务器连接成功！")
         else:
@@ -53,7 +57,7 @@ def test_register(group_name):
     """测试注册"""
     print(f"测试注册: {group_name}")
     try:
-        response = requests.post(
+        response = session.post(
             f"{BASE_URL}/api/register",
             json={"group_name": group_name},
             timeout=5
@@ -68,7 +72,7 @@ def test_get_state():
     """测试获取游戏状态"""
     print("获取游戏状态")
     try:
-        response = requests.get(f"{BASE_URL}/api/status", timeout=5)
+        response = session.get(f"{BASE_URL}/api/status", timeout=5)
         print_response(response, "游戏状态")
         return response.json() if response.status_code == 200 else None
     except requests.exceptions.RequestException as e:
@@ -79,7 +83,7 @@ def test_get_word(group_name):
     """测试获取词语"""
     print(f"获取词语: {group_name}")
     try:
-        response = requests.get(
+        response = session.get(
             f"{BASE_URL}/api/word",
             params={"group_name": group_name},
             timeout=5
@@ -94,7 +98,7 @@ def test_submit_description(group_name, description):
     """测试提交描述"""
     print(f"提交描述: {group_name} - {description}")
     try:
-        response = requests.post(
+        response = session.post(
             f"{BASE_URL}/api/describe",
             json={
                 "group_name": group_name,
@@ -112,7 +116,7 @@ def test_submit_vote(voter_group, target_group):
     """测试提交投票"""
     print(f"提交投票: {voter_group} -> {target_group}")
     try:
-        response = requests.post(
+        response = session.post(
             f"{BASE_URL}/api/vote",
             json={
                 "voter_group": voter_group,
@@ -130,7 +134,7 @@ def test_get_groups():
     """测试获取所有组"""
     print("获取所有注册的组")
     try:
-        response = requests.get(f"{BASE_URL}/api/groups", timeout=5)
+        response = session.get(f"{BASE_URL}/api/groups", timeout=5)
         print_response(response, "所有组")
         return response.json() if response.status_code == 200 else None
     except requests.exceptions.RequestException as e:
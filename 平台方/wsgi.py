@@ -0,0 +1,19 @@
+"""
+生产环境入口
+backend.py 直接运行的是单进程的 Werkzeug 开发服务器（debug=True），只适合开发调试；
+生产环境用多工作进程的 WSGI 服务器加载本模块，所有工作进程通过同一个 SQLite 数据库共享房间和游戏状态：
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+注意不要使用 gunicorn 的 --preload：每个工作进程需要在 fork 之后自己打开数据库连接、启动调度和同步线程
+"""
+import os
+
+# 必须在导入 backend 之前设置，backend 导入时按它创建共享状态的房间注册表
+os.environ.setdefault(
+    "SHARED_STATE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "state.sqlite3"))
+os.makedirs(os.path.dirname(os.path.abspath(os.environ["SHARED_STATE_DB"])), exist_ok=True)
+
+from backend import app  # noqa: E402
+
+__all__ = ["app"]
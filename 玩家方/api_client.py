@@ -3,23 +3,55 @@ API通信模块
 负责与主持方服务器的所有HTTP通信
 """
 import requests
+import threading
 import time
-from typing import Dict, Optional, List
+import json
+import logging
+from typing import Dict, Iterator, Optional, List
+
+# 日志只交给 logging（默认不输出），由 client.py 用 log_setup.setup_logging() 配置后台写出
+logger = logging.getLogger(__name__)
+
+# 连接超时和读超时（秒）；requests 不读取 Session 上的 timeout 属性，必须在每次请求时传入
+CONNECT_TIMEOUT = 3
+READ_TIMEOUT = 5
+# 条件请求缓存最多保留的条目数，超出时丢弃最早加入的
+ETAG_CACHE_SIZE = 32
 
 
 class APIClient:
     """游戏方API客户端"""
     
-    def __init__(self, base_url: str = "http://127.0.0.1:5000"):
+    def __init__(self, base_url: str = "http://127.0.0.1:5000", room_id: Optional[str] = None):
         """
         初始化API客户端
         :param base_url: 主持方服务器地址，例如 "http://192.168.1.100:5000"
+        :param room_id: 房间ID，指定时请求 /api/rooms/<room_id>/... 下的接口，不指定时使用默认房间
         """
         self.base_url = base_url.rstrip('/')
+        self.room_id = room_id
         self.session = requests.Session()
-        self.session.timeout = 5  # 请求超时时间5秒
-        self.last_error = None  # 保存最后一次错误信息
+        self.timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)  # 每次请求的 (连接超时, 读超时)，请求参数可单独指定
+        self._local = threading.local()  # 每个线程各自的最后一次错误信息（轮询线程和后台请求线程共用一个客户端）
+        self._etag_cache: Dict[str, tuple] = {}  # GET请求地址 -> (ETag, 响应数据)，用于条件请求
+        self.clock_offset: Optional[float] = None  # 服务器时间减本机时间（秒），sync_clock() 后可用
+        self.clock_rtt: Optional[float] = None  # 对时采用的那次请求的往返时间（秒）
     
+    @property
+    def last_error(self) -> Optional[str]:
+        """本线程最后一次请求的错误信息，成功时为None"""
+        return getattr(self._local, 'last_error', None)
+
+    @last_error.setter
+    def last_error(self, value: Optional[str]):
+        self._local.last_error = value
+
+    def _url(self, endpoint: str) -> str:
+        """接口完整地址，指定了房间时 /api/xxx 换成 /api/rooms/<room_id>/xxx（对时接口不区分房间）"""
+        if self.room_id and endpoint.startswith('/api/') and endpoint != '/api/time':
+            endpoint = f"/api/rooms/{self.room_id}/{endpoint[5:]}"
+        return f"{self.base_url}{endpoint}"
+
     def _make_request(self, method: str, endpoint: str, **kwargs) -> Optional[Dict]:
         """
         发送HTTP请求的通用方法
@@ -28,11 +60,23 @@ class APIClient:
         :param kwargs: 其他请求参数
         :return: 响应数据字典，失败返回None，错误信息保存在self.last_error中
         """
-        url = f"{self.base_url}{endpoint}"
+        url = self._url(endpoint)
         self.last_error = None  # 保存最后一次错误信息
+        kwargs.setdefault('timeout', self.timeout)
         try:
             if method.upper() == 'GET':
+                # 带上次的ETag发送条件请求，数据未变化时服务器返回304且不带响应体。
+                # 长轮询（带since/wait）每次参数都不同，缓存了也不会再用到，不参与条件请求
+                params = kwargs.get('params') or {}
+                cache_key = None
+                if 'since' not in params and 'wait' not in params:
+                    cache_key = url + '?' + json.dumps(params, sort_keys=True)
+                cached = self._etag_cache.get(cache_key) if cache_key else None
+                if cached:
+                    kwargs['headers'] = {**kwargs.get('headers', {}), 'If-None-Match': cached[0]}
                 response = self.session.get(url, **kwargs)
+                if response.status_code == 304 and cached:
+                    return cached[1]
             elif method.upper() == 'POST':
                 response = self.session.post(url, **kwargs)
             else:
@@ -41,21 +85,34 @@ class APIClient:
             # 先尝试解析JSON响应（即使状态码不是200）
             try:
                 data = response.json()
-                print(f"[API客户端] 响应状态码: {response.status_code}, 响应数据: {data}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    # GET 多是高频状态轮询，按 poll 采样
+                    logger.debug("收到响应", extra={
+                        "sample": "poll" if method.upper() == 'GET' else None,
+                        "fields": {"method": method.upper(), "endpoint": endpoint,
+                                   "status": response.status_code, "response": data}})
             except:
                 # 如果不是JSON响应，使用raise_for_status抛出异常
-                print(f"[API客户端] 无法解析JSON响应，状态码: {response.status_code}")
+                logger.warning("无法解析JSON响应", extra={"fields": {
+                    "method": method.upper(), "endpoint": endpoint, "status": response.status_code}})
                 response.raise_for_status()
                 return None
             
             # 检查响应码
             if data.get('code') == 200:
+                etag = response.headers.get('ETag')
+                if method.upper() == 'GET' and etag and cache_key:
+                    self._etag_cache.pop(cache_key, None)
+                    if len(self._etag_cache) >= ETAG_CACHE_SIZE:
+                        self._etag_cache.pop(next(iter(self._etag_cache)), None)
+                    self._etag_cache[cache_key] = (etag, data.get('data', {}))
                 return data.get('data', {})
             else:
                 # 业务逻辑错误（如400），保存错误信息
                 error_msg = data.get('message', '未知错误')
                 self.last_error = error_msg
-                print(f"[API客户端] API错误: {error_msg}")
+                logger.info("API错误", extra={"fields": {
+                    "method": method.upper(), "endpoint": endpoint, "code": data.get('code'), "error": error_msg}})
                 return None
                 
         except requests.exceptions.HTTPError as e:
@@ -66,23 +123,23 @@ class APIClient:
             except:
                 error_msg = str(e)
             self.last_error = error_msg
-            print(f"HTTP错误: {error_msg}")
+            logger.warning("HTTP错误", extra={"fields": {"endpoint": endpoint, "error": error_msg}})
             return None
         except requests.exceptions.ConnectionError:
             self.last_error = f"连接失败：无法连接到服务器 {self.base_url}"
-            print(self.last_error)
+            logger.warning(self.last_error, extra={"fields": {"endpoint": endpoint}})
             return None
         except requests.exceptions.Timeout:
             self.last_error = "请求超时"
-            print(self.last_error)
+            logger.warning(self.last_error, extra={"fields": {"endpoint": endpoint}})
             return None
         except requests.exceptions.RequestException as e:
             self.last_error = f"请求异常: {e}"
-            print(self.last_error)
+            logger.warning(self.last_error, extra={"fields": {"endpoint": endpoint}})
             return None
         except Exception as e:
             self.last_error = f"未知错误: {e}"
-            print(self.last_error)
+            logger.exception(self.last_error, extra={"fields": {"endpoint": endpoint}})
             return None
     
     def register(self, group_name: str) -> Optional[Dict]:
@@ -102,12 +159,60 @@ class APIClient:
         result = self._make_request('GET', '/api/word', params={'group_name': group_name})
         return result.get('word') if result else None
     
-    def get_status(self) -> Optional[Dict]:
+    def get_status(self, since: Optional[int] = None, wait: Optional[float] = None) -> Optional[Dict]:
         """
         获取游戏阶段状态
-        :return: 状态信息字典，包含status, round, active_groups等
+        :param since: 已知的状态版本号，配合wait使用长轮询
+        :param wait: 长轮询最长等待秒数，状态版本等于since时服务器会挂起请求直到状态变化或超时
+        :return: 状态信息字典，包含status, round, active_groups, version等
         """
-        return self._make_request('GET', '/api/status')
+        if since is None or not wait:
+            return self._make_request('GET', '/api/status')
+        # 读超时需要比服务器挂起时间更长
+        return self._make_request('GET', '/api/status', params={'since': since, 'wait': wait},
+                                  timeout=(CONNECT_TIMEOUT, wait + READ_TIMEOUT))
+    
+    def get_round_view(self, since: Optional[int] = None, wait: Optional[float] = None) -> Optional[Dict]:
+        """
+        获取回合视图：一次请求取得刷新界面所需的全部数据（同一时刻的一致状态）
+        :param since: 已知的状态版本号，配合wait使用长轮询
+        :param wait: 长轮询最长等待秒数
+        :return: 视图字典，包含version, status（同get_status）, round, describe_order, descriptions（同get_descriptions）,
+                 eliminated_groups, last_result（同get_result，没有时为None）
+        """
+        if since is None or not wait:
+            return self._make_request('GET', '/api/round/view')
+        return self._make_request('GET', '/api/round/view', params={'since': since, 'wait': wait},
+                                  timeout=(CONNECT_TIMEOUT, wait + READ_TIMEOUT))
+    
+    def sync_clock(self, samples: int = 5) -> Optional[float]:
+        """
+        与服务器对时：多次请求 /api/time，取往返时间最短的一次，以往返中点估算时钟偏差
+        :param samples: 请求次数
+        :return: 时钟偏差（服务器时间 - 本机时间，秒），全部失败返回None
+        """
+        best = None
+        for _ in range(samples):
+            sent = time.time()
+            result = self._make_request('GET', '/api/time')
+            received = time.time()
+            if not result or 'server_time' not in result:
+                continue
+            rtt = received - sent
+            if best is None or rtt < best[0]:
+                best = (rtt, result['server_time'] - (sent + received) / 2)
+        if best is None:
+            return None
+        self.clock_rtt, self.clock_offset = best
+        return self.clock_offset
+    
+    def to_local_time(self, server_timestamp: float) -> float:
+        """
+        把服务器时间戳（如 /api/status 中的 describe_deadlines）换算成本机时间戳
+        :param server_timestamp: 服务器时间戳（秒）
+        :return: 本机 time.time() 时间基准下的时间戳；未对时按偏差为0处理
+        """
+        return server_timestamp - (self.clock_offset or 0.0)
     
     def submit_description(self, group_name: str, description: str) -> Optional[Dict]:
         """
@@ -128,12 +233,12 @@ class APIClient:
         :param target_group: 被投票者组名
         :return: 提交结果，失败时返回None
         """
-        print(f"[API客户端] 准备提交投票: {voter_group} -> {target_group}")
         result = self._make_request('POST', '/api/vote', json={
             'voter_group': voter_group,
             'target_group': target_group
         })
-        print(f"[API客户端] 投票结果: {result}, 错误: {self.last_error}")
+        logger.info("提交投票", extra={"fields": {
+            "voter": voter_group, "target": target_group, "ok": result is not None, "error": self.last_error}})
         return result
     
     def get_result(self) -> Optional[Dict]:
@@ -172,9 +277,67 @@ class APIClient:
         """
         return self._make_request('GET', '/api/descriptions')
 
+    def batch(self, ops: List[Dict], atomic: bool = False, admin_token: Optional[str] = None) -> Optional[Dict]:
+        """
+        批量执行操作，服务器只获取一次房间锁
+        :param ops: 操作列表，例如 [{'op': 'describe', 'data': {'group_name': 'A', 'description': '...'}}]，
+                    可用操作：register, word, describe, vote, report（以及需要主持方令牌的 start_game 等）
+        :param atomic: 是否全部成功才生效
+        :param admin_token: 主持方令牌（批量中含主持方操作时需要）
+        :return: 批量结果，包含 results（每个操作的 op, code, message, data）；atomic 模式失败时返回None
+        """
+        headers = {'X-Admin-Token': admin_token} if admin_token else {}
+        return self._make_request('POST', '/api/batch', json={'ops': ops, 'atomic': atomic}, headers=headers)
+
+    def iter_events(self, last_event_id: Optional[int] = None) -> Iterator[Dict]:
+        """
+        订阅服务器事件推送（Server-Sent Events），逐个产出事件
+        连接断开或出错时迭代结束，错误信息保存在self.last_error中，调用方可带上最后的事件id重连
+        :param last_event_id: 断线前收到的最后一个事件id，服务器会补发之后的事件
+        :return: 事件迭代器，每个事件为 {'id': 版本号或None, 'event': 事件类型, 'data': 事件数据}
+        """
+        headers = {'Accept': 'text/event-stream'}
+        if last_event_id is not None:
+            headers['Last-Event-ID'] = str(last_event_id)
+        self.last_error = None
+        try:
+            # 服务器每15秒发送心跳，读超时留足余量
+            with self.session.get(self._url("/api/events"), headers=headers,
+                                  stream=True, timeout=(CONNECT_TIMEOUT, 60)) as response:
+                response.raise_for_status()
+                event_id, event_type, data_lines = None, 'message', []
+                for line in response.iter_lines(decode_unicode=True):
+                    if line is None:
+                        continue
+                    if not line:
+                        # 空行表示一个事件结束
+                        if data_lines:
+                            yield {
+                                'id': event_id,
+                                'event': event_type,
+                                'data': json.loads('\n'.join(data_lines))
+                            }
+                        event_id, event_type, data_lines = None, 'message', []
+                    elif line.startswith(':'):
+                        continue  # 心跳注释
+                    elif line.startswith('id:'):
+                        event_id = int(line[3:].strip())
+                    elif line.startswith('event:'):
+                        event_type = line[6:].strip()
+                    elif line.startswith('data:'):
+                        data_lines.append(line[5:].strip())
+        except requests.exceptions.RequestException as e:
+            self.last_error = f"事件流中断: {e}"
+            logger.warning(self.last_error)
+        except ValueError as e:
+            self.last_error = f"事件解析失败: {e}"
+            logger.warning(self.last_error)
+
 
 # 测试代码
 if __name__ == '__main__':
+    from log_setup import setup_logging
+    setup_logging()
     print("=" * 60)
     print("API客户端测试")
     print("=" * 60)
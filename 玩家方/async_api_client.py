@@ -0,0 +1,619 @@
+"""
+异步API通信模块
+与 APIClient 提供相同的方法（均为协程），基于 asyncio 标准库实现 HTTP/1.1 客户端，不需要额外依赖：
+  - 连接池：同一服务器的请求复用保持连接的 TCP 连接，最多 pool_size 个同时使用的连接
+  - 真实的超时：每次请求都有连接超时和读超时（长轮询的读超时自动加上服务器挂起时间）
+  - 重试：幂等的 GET 请求在连接失败、超时、502/503/504 时按带随机抖动的指数退避重试；POST 不重试，避免重复提交
+  - 熔断：连续失败达到阈值后一段时间内直接返回失败，不再请求已经宕机的服务器；冷却后放行一个试探请求
+
+用法：
+    async with AsyncAPIClient("http://127.0.0.1:5000") as client:
+        status = await client.get_status()
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from api_client import CONNECT_TIMEOUT, ETAG_CACHE_SIZE, READ_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# 连接池大小（同一时间最多使用的连接数，长轮询也占用一个连接）
+POOL_SIZE = 4
+
+# GET 请求失败后的最多重试次数
+MAX_RETRIES = 2
+
+# 重试退避：第 n 次重试前等待 [0, min(BACKOFF_MAX, BACKOFF_BASE * 2^n)) 之间的随机时间（秒）
+BACKOFF_BASE = 0.2
+BACKOFF_MAX = 2.0
+
+# 视为服务器暂时不可用、可以重试的状态码
+RETRY_STATUSES = (502, 503, 504)
+
+# 熔断：连续失败次数阈值，熔断后的冷却时间（秒）
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 10.0
+
+# 事件流读超时（秒），服务器每15秒发送心跳
+EVENTS_READ_TIMEOUT = 60
+
+# 响应头最大长度（字节）
+MAX_HEADER_SIZE = 64 * 1024
+
+
+class CircuitBreaker:
+    """
+    熔断器：closed（正常）-> 连续失败 failure_threshold 次 -> open（直接失败）
+    -> 冷却 reset_timeout 秒后 half_open（放行一个试探请求）-> 成功回到 closed，失败重新 open
+    只在一个事件循环内使用，不需要加锁
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0  # 连续失败次数
+        self.opened_at = 0.0
+        # half_open 状态下试探请求的发出时间；试探请求被取消而没有结果时，冷却时间过后再放行一个
+        self._trial_started: Optional[float] = None
+
+    def allow(self) -> bool:
+        """是否允许发出请求"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if self.clock() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_started = None
+        now = self.clock()
+        if self._trial_started is not None and now - self._trial_started < self.reset_timeout:
+            return False
+        self._trial_started = now
+        return True
+
+    def retry_after(self) -> float:
+        """熔断状态下距离放行试探请求的秒数"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info("服务器恢复，熔断关闭")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_started = None
+        if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+            logger.warning("连续请求失败，熔断开启", extra={"fields": {
+                "failures": self.failures, "reset_timeout": self.reset_timeout}})
+
+
+class _Response:
+    """一个 HTTP 响应：状态码、头部（小写名称）、响应体、连接是否可以继续使用"""
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes, keep_alive: bool):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.keep_alive = keep_alive
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False  # 从连接池取出的旧连接（服务器可能已经关闭它）
+
+    def usable(self) -> bool:
+        return not self.writer.is_closing() and not self.reader.at_eof()
+
+    def close(self):
+        self.writer.close()
+
+
+class PoolTimeout(Exception):
+    """连接池用满，等待空闲连接超时（本地资源不足，不是服务器故障，不重试也不计入熔断）"""
+
+
+class ConnectionPool:
+    """一个服务器的保持连接池：空闲连接后进先出复用，同时使用的连接数不超过 size"""
+
+    def __init__(self, host: str, port: int, use_ssl: bool, size: int, connect_timeout: float,
+                 acquire_timeout: float):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.connect_timeout = connect_timeout
+        self.acquire_timeout = acquire_timeout  # 连接池用满时最多等待其他请求归还的时间（秒）
+        self._idle: Deque[_Connection] = deque()
+        self._slots = asyncio.Semaphore(size)
+
+    async def acquire(self) -> _Connection:
+        """取得一个连接（优先复用空闲连接），连接池用满时等待其他请求归还，超过 acquire_timeout 抛出 PoolTimeout"""
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise PoolTimeout() from None
+        while self._idle:
+            conn = self._idle.pop()
+            if conn.usable():
+                conn.reused = True
+                return conn
+            conn.close()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=self.use_ssl or None, limit=MAX_HEADER_SIZE),
+                self.connect_timeout)
+        except BaseException:
+            self._slots.release()
+            raise
+        return _Connection(reader, writer)
+
+    def release(self, conn: _Connection, reusable: bool):
+        """归还连接；响应不完整或服务器要求关闭的连接直接关闭"""
+        if reusable and conn.usable():
+            self._idle.append(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Tuple[str, int, Dict[str, str]]:
+    """读取状态行和响应头，返回 (HTTP版本, 状态码, 头部)"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    version, status = lines[0].split(" ", 2)[:2]
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    return version, int(status), headers
+
+
+def _keep_alive(version: str, headers: Dict[str, str]) -> bool:
+    connection = headers.get('connection', '').lower()
+    return connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+
+async def _iter_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> AsyncIterator[bytes]:
+    """按 chunked、Content-Length 或读到连接关闭三种方式逐块产出响应体"""
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+            if size == 0:
+                await reader.readuntil(b"\r\n")  # 结尾空行（不支持 trailer）
+                return
+            chunk = await reader.readexactly(size + 2)
+            yield chunk[:-2]
+    elif 'content-length' in headers:
+        length = int(headers['content-length'])
+        if length:
+            yield await reader.readexactly(length)
+    else:
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                return
+            yield chunk
+
+
+async def _read_response(reader: asyncio.StreamReader, method: str) -> _Response:
+    version, status, headers = await _read_head(reader)
+    if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+        return _Response(status, headers, b"", _keep_alive(version, headers))
+    body = b"".join([chunk async for chunk in _iter_body(reader, headers)])
+    keep_alive = _keep_alive(version, headers) and (
+        'content-length' in headers or headers.get('transfer-encoding', '').lower() == 'chunked')
+    return _Response(status, headers, body, keep_alive)
+
+
+class AsyncAPIClient:
+    """游戏方异步API客户端（方法与 APIClient 相同，返回值含义相同，失败时错误信息保存在 last_error 中）"""
+
+    def __init__(self, base_url: str = "http://127.0.0.1:5000", room_id: Optional[str] = None,
+                 pool_size: int = POOL_SIZE, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        初始化异步API客户端（需要在事件循环中创建和使用）
+        :param base_url: 主持方服务器地址，例如 "http://192.168.1.100:5000"
+        :param room_id: 房间ID，指定时请求 /api/rooms/<room_id>/... 下的接口
+        :param pool_size: 连接池大小
+        :param connect_timeout: 连接超时（秒）
+        :param read_timeout: 读超时（秒），从发出请求到读完响应；连接池用满时等待空闲连接也不超过这个时间
+        :param max_retries: GET 请求的最多重试次数
+        :param breaker: 熔断器，多个客户端访问同一服务器时可以共用一个
+        """
+        self.base_url = base_url.rstrip('/')
+        self.room_id = room_id
+        url = urlsplit(self.base_url)
+        use_ssl = url.scheme == 'https'
+        self._host_header = url.netloc
+        self._prefix = url.path
+        self.pool = ConnectionPool(url.hostname, url.port or (443 if use_ssl else 80), use_ssl, pool_size,
+                                   connect_timeout, read_timeout)
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self.last_error = None  # 保存最后一次错误信息
+        self._etag_cache: Dict[str, tuple] = {}  # GET请求地址 -> (ETag, 响应数据)，用于条件请求
+        self.clock_offset: Optional[float] = None  # 服务器时间减本机时间（秒），sync_clock() 后可用
+        self.clock_rtt: Optional[float] = None  # 对时采用的那次请求的往返时间（秒）
+
+    async def __aenter__(self) -> "AsyncAPIClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """关闭连接池中的空闲连接"""
+        self.pool.close()
+
+    def _path(self, endpoint: str) -> str:
+        """请求路径，指定了房间时 /api/xxx 换成 /api/rooms/<room_id>/xxx（对时接口不区分房间）"""
+        if self.room_id and endpoint.startswith('/api/') and endpoint != '/api/time':
+            endpoint = f"/api/rooms/{self.room_id}/{endpoint[5:]}"
+        return self._prefix + endpoint
+
+    def _encode_request(self, method: str, path: str, params: Optional[Dict], json_body: Optional[Dict],
+                        headers: Dict[str, str]) -> bytes:
+        target = path + ('?' + urlencode(params) if params else '')
+        body = json.dumps(json_body, ensure_ascii=False).encode("utf-8") if json_body is not None else b""
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {self._host_header}", "Accept: application/json",
+                 f"Content-Length: {len(body)}"]
+        if json_body is not None:
+            lines.append("Content-Type: application/json")
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    async def _send(self, method: str, request: bytes, read_timeout: float) -> _Response:
+        """
+        通过连接池发送一个请求并读完响应
+        复用的空闲连接可能已被服务器关闭（还没有读到任何响应数据），这时换一个新连接重发一次
+        """
+        while True:
+            conn = await self.pool.acquire()
+            reusable = False
+            try:
+                conn.writer.write(request)
+                response = await asyncio.wait_for(self._exchange(conn, method), read_timeout)
+                reusable = response.keep_alive
+                return response
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                stale = conn.reused and (not isinstance(e, asyncio.IncompleteReadError) or not e.partial)
+                if not stale:
+                    raise
+            finally:
+                self.pool.release(conn, reusable)
+
+    @staticmethod
+    async def _exchange(conn: _Connection, method: str) -> _Response:
+        await conn.writer.drain()
+        return await _read_response(conn.reader, method)
+
+    def _backoff(self, attempt: int) -> float:
+        """第 attempt 次重试前的等待时间：指数退避 + 全随机抖动，避免大量客户端同时重试"""
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    async def _make_request(self, method: str, endpoint: str, params: Optional[Dict] = None,
+                            json_body: Optional[Dict] = None, headers: Optional[Dict] = None,
+                            wait: float = 0.0) -> Optional[Dict]:
+        """
+        发送HTTP请求的通用方法
+        :param method: HTTP方法（GET/POST）
+        :param endpoint: API端点路径
+        :param params: 查询参数
+        :param json_body: JSON请求体
+        :param headers: 额外的请求头
+        :param wait: 服务器可能挂起的秒数（长轮询），加到读超时上
+        :return: 响应数据字典，失败返回None，错误信息保存在self.last_error中
+        """
+        method = method.upper()
+        path = self._path(endpoint)
+        headers = dict(headers or {})
+        self.last_error = None
+        cache_key = cached = None
+        if method == 'GET':
+            # 带上次的ETag发送条件请求，数据未变化时服务器返回304且不带响应体。
+            # 长轮询（带since/wait）每次参数都不同，缓存了也不会再用到，不参与条件请求
+            if not params or ('since' not in params and 'wait' not in params):
+                cache_key = path + '?' + json.dumps(params or {}, sort_keys=True)
+                cached = self._etag_cache.get(cache_key)
+            if cached:
+                headers['If-None-Match'] = cached[0]
+        request = self._encode_request(method, path, params, json_body, headers)
+
+        attempts = 1 + (self.max_retries if method == 'GET' else 0)
+        for attempt in range(attempts):
+            if attempt:
+                await asyncio.sleep(self._backoff(attempt - 1))
+            if not self.breaker.allow():
+                self.last_error = f"服务器暂不可用（熔断中，{self.breaker.retry_after():.1f}秒后再试）"
+                return None
+            try:
+                response = await self._send(method, request, self.read_timeout + wait)
+            except PoolTimeout:
+                self.last_error = "请求超时：连接池已满，等待空闲连接超时"
+                logger.warning(self.last_error, extra={"fields": {"method": method, "endpoint": endpoint}})
+                return None
+            except asyncio.TimeoutError:
+                self.last_error = "请求超时"
+            except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+                self.last_error = f"连接失败：无法连接到服务器 {self.base_url}"
+            else:
+                if response.status not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return self._parse(method, endpoint, response, cache_key, cached)
+                self.last_error = f"服务器暂时不可用（HTTP {response.status}）"
+            self.breaker.record_failure()
+            logger.warning(self.last_error, extra={"fields": {
+                "method": method, "endpoint": endpoint, "attempt": attempt + 1}})
+        return None
+
+    def _parse(self, method: str, endpoint: str, response: _Response, cache_key: Optional[str],
+               cached: Optional[tuple]) -> Optional[Dict]:
+        """解析响应：与 APIClient 相同，code 为200时返回 data，否则保存错误信息并返回None"""
+        if response.status == 304 and cached:
+            return cached[1]
+        try:
+            data = json.loads(response.body)
+        except ValueError:
+            self.last_error = f"无法解析JSON响应（HTTP {response.status}）"
+            logger.warning("无法解析JSON响应", extra={"fields": {
+                "method": method, "endpoint": endpoint, "status": response.status}})
+            return None
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("收到响应", extra={
+                "sample": "poll" if method == 'GET' else None,
+                "fields": {"method": method, "endpoint": endpoint, "status": response.status, "response": data}})
+        if data.get('code') == 200:
+            etag = response.headers.get('etag')
+            if method == 'GET' and etag and cache_key:
+                self._etag_cache.pop(cache_key, None)
+                if len(self._etag_cache) >= ETAG_CACHE_SIZE:
+                    self._etag_cache.pop(next(iter(self._etag_cache)))
+                self._etag_cache[cache_key] = (etag, data.get('data', {}))
+            return data.get('data', {})
+        self.last_error = data.get('message', '未知错误')
+        logger.info("API错误", extra={"fields": {
+            "method": method, "endpoint": endpoint, "code": data.get('code'), "error": self.last_error}})
+        return None
+
+    async def register(self, group_name: str) -> Optional[Dict]:
+        """
+        注册组名
+        :param group_name: 组名
+        :return: 注册结果，包含group_name和total_groups
+        """
+        return await self._make_request('POST', '/api/register', json_body={'group_name': group_name})
+
+    async def get_word(self, group_name: str) -> Optional[str]:
+        """
+        获取自己的词语
+        :param group_name: 组名
+        :return: 词语字符串，失败返回None
+        """
+        result = await self._make_request('GET', '/api/word', params={'group_name': group_name})
+        return result.get('word') if result else None
+
+    async def get_status(self, since: Optional[int] = None, wait: Optional[float] = None) -> Optional[Dict]:
+        """
+        获取游戏阶段状态
+        :param since: 已知的状态版本号，配合wait使用长轮询
+        :param wait: 长轮询最长等待秒数
+        :return: 状态信息字典，包含status, round, active_groups, version等
+        """
+        if since is None or not wait:
+            return await self._make_request('GET', '/api/status')
+        return await self._make_request('GET', '/api/status', params={'since': since, 'wait': wait}, wait=wait)
+
+    async def get_round_view(self, since: Optional[int] = None, wait: Optional[float] = None) -> Optional[Dict]:
+        """
+        获取回合视图：一次请求取得刷新界面所需的全部数据（同一时刻的一致状态）
+        :param since: 已知的状态版本号，配合wait使用长轮询
+        :param wait: 长轮询最长等待秒数
+        :return: 视图字典，内容同 APIClient.get_round_view
+        """
+        if since is None or not wait:
+            return await self._make_request('GET', '/api/round/view')
+        return await self._make_request('GET', '/api/round/view', params={'since': since, 'wait': wait},
+                                        wait=wait)
+
+    async def sync_clock(self, samples: int = 5) -> Optional[float]:
+        """
+        与服务器对时：多次请求 /api/time，取往返时间最短的一次，以往返中点估算时钟偏差
+        :param samples: 请求次数
+        :return: 时钟偏差（服务器时间 - 本机时间，秒），全部失败返回None
+        """
+        best = None
+        for _ in range(samples):
+            sent = time.time()
+            result = await self._make_request('GET', '/api/time')
+            received = time.time()
+            if not result or 'server_time' not in result:
+                continue
+            rtt = received - sent
+            if best is None or rtt < best[0]:
+                best = (rtt, result['server_time'] - (sent + received) / 2)
+        if best is None:
+            return None
+        self.clock_rtt, self.clock_offset = best
+        return self.clock_offset
+
+    def to_local_time(self, server_timestamp: float) -> float:
+        """
+        把服务器时间戳换算成本机时间戳
+        :param server_timestamp: 服务器时间戳（秒）
+        :return: 本机 time.time() 时间基准下的时间戳；未对时按偏差为0处理
+        """
+        return server_timestamp - (self.clock_offset or 0.0)
+
+    async def submit_description(self, group_name: str, description: str) -> Optional[Dict]:
+        """
+        提交描述
+        :param group_name: 组名
+        :param description: 描述内容
+        :return: 提交结果，包含round和total_descriptions
+        """
+        return await self._make_request('POST', '/api/describe', json_body={
+            'group_name': group_name,
+            'description': description
+        })
+
+    async def submit_vote(self, voter_group: str, target_group: str) -> Optional[Dict]:
+        """
+        提交投票
+        :param voter_group: 投票者组名
+        :param target_group: 被投票者组名
+        :return: 提交结果，失败时返回None
+        """
+        result = await self._make_request('POST', '/api/vote', json_body={
+            'voter_group': voter_group,
+            'target_group': target_group
+        })
+        logger.info("提交投票", extra={"fields": {
+            "voter": voter_group, "target": target_group, "ok": result is not None, "error": self.last_error}})
+        return result
+
+    async def get_result(self) -> Optional[Dict]:
+        """
+        获取最近一次投票结果
+        :return: 投票结果字典，包含round, vote_count, eliminated等
+        """
+        return await self._make_request('GET', '/api/result')
+
+    async def report_issue(self, group_name: str, report_type: str, detail: str) -> Optional[Dict]:
+        """
+        上报异常
+        :param group_name: 组名
+        :param report_type: 异常类型
+        :param detail: 异常详情
+        :return: 上报结果，包含ticket和recorded_at
+        """
+        return await self._make_request('POST', '/api/report', json_body={
+            'group_name': group_name,
+            'type': report_type,
+            'detail': detail
+        })
+
+    async def get_groups(self) -> Optional[List[Dict]]:
+        """
+        获取所有注册的组
+        :return: 组列表
+        """
+        result = await self._make_request('GET', '/api/groups')
+        return result.get('groups', []) if result else None
+
+    async def get_descriptions(self) -> Optional[Dict]:
+        """
+        获取当前回合的所有描述
+        :return: 描述信息字典，包含round和descriptions列表
+        """
+        return await self._make_request('GET', '/api/descriptions')
+
+    async def batch(self, ops: List[Dict], atomic: bool = False,
+                    admin_token: Optional[str] = None) -> Optional[Dict]:
+        """
+        批量执行操作，服务器只获取一次房间锁
+        :param ops: 操作列表，格式同 APIClient.batch
+        :param atomic: 是否全部成功才生效
+        :param admin_token: 主持方令牌（批量中含主持方操作时需要）
+        :return: 批量结果，包含 results；atomic 模式失败时返回None
+        """
+        headers = {'X-Admin-Token': admin_token} if admin_token else {}
+        return await self._make_request('POST', '/api/batch', json_body={'ops': ops, 'atomic': atomic},
+                                        headers=headers)
+
+    async def iter_events(self, last_event_id: Optional[int] = None) -> AsyncIterator[Dict]:
+        """
+        订阅服务器事件推送（Server-Sent Events），逐个产出事件
+        使用单独的连接（不占用连接池），连接断开、出错或超过 EVENTS_READ_TIMEOUT 秒没有数据时迭代结束，
+        错误信息保存在self.last_error中，调用方可带上最后的事件id重连
+        :param last_event_id: 断线前收到的最后一个事件id，服务器会补发之后的事件
+        :return: 事件异步迭代器，每个事件为 {'id': 版本号或None, 'event': 事件类型, 'data': 事件数据}
+        """
+        headers = {'Accept': 'text/event-stream'}
+        if last_event_id is not None:
+            headers['Last-Event-ID'] = str(last_event_id)
+        self.last_error = None
+        if not self.breaker.allow():
+            self.last_error = f"服务器暂不可用（熔断中，{self.breaker.retry_after():.1f}秒后再试）"
+            return
+        writer = None
+        connected = False
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.pool.host, self.pool.port, ssl=self.pool.use_ssl or None,
+                                        limit=MAX_HEADER_SIZE), self.pool.connect_timeout)
+            writer.write(self._encode_request('GET', self._path('/api/events'), None, None, headers))
+            await writer.drain()
+            _, status, response_headers = await asyncio.wait_for(_read_head(reader), self.read_timeout)
+            connected = True
+            self.breaker.record_success()
+            if status != 200:
+                self.last_error = f"事件流连接失败（HTTP {status}）"
+                logger.warning(self.last_error)
+                return
+            body = _iter_body(reader, response_headers)
+            buffer = b""
+            event_id, event_type, data_lines = None, 'message', []
+            while True:
+                chunk = await asyncio.wait_for(body.__anext__(), EVENTS_READ_TIMEOUT)
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for raw in lines:
+                    line = raw.rstrip(b"\r").decode("utf-8")
+                    if not line:
+                        # 空行表示一个事件结束
+                        if data_lines:
+                            yield {'id': event_id, 'event': event_type, 'data': json.loads('\n'.join(data_lines))}
+                        event_id, event_type, data_lines = None, 'message', []
+                    elif line.startswith(':'):
+                        continue  # 心跳注释
+                    elif line.startswith('id:'):
+                        event_id = int(line[3:].strip())
+                    elif line.startswith('event:'):
+                        event_type = line[6:].strip()
+                    elif line.startswith('data:'):
+                        data_lines.append(line[5:].strip())
+        except StopAsyncIteration:
+            self.last_error = "事件流中断: 服务器关闭了连接"
+            logger.warning(self.last_error)
+        except asyncio.TimeoutError:
+            self.last_error = "事件流中断: 读取超时"
+            logger.warning(self.last_error)
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            self.last_error = f"事件流中断: {e}"
+            logger.warning(self.last_error)
+        except ValueError as e:
+            self.last_error = f"事件解析失败: {e}"
+            logger.warning(self.last_error)
+        finally:
+            if not connected:
+                self.breaker.record_failure()
+            if writer is not None:
+                writer.close()
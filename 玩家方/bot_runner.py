@@ -0,0 +1,334 @@
+"""
+无界面批量游戏方（机器人）
+一个进程同时驱动多个组：注册、获取词语、在本组的描述时间窗口内用 GameStrategy 生成并提交描述、投票，
+游戏重置后自动重新注册，可以一直跟着主持方一局接一局地玩下去
+
+并发模型（单核上也能驱动几百个组）：
+  - 每个房间一个状态轮询任务（/api/round/view），同房间的组共享这份状态，轮询请求数只随房间数增长；
+    对局进行中按 --poll-interval 轮询，等待开局和游戏结束时放慢，服务器出错时指数退避（PollScheduler）
+  - 需要发请求的动作（注册、获取词语、描述、投票）是一次请求的短任务，交给一个小线程池执行
+  - 描述任务由定时线程在本组窗口开始时才投递给线程池，等待期间不占用任何线程
+  - 每个组同一时间最多一个进行中的动作
+
+运行方式（在 玩家方 目录下，房间和对局由主持方创建和推进）：
+    python bot_runner.py --server http://127.0.0.1:5000 --groups 5
+    python bot_runner.py --server http://127.0.0.1:5000 --rooms room1,room2,room3 --groups 5 --duration 600
+"""
+import argparse
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from api_client import APIClient
+from game_strategy import GameStrategy
+from log_setup import setup_logging
+from poll_scheduler import PHASE_INTERVALS, PollScheduler
+
+logger = logging.getLogger(__name__)
+
+# 描述在窗口开始后多久提交（秒），留出对时误差
+DESCRIBE_MARGIN = 0.05
+
+# 注册失败（组名已占用、房间已满、游戏已开始）后多久再试（秒）
+REGISTER_RETRY = 5.0
+
+# 等待开局、游戏结束时房间的轮询间隔（秒）
+IDLE_POLL_INTERVAL = 2.0
+
+
+class Scheduler:
+    """定时任务 + 线程池：任务到期时才交给线程池执行，等待期间不占用线程"""
+
+    def __init__(self, workers: int):
+        """
+        :param workers: 线程池大小（同时进行中的请求数上限）
+        """
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bot")
+        self._timers: List[tuple] = []  # (到期时间, 序号, 函数, 参数) 的小顶堆
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="bot-timer", daemon=True)
+        self._thread.start()
+
+    def call_at(self, when: float, func: Callable, *args):
+        """在本机时间戳 when 时执行 func(*args)"""
+        with self._cond:
+            heapq.heappush(self._timers, (when, next(self._seq), func, args))
+            self._cond.notify()
+
+    def call_later(self, delay: float, func: Callable, *args):
+        self.call_at(time.time() + delay, func, *args)
+
+    def submit(self, func: Callable, *args):
+        """立即交给线程池执行"""
+        self._executor.submit(self._call, func, args)
+
+    @staticmethod
+    def _call(func: Callable, args: tuple):
+        try:
+            func(*args)
+        except Exception:
+            logger.exception("机器人任务出错")
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and (not self._timers or self._timers[0][0] > time.time()):
+                    self._cond.wait(self._timers[0][0] - time.time() if self._timers else None)
+                if not self._running:
+                    return
+                _, _, func, args = heapq.heappop(self._timers)
+            self.submit(func, *args)
+
+    def stop(self):
+        """停止定时线程，丢弃未开始的任务，等待进行中的任务结束"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class BotStats:
+    """所有机器人的统计（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+        self.describe_delays: List[float] = []  # 描述提交完成时间距本组窗口开始的秒数
+
+    def add(self, key: str, amount: int = 1):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + amount
+
+    def add_describe_delay(self, delay: float):
+        with self._lock:
+            self.describe_delays.append(delay)
+
+    def summary(self) -> str:
+        with self._lock:
+            counts = dict(self.counts)
+            delays = sorted(self.describe_delays)
+        keys = ("registered", "words", "describes", "describe_misses", "votes", "vote_failures")
+        text = "  ".join(f"{key}={counts.get(key, 0)}" for key in keys)
+        if delays:
+            text += (f"  描述延迟 p50={delays[len(delays) // 2] * 1000:.0f}ms"
+                     f" p95={delays[int(len(delays) * 0.95)] * 1000:.0f}ms")
+        return text
+
+
+class Bot:
+    """一个组：根据房间轮询到的状态决定下一个动作，动作在线程池中执行"""
+
+    def __init__(self, group_name: str, api: APIClient, scheduler: Scheduler, stats: BotStats):
+        self.group_name = group_name
+        self.api = api
+        self.scheduler = scheduler
+        self.stats = stats
+        self.strategy = GameStrategy()
+        self.word: Optional[str] = None
+        self.described_round = 0  # 已安排描述的回合
+        self.voted_round = 0  # 已投票的回合
+        self.pending = False  # 有进行中（或已安排）的动作
+        self._register_after = 0.0  # 注册失败后，此时间之前不再重试
+
+    def on_view(self, view: Dict):
+        """
+        收到房间的最新回合视图（在房间轮询任务中调用，同一房间的视图按顺序到达）
+        :param view: /api/round/view 的数据
+        """
+        if self.pending:
+            return
+        status = view['status']
+        phase = status.get('status')
+        round_num = status.get('round', 0)
+        active_groups = status.get('active_groups', [])
+
+        if phase in ('waiting', 'registered'):
+            if self.word:
+                # 上一局结束并已重置，清空本局状态
+                self.word = None
+                self.strategy = GameStrategy()
+                self.described_round = self.voted_round = 0
+            if self.group_name not in active_groups and time.time() >= self._register_after:
+                self._start(self._register)
+            return
+        if self.group_name not in active_groups:
+            return  # 没有参加本局，或已被淘汰
+
+        eliminated = [g for g in status.get('eliminated_groups', []) if g not in self.strategy.eliminated_groups]
+        if eliminated:
+            self.strategy.update_eliminated(eliminated)
+
+        if not self.word:
+            self._start(self._fetch_word)
+        elif phase == 'describing' and self.described_round != round_num:
+            self.described_round = round_num
+            window = (status.get('describe_deadlines') or {}).get(self.group_name)
+            if window:
+                start, end = self.api.to_local_time(window[0]), self.api.to_local_time(window[1])
+                self.pending = True
+                self.scheduler.call_at(start + DESCRIBE_MARGIN, self._run, self._describe, round_num, start, end)
+            else:
+                self._start(self._describe, round_num, time.time(), None)
+        elif phase == 'voting' and self.voted_round != round_num:
+            self.voted_round = round_num
+            self._start(self._vote, round_num, active_groups, view.get('descriptions') or {})
+
+    def _start(self, action: Callable, *args):
+        self.pending = True
+        self.scheduler.submit(self._run, action, *args)
+
+    def _run(self, action: Callable, *args):
+        try:
+            action(*args)
+        finally:
+            self.pending = False
+
+    def _register(self):
+        if self.api.register(self.group_name) is not None:
+            self.stats.add("registered")
+        else:
+            self._register_after = time.time() + REGISTER_RETRY
+            logger.info("注册失败", extra={"fields": {"group": self.group_name, "error": self.api.last_error}})
+
+    def _fetch_word(self):
+        word = self.api.get_word(self.group_name)
+        if word:
+            self.word = word
+            self.strategy.set_word(word, 'civilian')  # 游戏方不知道自己的身份，按平民处理
+            self.stats.add("words")
+
+    def _describe(self, round_num: int, start: float, end: Optional[float]):
+        description = self.strategy.generate_description(self.word)
+        result = self.api.submit_description(self.group_name, description)
+        finished = time.time()
+        if result is None or (end is not None and finished > end):
+            self.stats.add("describe_misses")
+            logger.info("描述未在窗口内完成", extra={"fields": {
+                "group": self.group_name, "round": round_num, "error": self.api.last_error}})
+            return
+        self.strategy.record_description(description)
+        self.stats.add("describes")
+        self.stats.add_describe_delay(finished - start)
+
+    def _vote(self, round_num: int, active_groups: List[str], descriptions: Dict):
+        current = {d.get('group'): d.get('description', '') for d in descriptions.get('descriptions', [])}
+        self.strategy.update_descriptions(current)
+        candidates = [g for g in active_groups if g != self.group_name]
+        target = self.strategy.decide_vote(candidates, current)
+        if target is None:
+            return
+        self.strategy.update_vote_history(self.group_name, target)
+        if self.api.submit_vote(self.group_name, target) is not None:
+            self.stats.add("votes")
+        else:
+            self.stats.add("vote_failures")
+
+
+class RoomBots:
+    """一个房间里的所有机器人：共享一个状态轮询任务"""
+
+    def __init__(self, server: str, room_id: Optional[str], group_names: List[str],
+                 scheduler: Scheduler, stats: BotStats, poll_interval: float):
+        self.room_id = room_id
+        self.api = APIClient(server, room_id)
+        self.scheduler = scheduler
+        self.poll_interval = poll_interval
+        self.bots = [Bot(name, APIClient(server, room_id), scheduler, stats) for name in group_names]
+        # 描述由各组按窗口时间单独定时，房间轮询只需要跟上阶段变化，不关心某个组的窗口
+        intervals = {phase: poll_interval for phase in PHASE_INTERVALS}
+        intervals.update(waiting=max(poll_interval, IDLE_POLL_INTERVAL),
+                         game_end=max(poll_interval, IDLE_POLL_INTERVAL))
+        self.poll_scheduler = PollScheduler(None, self.api.to_local_time, intervals)
+        self.running = False
+
+    def start(self):
+        self.running = True
+        self.scheduler.submit(self._start)
+
+    def _start(self):
+        # 对时一次，同一进程内的机器人共用这个时钟偏差
+        self.api.sync_clock()
+        for bot in self.bots:
+            bot.api.clock_offset = self.api.clock_offset
+        self._poll()
+
+    def _poll(self):
+        if not self.running:
+            return
+        delay = None
+        try:
+            view = self.api.get_round_view()
+            if view:
+                delay = self.poll_scheduler.on_success(view['status'])
+                for bot in self.bots:
+                    bot.on_view(view)
+        finally:
+            self.scheduler.call_later(delay if delay is not None else self.poll_scheduler.on_error(), self._poll)
+
+
+class BotRunner:
+    """批量机器人：若干房间 × 每房间若干组"""
+
+    def __init__(self, server: str, rooms: List[Optional[str]], groups: int, prefix: str = "bot",
+                 workers: int = 8, poll_interval: float = 0.5):
+        """
+        :param server: 主持方服务器地址
+        :param rooms: 房间ID列表，None 表示默认房间
+        :param groups: 每个房间的组数
+        :param prefix: 组名前缀，组名为 <前缀><序号>
+        :param workers: 线程池大小
+        :param poll_interval: 对局进行中每个房间的状态轮询间隔（秒）
+        """
+        self.scheduler = Scheduler(workers)
+        self.stats = BotStats()
+        self.rooms = [RoomBots(server, room_id, [f"{prefix}{index + 1}" for index in range(groups)],
+                               self.scheduler, self.stats, poll_interval) for room_id in rooms]
+
+    def start(self):
+        for room in self.rooms:
+            room.start()
+
+    def stop(self):
+        for room in self.rooms:
+            room.running = False
+        self.scheduler.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="无界面批量游戏方：一个进程驱动多个组自动对局")
+    parser.add_argument("--server", default="http://127.0.0.1:5000", help="主持方服务器地址")
+    parser.add_argument("--rooms", default="", help="房间ID，逗号分隔；不指定时使用默认房间")
+    parser.add_argument("--groups", type=int, default=5, help="每个房间的组数")
+    parser.add_argument("--prefix", default="bot", help="组名前缀")
+    parser.add_argument("--workers", type=int, default=8, help="线程池大小")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="对局进行中每个房间的状态轮询间隔（秒）")
+    parser.add_argument("--duration", type=float, default=0, help="运行秒数，0 表示一直运行直到 Ctrl+C")
+    parser.add_argument("--report-interval", type=float, default=10, help="统计输出间隔（秒）")
+    args = parser.parse_args()
+
+    setup_logging()
+    rooms = [room.strip() for room in args.rooms.split(",") if room.strip()] or [None]
+    runner = BotRunner(args.server, rooms, args.groups, args.prefix, args.workers, args.poll_interval)
+    print(f"启动 {len(rooms)} 个房间 × {args.groups} 个组，线程池 {args.workers}")
+    runner.start()
+    started = time.time()
+    try:
+        while not args.duration or time.time() - started < args.duration:
+            remaining = args.duration - (time.time() - started) if args.duration else args.report_interval
+            time.sleep(max(0.0, min(args.report_interval, remaining)))
+            print(f"[{time.time() - started:6.0f}s] {runner.stats.summary()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        runner.stop()
+    print(f"结束: {runner.stats.summary()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,10 +4,105 @@
 """
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
+import logging
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from api_client import APIClient
 from game_strategy import GameStrategy
+from log_setup import setup_logging
+from poll_scheduler import PollScheduler
+
+logger = logging.getLogger(__name__)
+
+# 状态长轮询的最长等待时间（秒）
+LONG_POLL_WAIT = 25
+
+# 游戏日志最多保留的行数；超出 LOG_TRIM_BATCH 行后一次删除最早的行，回到 MAX_LOG_LINES
+MAX_LOG_LINES = 500
+LOG_TRIM_BATCH = 50
+
+# 后台网络线程数（注册、获取词语、提交描述和投票、刷新描述）
+IO_WORKERS = 2
+
+# 自动描述：每回合预先生成的候选描述数，在本组窗口开始后多久提交（秒，留出对时误差）
+AUTO_DESCRIBE_CANDIDATES = 3
+AUTO_DESCRIBE_MARGIN = 0.05
+
+
+def format_description_time(desc_time: str) -> str:
+    """描述提交时间（ISO 格式）显示为 时:分:秒，无法解析时原样显示"""
+    try:
+        return datetime.fromisoformat(desc_time.replace('Z', '+00:00')).strftime('%H:%M:%S')
+    except (ValueError, AttributeError):
+        return desc_time
+
+
+class BackgroundIO:
+    """
+    后台网络执行器：网络请求在后台线程中执行，结果通过 root.after 交回 Tk 主线程处理，
+    界面不会因为网络慢而卡住（描述倒计时照常刷新）；
+    同一个 key 的任务还没处理完时再次提交会被忽略，轮询重叠时请求不会堆积，按钮连点也不会重复提交
+    """
+
+    def __init__(self, root, workers: int = IO_WORKERS):
+        self.root = root
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="client-io")
+        self._in_flight: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, func: Callable, *args, on_done: Optional[Callable] = None,
+               on_error: Optional[Callable] = None) -> bool:
+        """
+        在后台线程执行 func(*args)，完成后在 Tk 主线程调用 on_done(结果)，出错时调用 on_error(异常)
+        :param key: 任务标识，同一标识同时只有一个任务（从提交到回调执行完）
+        :return: 是否已提交（同一标识的任务进行中时返回 False）
+        """
+        with self._lock:
+            if key in self._in_flight:
+                return False
+            self._in_flight.add(key)
+        try:
+            self._executor.submit(self._run, key, func, args, on_done, on_error)
+        except RuntimeError:  # 已关闭
+            self._finish(key)
+            return False
+        return True
+
+    def is_busy(self, key: str) -> bool:
+        with self._lock:
+            return key in self._in_flight
+
+    def _run(self, key: str, func: Callable, args: tuple, on_done: Optional[Callable],
+             on_error: Optional[Callable]):
+        try:
+            result = func(*args)
+            callback, value = on_done, result
+        except Exception as e:
+            logger.exception("后台请求出错", extra={"fields": {"task": key}})
+            callback, value = on_error, e
+        try:
+            self.root.after(0, self._deliver, key, callback, value)
+        except (RuntimeError, tk.TclError):  # 窗口已关闭
+            self._finish(key)
+
+    def _deliver(self, key: str, callback: Optional[Callable], value):
+        """在 Tk 主线程中执行回调"""
+        try:
+            if callback is not None:
+                callback(value)
+        finally:
+            self._finish(key)
+
+    def _finish(self, key: str):
+        with self._lock:
+            self._in_flight.discard(key)
+
+    def shutdown(self):
+        """不再接受新任务，丢弃排队中的任务（进行中的请求在后台线程结束后自行退出）"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
 
 class GameClient:
@@ -26,14 +121,28 @@ class GameClient:
         self.my_role = None
         self.is_running = False
         self.status_polling_thread = None
-        self.countdown_thread = None
+        self.countdown_job = None  # 倒计时的 Tk 定时任务
         self.countdown_seconds = 0
         self.countdown_running = False
+        self.describe_window = None  # 本组描述时间窗口 (开始, 结束)，本机时间戳
         self.current_round = 0
         self.all_descriptions = []  # 存储所有组的描述
+        self.last_status_data = {}  # 最近一次轮询到的状态
+        # 描述区已显示的内容：(回合, 组名) -> (行号, 文本)，描述顺序，下一行的行号；回合为 None 表示显示“暂无描述”
+        self._desc_rows: Dict[Tuple[int, str], Tuple[int, Optional[Tuple[str, str]]]] = {}
+        self._desc_groups: List[str] = []
+        self._desc_round: Optional[int] = -1
+        self._desc_next_row = 1
+        self._log_lines = 0  # 游戏日志当前行数
+        # 自动描述：回合 -> 候选描述（分配词语或回合结束时预先生成），已安排的提交任务，每次提交的端到端延迟（秒）
+        self.auto_candidates: Dict[int, List[str]] = {}
+        self.auto_describe_job = None
+        self.describe_latencies: List[float] = []
+        self.io = BackgroundIO(root)  # 网络请求在后台线程执行，界面线程只处理结果
         
         # 创建界面
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
     
     def create_widgets(self):
         """创建GUI组件"""
@@ -83,6 +192,7 @@ class GameClient:
         
         self.descriptions_text = scrolledtext.ScrolledText(desc_frame, height=8, width=40)
         self.descriptions_text.pack(fill=tk.BOTH, expand=True)
+        self.descriptions_text.tag_config("timeout", foreground="red")
         
         # 游戏日志区域
         ttk.Label(right_frame, text="游戏日志:", font=("Arial", 12, "bold")).pack(anchor=tk.W)
@@ -107,6 +217,10 @@ class GameClient:
         self.submit_desc_btn = ttk.Button(desc_frame, text="提交描述", command=self.submit_description)
         self.submit_desc_btn.pack(side=tk.LEFT, padx=5)
         
+        self.auto_describe_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(desc_frame, text="自动描述", variable=self.auto_describe_var,
+                        command=self.on_auto_describe_toggled).pack(side=tk.LEFT, padx=5)
+        
         # 投票区域
         vote_frame = ttk.Frame(action_frame)
         vote_frame.pack(fill=tk.X, pady=5)
@@ -123,10 +237,21 @@ class GameClient:
         self.submit_desc_btn.config(state=tk.DISABLED)
         self.submit_vote_btn.config(state=tk.DISABLED)
     
+    def close(self):
+        """关闭窗口：停止轮询和后台网络线程"""
+        self.is_running = False
+        self.io.shutdown()
+        self.root.destroy()
+    
     def log(self, message: str):
-        """添加日志"""
+        """添加日志（最多保留 MAX_LOG_LINES 行，长时间多局运行时日志区不会无限增长）"""
         timestamp = time.strftime("%H:%M:%S")
         self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
+        self._log_lines += message.count("\n") + 1
+        if self._log_lines > MAX_LOG_LINES + LOG_TRIM_BATCH:
+            excess = self._log_lines - MAX_LOG_LINES
+            self.log_text.delete("1.0", f"{excess + 1}.0")
+            self._log_lines = MAX_LOG_LINES
         self.log_text.see(tk.END)
     
     def register_group(self):
@@ -142,19 +267,36 @@ class GameClient:
         self.api_client = APIClient(server_url)
         self.group_name = group_name
         
-        # 尝试注册
+        # 尝试注册（后台线程），注册成功后与服务器对时，描述时间窗口按服务器时间戳公布
         self.log(f"正在注册组名: {group_name}")
-        result = self.api_client.register(group_name)
+        self.register_btn.config(state=tk.DISABLED)
+        api_client = self.api_client
         
+        def register():
+            result = api_client.register(group_name)
+            offset = api_client.sync_clock() if result else None
+            return result, offset
+        
+        self.io.submit('register', register, on_done=self.on_registered,
+                       on_error=lambda e: self.on_registered((None, None)))
+    
+    def on_registered(self, outcome: tuple):
+        """
+        注册结果（Tk 主线程）
+        :param outcome: (注册结果, 时钟偏差)
+        """
+        result, offset = outcome
         if result:
             self.log(f"注册成功！总组数: {result.get('total_groups', 0)}")
-            self.register_btn.config(state=tk.DISABLED)
+            if offset is not None:
+                self.log(f"时钟偏差: {offset * 1000:+.0f}ms（往返 {self.api_client.clock_rtt * 1000:.0f}ms）")
             self.server_url_entry.config(state=tk.DISABLED)
             self.group_name_entry.config(state=tk.DISABLED)
             
             # 开始状态轮询
             self.start_status_polling()
         else:
+            self.register_btn.config(state=tk.NORMAL)
             self.log("注册失败，请检查服务器地址和组名")
             messagebox.showerror("错误", "注册失败，请检查服务器地址和组名")
     
@@ -166,22 +308,39 @@ class GameClient:
         self.is_running = True
         
         def poll_status():
+            # 轮询时间由调度器按阶段、服务器公布的时间点和连续失败次数决定
+            scheduler = PollScheduler(self.group_name, self.api_client.to_local_time)
+            version = None
+            wait = LONG_POLL_WAIT
             while self.is_running:
                 try:
-                    status = self.api_client.get_status()
-                    if status:
-                        self.root.after(0, self.update_status, status)
-                    time.sleep(2)  # 每2秒轮询一次
+                    # 长轮询回合视图：服务器在状态版本变化时立即返回，否则最多挂起 wait 秒
+                    # 一次响应包含状态和描述，界面刷新不再需要额外请求
+                    view = self.api_client.get_round_view(since=version, wait=wait)
+                    if view:
+                        self.root.after(0, self.update_status, view['status'], view)
+                        if 'version' in view:
+                            version = view['version']
+                            wait = scheduler.on_success(view['status'], long_poll_wait=LONG_POLL_WAIT)
+                        else:
+                            # 服务器不支持长轮询，按阶段间隔轮询
+                            time.sleep(scheduler.on_success(view['status']))
+                    else:
+                        time.sleep(scheduler.on_error())
                 except Exception as e:
-                    self.log(f"状态轮询错误: {e}")
-                    time.sleep(2)
+                    self.root.after(0, self.log, f"状态轮询错误: {e}")
+                    time.sleep(scheduler.on_error())
         
         self.status_polling_thread = threading.Thread(target=poll_status, daemon=True)
         self.status_polling_thread.start()
         self.log("开始状态轮询...")
     
-    def update_status(self, status_data: dict):
-        """更新游戏状态显示"""
+    def update_status(self, status_data: dict, view: dict = None):
+        """
+        更新游戏状态显示
+        :param status_data: 状态信息（/api/status 的数据）
+        :param view: 同一版本的回合视图，提供时直接用它刷新描述，不再请求服务器
+        """
         status = status_data.get('status', '')
         round_num = status_data.get('round', 0)
         active_groups = status_data.get('active_groups', [])
@@ -204,15 +363,15 @@ class GameClient:
         self.status_label.config(text=status_map.get(status, status))
         self.round_label.config(text=str(round_num))
         
-        # 如果词语已分配，获取词语
+        # 如果词语已分配，获取词语（后台线程，进行中时不重复请求）
         if status == 'word_assigned' and not self.my_word:
-            word = self.api_client.get_word(self.group_name)
-            if word:
-                self.my_word = word
-                self.word_label.config(text=word)
-                self.log(f"获取到词语: {word}")
-                # 判断身份（需要根据实际情况调整）
-                # 这里简化处理，实际应该根据词语判断
+            self.io.submit('word', self.api_client.get_word, self.group_name, on_done=self.on_word)
+        
+        # 自动描述：描述阶段开始前（分配词语、上一回合结束）就生成本回合的候选描述
+        if status in ('waiting', 'registered'):
+            self.auto_candidates.clear()
+        elif status in ('word_assigned', 'round_end', 'describing'):
+            self.prepare_auto_description(round_num)
         
         # 根据状态启用/禁用按钮
         if status == 'describing':
@@ -227,8 +386,20 @@ class GameClient:
             # 启动描述时间倒计时（3秒限制）
             if round_num != self.current_round:  # 新回合开始
                 self.current_round = round_num
-                self.start_description_countdown()
-                self.log(f"第 {round_num} 回合开始，请在3秒内提交描述！")
+                window = None
+                deadlines = status_data.get('describe_deadlines') or {}
+                if self.group_name in deadlines:
+                    # 服务器公布了每组的时间窗口，换算成本机时间精确倒计时
+                    start, end = deadlines[self.group_name]
+                    window = (self.api_client.to_local_time(start), self.api_client.to_local_time(end))
+                self.start_description_countdown(window)
+                self.submit_desc_btn.config(state=tk.NORMAL)
+                if window and window[0] > time.time():
+                    self.log(f"第 {round_num} 回合开始，{window[0] - time.time():.1f}秒后轮到本组，窗口3秒")
+                else:
+                    self.log(f"第 {round_num} 回合开始，请在3秒内提交描述！")
+                if self.auto_describe_var.get():
+                    self.schedule_auto_description(round_num)
         elif status == 'voting':
             # 投票阶段：禁用描述提交，启用投票按钮
             # 无论描述是否超时，投票功能都应该可用
@@ -236,6 +407,7 @@ class GameClient:
             self.submit_vote_btn.config(state=tk.NORMAL)
             # 停止倒计时
             self.stop_countdown()
+            self.cancel_auto_description()
             
             # 更新投票目标列表
             # 优先使用 active_groups，如果为空则使用 describe_order
@@ -248,69 +420,110 @@ class GameClient:
                     # 如果 describe_order 也为空，记录警告
                     self.log(f"⚠️ active_groups 和 describe_order 都为空")
             
-            # 如果 active_groups 仍然为空，尝试从所有注册的组获取（备用方案）
+            # 如果 active_groups 仍然为空，尝试从所有注册的组获取（备用方案，后台线程）
             if not active_groups:
-                # 尝试通过 API 获取所有组
-                all_groups = self.api_client.get_groups()
-                if all_groups:
-                    active_groups = [g['name'] for g in all_groups if g['name'] not in eliminated_groups]
-                    self.log(f"从 get_groups API 获取 active_groups: {active_groups}")
-            
-            # 过滤出可以投票的组（排除自己和已淘汰的组）
-            other_groups = [g for g in active_groups if g != self.group_name and g not in eliminated_groups]
-            
-            # 调试日志（只在第一次或列表变化时记录，避免日志过多）
-            if not hasattr(self, '_last_vote_groups') or self._last_vote_groups != other_groups:
-                self.log(f"投票阶段 - active_groups: {active_groups}, describe_order: {describe_order}, other_groups: {other_groups}")
-                self._last_vote_groups = other_groups
-            
-            if other_groups:
-                self.vote_target_combo['values'] = other_groups
-                # 如果当前值不在列表中，设置默认值
-                current_value = self.vote_target_var.get()
-                if not current_value or current_value not in other_groups:
-                    self.vote_target_var.set(other_groups[0])
+                def on_groups(all_groups):
+                    groups = [g['name'] for g in all_groups or [] if g['name'] not in eliminated_groups]
+                    if groups:
+                        self.log(f"从 get_groups API 获取 active_groups: {groups}")
+                    self.update_vote_targets(groups, describe_order, eliminated_groups)
+                self.io.submit('groups', self.api_client.get_groups, on_done=on_groups)
             else:
-                # 如果没有其他组，记录详细日志（只记录一次，避免日志过多）
-                if not hasattr(self, '_vote_empty_logged') or not self._vote_empty_logged:
-                    self.log(f"⚠️ 投票目标列表为空！")
-                    self.log(f"  - active_groups: {active_groups}")
-                    self.log(f"  - describe_order: {describe_order}")
-                    self.log(f"  - eliminated_groups: {eliminated_groups}")
-                    self.log(f"  - 我的组名: {self.group_name}")
-                    self._vote_empty_logged = True
-                self.vote_target_combo['values'] = []
-                self.vote_target_var.set("")
+                self.update_vote_targets(active_groups, describe_order, eliminated_groups)
             
             # 获取并显示所有组的描述
-            self.update_all_descriptions()
+            self.update_all_descriptions(view)
         else:
             self.submit_desc_btn.config(state=tk.DISABLED)
             self.submit_vote_btn.config(state=tk.DISABLED)
             self.stop_countdown()
+            self.cancel_auto_description()
     
-    def start_description_countdown(self):
-        """启动描述倒计时（3秒）"""
+    def on_word(self, word: Optional[str]):
+        """获取到词语（Tk 主线程）"""
+        if word and not self.my_word:
+            self.my_word = word
+            self.word_label.config(text=word)
+            self.log(f"获取到词语: {word}")
+            # 判断身份（需要根据实际情况调整）
+            # 这里简化处理，实际应该根据词语判断
+            self.strategy.set_word(word, 'civilian')
+            status = self.last_status_data
+            if status.get('status') in ('word_assigned', 'round_end', 'describing'):
+                self.prepare_auto_description(status.get('round', 0))
+    
+    def update_vote_targets(self, active_groups: list, describe_order: list, eliminated_groups: list):
+        """更新投票目标下拉列表"""
+        # 过滤出可以投票的组（排除自己和已淘汰的组）
+        other_groups = [g for g in active_groups if g != self.group_name and g not in eliminated_groups]
+        
+        # 调试日志（只在第一次或列表变化时记录，避免日志过多）
+        if not hasattr(self, '_last_vote_groups') or self._last_vote_groups != other_groups:
+            self.log(f"投票阶段 - active_groups: {active_groups}, describe_order: {describe_order}, other_groups: {other_groups}")
+            self._last_vote_groups = other_groups
+        
+        if other_groups:
+            self.vote_target_combo['values'] = other_groups
+            # 如果当前值不在列表中，设置默认值
+            current_value = self.vote_target_var.get()
+            if not current_value or current_value not in other_groups:
+                self.vote_target_var.set(other_groups[0])
+        else:
+            # 如果没有其他组，记录详细日志（只记录一次，避免日志过多）
+            if not hasattr(self, '_vote_empty_logged') or not self._vote_empty_logged:
+                self.log(f"⚠️ 投票目标列表为空！")
+                self.log(f"  - active_groups: {active_groups}")
+                self.log(f"  - describe_order: {describe_order}")
+                self.log(f"  - eliminated_groups: {eliminated_groups}")
+                self.log(f"  - 我的组名: {self.group_name}")
+                self._vote_empty_logged = True
+            self.vote_target_combo['values'] = []
+            self.vote_target_var.set("")
+    
+    def start_description_countdown(self, window: tuple = None):
+        """
+        启动描述倒计时
+        :param window: 本组描述时间窗口 (开始, 结束)，本机时间戳；None 表示从现在起3秒
+        """
         self.stop_countdown()  # 先停止之前的倒计时
-        self.countdown_seconds = 3
+        if window is None:
+            now = time.time()
+            window = (now, now + 3)
+        self.describe_window = window
         self.countdown_running = True
-        
-        def countdown():
-            while self.countdown_seconds > 0 and self.countdown_running:
-                self.root.after(0, self.update_countdown_label, self.countdown_seconds)
-                time.sleep(1)
-                self.countdown_seconds -= 1
-            
-            if self.countdown_seconds == 0 and self.countdown_running:
-                self.root.after(0, self.countdown_timeout)
-        
-        self.countdown_thread = threading.Thread(target=countdown, daemon=True)
-        self.countdown_thread.start()
+        self.countdown_seconds = max(1, int(window[1] - time.time() + 0.999))
+        self.countdown_tick()
+    
+    def countdown_tick(self):
+        """倒计时刷新（Tk 定时任务），按窗口的绝对时间计算剩余秒数，不会因为调度延迟累积误差"""
+        self.countdown_job = None
+        if not self.countdown_running:
+            return
+        now = time.time()
+        start, end = self.describe_window
+        if now >= end:
+            self.countdown_running = False
+            self.countdown_seconds = 0
+            self.countdown_timeout()
+            return
+        self.countdown_seconds = int(end - now + 0.999)
+        if now < start:
+            waiting = int(start - now + 0.999)
+            self.desc_time_label.config(text=f"等待轮到本组: {waiting}秒", foreground="orange")
+            next_change = (start - now) % 1 or 1
+        else:
+            self.update_countdown_label(self.countdown_seconds)
+            next_change = (end - now) % 1 or 1
+        # 在下一个整秒变化时刷新
+        self.countdown_job = self.root.after(max(10, int(next_change * 1000)), self.countdown_tick)
     
     def stop_countdown(self):
         """停止倒计时"""
         self.countdown_running = False
         self.countdown_seconds = 0
+        if self.countdown_job is not None:
+            self.root.after_cancel(self.countdown_job)
+            self.countdown_job = None
         self.root.after(0, self.update_countdown_label, 0)
     
     def update_countdown_label(self, seconds):
@@ -328,69 +541,71 @@ class GameClient:
         self.log(f"⚠️ {self.group_name}组描述超时（3秒限制），无法提交描述")
         # 不显示弹窗，只在日志中提示，避免打断用户
     
-    def update_all_descriptions(self):
-        """更新所有组的描述显示，包括超时的组"""
-        descriptions = self.api_client.get_descriptions()
-        status = self.api_client.get_status()
-        
-        if descriptions:
-            self.all_descriptions = descriptions.get('descriptions', [])
-            self.descriptions_text.delete(1.0, tk.END)
-            
-            round_num = descriptions.get('round', 0)
-            describe_order = []
-            
-            # 获取描述顺序
-            if status:
-                describe_order = status.get('describe_order', [])
-            
-            if self.all_descriptions or describe_order:
-                self.descriptions_text.insert(tk.END, f"第 {round_num} 回合描述：\n\n")
-                
-                # 获取已提交描述的组名
-                submitted_groups = {desc.get('group') for desc in self.all_descriptions}
-                
-                # 按顺序显示所有组的描述状态
-                for group_name in describe_order:
-                    if group_name in submitted_groups:
-                        # 找到对应的描述
-                        desc = next((d for d in self.all_descriptions if d.get('group') == group_name), None)
-                        if desc:
-                            desc_text = desc.get('description', '')
-                            desc_time = desc.get('time', '')
-                            # 格式化时间
-                            try:
-                                from datetime import datetime
-                                dt = datetime.fromisoformat(desc_time.replace('Z', '+00:00'))
-                                time_str = dt.strftime('%H:%M:%S')
-                            except:
-                                time_str = desc_time
-                            self.descriptions_text.insert(tk.END, f"[{group_name}] {desc_text} ({time_str})\n")
-                    else:
-                        # 未提交描述，显示超时（红色）
-                        self.descriptions_text.insert(tk.END, f"[{group_name}] 描述超时\n")
-                        # 标记超时文本
-                        start_pos = self.descriptions_text.index("end-1l linestart")
-                        end_pos = self.descriptions_text.index("end-1l lineend")
-                        self.descriptions_text.tag_add("timeout", start_pos, end_pos)
-                        self.descriptions_text.tag_config("timeout", foreground="red")
-            elif self.all_descriptions:
-                # 如果没有顺序信息，只显示已提交的描述
-                self.descriptions_text.insert(tk.END, f"第 {round_num} 回合描述：\n\n")
-                for desc in self.all_descriptions:
-                    group_name = desc.get('group', '未知')
-                    desc_text = desc.get('description', '')
-                    desc_time = desc.get('time', '')
-                    # 格式化时间
-                    try:
-                        from datetime import datetime
-                        dt = datetime.fromisoformat(desc_time.replace('Z', '+00:00'))
-                        time_str = dt.strftime('%H:%M:%S')
-                    except:
-                        time_str = desc_time
-                    self.descriptions_text.insert(tk.END, f"[{group_name}] {desc_text} ({time_str})\n")
-            else:
+    def update_all_descriptions(self, view: dict = None):
+        """
+        更新所有组的描述显示，包括超时的组
+        :param view: 回合视图，未提供时在后台请求一次 /api/round/view（描述和描述顺序来自同一快照），返回后再显示
+        """
+        if view is None:
+            self.io.submit('round_view', self.api_client.get_round_view, on_done=self.render_descriptions)
+        else:
+            self.render_descriptions(view)
+    
+    def render_descriptions(self, view: Optional[dict]):
+        """
+        按回合视图显示所有组的描述（增量更新）
+        每一行按 (回合, 组名) 记录所在行号和原始的 (描述, 时间)（未提交为None）：同一回合只追加新的组、改写内容变化的行
+        （例如超时的组补交了描述），只有这些行才格式化时间；回合变化或描述顺序变化时才整体重画
+        """
+        descriptions = view.get('descriptions') if view else None
+        if not descriptions:
+            return
+        status = view.get('status') or {}
+        self.all_descriptions = descriptions.get('descriptions', [])
+        round_num = descriptions.get('round', 0)
+        submitted = {desc.get('group', '未知'): desc for desc in self.all_descriptions}
+        # 有描述顺序时按顺序显示所有组（未提交的显示超时），否则只显示已提交的描述
+        groups = status.get('describe_order', []) or list(submitted)
+        
+        if not groups:
+            if self._desc_round is not None:
+                self._clear_descriptions()
                 self.descriptions_text.insert(tk.END, "暂无描述")
+                self._desc_round = None
+            return
+        if round_num != self._desc_round or groups[:len(self._desc_groups)] != self._desc_groups:
+            self._clear_descriptions()
+            self.descriptions_text.insert(tk.END, f"第 {round_num} 回合描述：\n\n")
+            self._desc_round = round_num
+            self._desc_next_row = 3  # 标题占两行
+        
+        for group_name in groups:
+            desc = submitted.get(group_name)
+            raw = (desc.get('description', ''), desc.get('time', '')) if desc is not None else None
+            key = (round_num, group_name)
+            rendered = self._desc_rows.get(key)
+            if rendered is not None and rendered[1] == raw:
+                continue  # 已显示且内容没变，不重新格式化
+            if raw is not None:
+                text = raw[0].replace('\n', ' ')
+                line, tags = f"[{group_name}] {text} ({format_description_time(raw[1])})", ()
+            else:
+                line, tags = f"[{group_name}] 描述超时", ("timeout",)  # 未提交描述，显示超时（红色）
+            if rendered is None:
+                self.descriptions_text.insert(tk.END, line + "\n", tags)
+                self._desc_rows[key] = (self._desc_next_row, raw)
+                self._desc_groups.append(group_name)
+                self._desc_next_row += 1
+            else:
+                row = rendered[0]
+                self.descriptions_text.delete(f"{row}.0", f"{row}.end")
+                self.descriptions_text.insert(f"{row}.0", line, tags)
+                self._desc_rows[key] = (row, raw)
+    
+    def _clear_descriptions(self):
+        self.descriptions_text.delete(1.0, tk.END)
+        self._desc_rows = {}
+        self._desc_groups = []
     
     def submit_description(self):
         """提交描述"""
@@ -405,20 +620,165 @@ class GameClient:
             messagebox.showerror("错误", "描述提交时间已过（3秒限制），无法提交")
             return
         
+        if self.io.is_busy('describe'):
+            return  # 上一次提交还没有结果
         self.log(f"提交描述: {description}")
-        result = self.api_client.submit_description(self.group_name, description)
+        self.submit_desc_btn.config(state=tk.DISABLED)  # 请求返回前不能重复提交
+        api_client = self.api_client
         
+        def describe():
+            return api_client.submit_description(self.group_name, description), api_client.last_error
+        
+        self.io.submit('describe', describe, on_done=lambda outcome: self.on_description_submitted(outcome, description),
+                       on_error=lambda e: self.on_description_submitted((None, str(e))))
+    
+    def on_description_submitted(self, outcome: tuple, description: Optional[str] = None):
+        """
+        描述提交结果（Tk 主线程）
+        :param outcome: (提交结果, 错误信息)
+        :param description: 提交的描述
+        """
+        result, error_msg = outcome
         if result:
             self.log(f"描述提交成功！回合: {result.get('round', 0)}")
+            if description:
+                self.strategy.record_description(description)
             self.description_entry.delete(0, tk.END)
             self.submit_desc_btn.config(state=tk.DISABLED)
             self.stop_countdown()
             # 更新描述显示
             self.update_all_descriptions()
         else:
-            self.log("描述提交失败")
+            if self.countdown_running:
+                self.submit_desc_btn.config(state=tk.NORMAL)  # 窗口还没结束，可以再试
+            self.log(f"描述提交失败: {error_msg or '未知错误'}")
             messagebox.showerror("错误", "描述提交失败")
     
+    def on_auto_describe_toggled(self):
+        """勾选或取消自动描述（Tk 主线程）"""
+        if not self.auto_describe_var.get():
+            self.cancel_auto_description()
+            return
+        status = self.last_status_data
+        if status.get('status') in ('word_assigned', 'round_end', 'describing'):
+            self.prepare_auto_description(status.get('round', 0))
+        if status.get('status') == 'describing' and self.countdown_running:
+            self.schedule_auto_description(self.current_round)  # 本回合的窗口还没结束
+    
+    def generate_auto_candidates(self, word: str) -> List[str]:
+        """
+        用 GameStrategy.generate_description 生成若干个不重复的候选描述
+        :param word: 本组词语
+        :return: 候选描述列表
+        """
+        candidates = []
+        for _ in range(AUTO_DESCRIBE_CANDIDATES):
+            description = (self.strategy.generate_description(word) or '').strip()
+            if description and description not in candidates:
+                candidates.append(description)
+        return candidates
+    
+    def prepare_auto_description(self, round_num: int):
+        """
+        预先生成某回合的候选描述（后台线程），到本组窗口开始时直接提交，不在窗口内等待生成
+        :param round_num: 回合数
+        """
+        if (not self.auto_describe_var.get() or not self.my_word or round_num in self.auto_candidates
+                or self.io.is_busy('auto_candidates')):
+            return
+        
+        def on_candidates(candidates: List[str]):
+            # 只保留本回合及之后的缓存
+            self.auto_candidates = {r: c for r, c in self.auto_candidates.items() if r >= round_num}
+            self.auto_candidates.setdefault(round_num, candidates)
+        
+        self.io.submit('auto_candidates', self.generate_auto_candidates, self.my_word, on_done=on_candidates)
+    
+    def schedule_auto_description(self, round_num: int):
+        """
+        安排在本组描述窗口开始时自动提交描述（Tk 定时任务）
+        :param round_num: 回合数
+        """
+        self.cancel_auto_description()
+        if not self.describe_window:
+            return
+        delay = self.describe_window[0] + AUTO_DESCRIBE_MARGIN - time.time()
+        self.auto_describe_job = self.root.after(max(0, int(delay * 1000)), self.auto_submit_description, round_num)
+    
+    def cancel_auto_description(self):
+        """取消已安排的自动提交"""
+        if self.auto_describe_job is not None:
+            self.root.after_cancel(self.auto_describe_job)
+            self.auto_describe_job = None
+    
+    def auto_submit_description(self, round_num: int):
+        """
+        本组窗口开始：提交预先生成的候选描述中之前回合没用过的一个
+        :param round_num: 回合数
+        """
+        self.auto_describe_job = None
+        if (not self.auto_describe_var.get() or round_num != self.current_round or not self.countdown_running
+                or self.io.is_busy('describe')):
+            return
+        if not self.my_word:
+            self.log("⚠️ 还没有获取到词语，无法自动描述")
+            return
+        # 预先生成的候选还没准备好（例如词语到得晚）时当场生成
+        candidates = self.auto_candidates.get(round_num) or self.generate_auto_candidates(self.my_word)
+        self.auto_candidates[round_num] = candidates
+        if not candidates:
+            self.log("⚠️ 没有生成候选描述，无法自动描述")
+            return
+        unused = [c for c in candidates if c not in self.strategy.my_descriptions]
+        description = (unused or candidates)[0]
+        
+        self.log(f"自动提交描述: {description}")
+        self.submit_desc_btn.config(state=tk.DISABLED)
+        api_client = self.api_client
+        slot_start = self.describe_window[0]
+        
+        def describe():
+            sent = time.time()
+            result = api_client.submit_description(self.group_name, description)
+            return result, api_client.last_error, sent, time.time()
+        
+        self.io.submit('describe', describe,
+                       on_done=lambda outcome: self.on_auto_description_submitted(round_num, description, slot_start,
+                                                                                  *outcome),
+                       on_error=lambda e: self.on_auto_description_submitted(round_num, description, slot_start,
+                                                                             None, str(e), None, time.time()))
+    
+    def on_auto_description_submitted(self, round_num: int, description: str, slot_start: float,
+                                      result: Optional[dict], error_msg: Optional[str],
+                                      sent: Optional[float], finished: float):
+        """
+        自动描述的提交结果（Tk 主线程），记录端到端延迟：从本组窗口开始到收到服务器确认
+        :param round_num: 回合数
+        :param description: 提交的描述
+        :param slot_start: 本组窗口开始时间（本机时间戳）
+        :param result: 提交结果，失败时为 None
+        :param error_msg: 错误信息
+        :param sent: 请求发出的时间，未发出时为 None
+        :param finished: 收到响应（或出错）的时间
+        """
+        latency = finished - slot_start
+        request_time = finished - sent if sent is not None else None
+        logger.info("自动描述", extra={"fields": {
+            "group": self.group_name, "round": round_num, "ok": bool(result), "latency": round(latency, 3),
+            "request": round(request_time, 3) if request_time is not None else None, "error": error_msg}})
+        if result:
+            self.describe_latencies.append(latency)
+            self.strategy.record_description(description)
+            latencies = sorted(self.describe_latencies)
+            self.log(f"自动描述提交成功！回合: {round_num}，距窗口开始 {latency * 1000:.0f}ms"
+                     f"（请求 {request_time * 1000:.0f}ms，中位数 {latencies[len(latencies) // 2] * 1000:.0f}ms）")
+            self.stop_countdown()
+            self.update_all_descriptions()
+        else:
+            if self.countdown_running:
+                self.submit_desc_btn.config(state=tk.NORMAL)  # 窗口还没结束，可以手动再试
+            self.log(f"自动描述提交失败: {error_msg or '未知错误'}")
+    
     def submit_vote(self):
         """提交投票"""
         target = self.vote_target_var.get().strip()
@@ -431,23 +791,36 @@ class GameClient:
             messagebox.showerror("错误", "不能投票给自己")
             return
         
+        if self.io.is_busy('vote'):
+            return  # 上一次投票还没有结果
         self.log(f"投票给: {target}")
-        # 获取当前状态，确保在投票阶段
-        status = self.api_client.get_status()
+        # 用最近一次轮询到的状态确认在投票阶段（不再额外请求，服务器也会校验）
+        status = self.last_status_data
         if status and status.get('status') != 'voting':
             self.log(f"⚠️ 当前状态不是投票阶段: {status.get('status')}")
             messagebox.showerror("错误", f"当前状态不是投票阶段，无法投票")
             return
         
-        result = self.api_client.submit_vote(self.group_name, target)
+        self.submit_vote_btn.config(state=tk.DISABLED)  # 请求返回前不能重复提交
+        api_client = self.api_client
         
+        def vote():
+            return api_client.submit_vote(self.group_name, target), api_client.last_error
+        
+        self.io.submit('vote', vote, on_done=lambda outcome: self.on_vote_submitted(target, *outcome),
+                       on_error=lambda e: self.on_vote_submitted(target, None, str(e)))
+    
+    def on_vote_submitted(self, target: str, result: Optional[dict], error_msg: Optional[str]):
+        """投票结果（Tk 主线程）"""
         # 注意：成功时服务器返回空字典 {}，需要用 is not None 判断
         if result is not None:
             self.log("投票提交成功！")
             self.submit_vote_btn.config(state=tk.DISABLED)
         else:
-            # 获取详细的错误信息
-            error_msg = self.api_client.last_error or "投票提交失败"
+            error_msg = error_msg or "投票提交失败"
+            status = self.last_status_data
+            if status.get('status') == 'voting':
+                self.submit_vote_btn.config(state=tk.NORMAL)
             self.log(f"投票提交失败: {error_msg}")
             self.log(f"  - 我的组名: {self.group_name}")
             self.log(f"  - 目标组: {target}")
@@ -457,6 +830,7 @@ class GameClient:
 
 def main():
     """主函数"""
+    setup_logging()  # 网络请求日志由后台线程写到标准错误（LOG_LEVEL=DEBUG 可查看响应内容，轮询按采样记录）
     root = tk.Tk()
     app = GameClient(root)
     root.mainloop()
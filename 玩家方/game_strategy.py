@@ -2,6 +2,7 @@
 游戏策略模块
 负责生成描述、投票决策等游戏策略逻辑
 """
+import random
 from typing import List, Optional, Dict
 
 
@@ -14,6 +15,7 @@ class GameStrategy:
         self.descriptions_history = []  # 历史描述记录
         self.vote_history = []  # 历史投票记录
         self.eliminated_groups = []  # 已淘汰的组
+        self.my_descriptions = []  # 自己已提交过的描述（之前回合的描述不再重复使用）
     
     def set_word(self, word: str, role: str):
         """
@@ -35,13 +37,16 @@ class GameStrategy:
         # 1. 如果是平民：生成贴合词语的描述，但要避免直接说出词语
         # 2. 如果是卧底：生成模糊的描述，避免暴露身份
         
-        # 示例：简单策略（需要根据实际需求改进）
+        # 示例：简单策略（需要根据实际需求改进），从几个模板中随机选一个之前没用过的
         if self.my_role == 'civilian':
             # 平民策略：生成贴合词语的描述
-            return f"这是一个关于{word}的描述"
+            templates = [f"这是一个关于{word}的描述", f"一个{len(word)}个字的词，生活中很常见",
+                         "大多数人都接触过它", "它和我们的日常生活关系很密切"]
         else:
             # 卧底策略：生成模糊的描述
-            return "这是一个常见的物品"
+            templates = ["这是一个常见的物品", "生活中经常能见到", "很多人都用过", "它的用途很广"]
+        unused = [t for t in templates if t not in self.my_descriptions]
+        return random.choice(unused or templates)
     
     def decide_vote(self, active_groups: List[str], descriptions: Dict[str, str]) -> Optional[str]:
         """
@@ -60,7 +65,6 @@ class GameStrategy:
             return None
         
         # 简单策略：随机选择一个（实际应该根据描述内容分析）
-        import random
         candidates = [g for g in active_groups if g not in self.eliminated_groups]
         if candidates:
             return random.choice(candidates)
@@ -73,6 +77,13 @@ class GameStrategy:
         """
         self.descriptions_history.append(descriptions)
     
+    def record_description(self, description: str):
+        """
+        记录自己提交成功的描述
+        :param description: 描述文本
+        """
+        self.my_descriptions.append(description)
+    
     def update_vote_history(self, voter: str, target: str):
         """
         更新投票历史
@@ -0,0 +1,97 @@
+"""
+自适应轮询调度模块
+根据游戏阶段和服务器公布的时间点决定距下一次轮询的秒数：
+  - 空闲阶段（等待注册、游戏结束）间隔长，对局进行中间隔短
+  - 不会睡过服务器公布的下一次自动阶段切换（状态中的 deadline）
+  - 本组描述窗口开始前 SLOT_LEAD 秒醒来，窗口内按 SLOT_INTERVAL 密集轮询
+  - 请求失败时按指数退避加随机抖动等待，服务器宕机时整个客户端群的请求量迅速下降
+  - 间隔只向下随机抖动（不会晚于关键时间点），大量客户端不会同步轮询
+服务器支持长轮询时，状态变化由服务器立即返回，阶段间隔和窗口内密集轮询都不需要：
+返回的秒数作为长轮询的最长挂起时间，只在下一个关键时间点（本组窗口开始前、阶段切换）提前返回
+"""
+import random
+import time
+from typing import Callable, Dict, Optional
+
+# 各阶段的轮询间隔（秒）
+PHASE_INTERVALS = {
+    'waiting': 5.0,
+    'registered': 3.0,
+    'word_assigned': 1.0,
+    'describing': 1.5,
+    'voting': 1.0,
+    'round_end': 2.0,
+    'game_end': 10.0
+}
+
+# 未知阶段的轮询间隔（秒）
+DEFAULT_INTERVAL = 2.0
+
+# 本组描述窗口开始前多久醒来（秒），窗口内的轮询间隔（秒）
+SLOT_LEAD = 0.3
+SLOT_INTERVAL = 0.25
+
+# 在阶段切换时间点之后多久轮询（秒），留出服务器调度的余量
+DEADLINE_MARGIN = 0.05
+
+# 间隔向下抖动的最大比例
+JITTER = 0.1
+
+# 出错后的退避：第 n 次连续失败后等待 [d/2, d]，d = min(ERROR_BACKOFF_MAX, ERROR_BACKOFF_BASE * 2^n)（秒）
+ERROR_BACKOFF_BASE = 1.0
+ERROR_BACKOFF_MAX = 30.0
+
+
+class PollScheduler:
+    """一个轮询循环的调度状态（连续失败次数），每次轮询后调用 on_success 或 on_error 得到等待秒数"""
+
+    def __init__(self, group_name: Optional[str] = None,
+                 to_local_time: Callable[[float], float] = lambda timestamp: timestamp,
+                 intervals: Optional[Dict[str, float]] = None, clock: Callable[[], float] = time.time):
+        """
+        :param group_name: 本组组名，用来找到本组的描述窗口；None 表示不关心某个组（例如整个房间的轮询）
+        :param to_local_time: 服务器时间戳换算成本机时间戳（APIClient.to_local_time）
+        :param intervals: 各阶段的轮询间隔，默认 PHASE_INTERVALS
+        :param clock: 本机时间（与 to_local_time 的结果同一基准）
+        """
+        self.group_name = group_name
+        self.to_local_time = to_local_time
+        self.intervals = intervals or PHASE_INTERVALS
+        self.clock = clock
+        self.errors = 0  # 连续失败次数
+
+    def on_success(self, status: Dict, long_poll_wait: Optional[float] = None) -> float:
+        """
+        轮询成功
+        :param status: 状态信息（/api/status 的数据）
+        :param long_poll_wait: 使用长轮询时传入最长挂起时间，代替阶段间隔
+        :return: 距下一次轮询的秒数（长轮询时为下一次请求的挂起时间）
+        """
+        self.errors = 0
+        now = self.clock()
+        phase = status.get('status')
+        delay = long_poll_wait if long_poll_wait is not None else self.intervals.get(phase, DEFAULT_INTERVAL)
+
+        wake_times = []
+        if status.get('deadline'):
+            wake_times.append(self.to_local_time(status['deadline']) + DEADLINE_MARGIN)
+        window = (status.get('describe_deadlines') or {}).get(self.group_name) if phase == 'describing' else None
+        if window:
+            start, end = self.to_local_time(window[0]), self.to_local_time(window[1])
+            if now < start - SLOT_LEAD:
+                wake_times.append(start - SLOT_LEAD)
+            elif now < end and long_poll_wait is None:
+                delay = min(delay, SLOT_INTERVAL)
+        for wake_time in wake_times:
+            if wake_time > now:  # 已经过去的时间点（服务器还没切换阶段）不再参考
+                delay = min(delay, wake_time - now)
+        return delay * random.uniform(1 - JITTER, 1)
+
+    def on_error(self) -> float:
+        """
+        轮询失败（连接失败、超时或服务器错误）
+        :return: 距下一次轮询的秒数
+        """
+        backoff = min(ERROR_BACKOFF_MAX, ERROR_BACKOFF_BASE * 2 ** self.errors)
+        self.errors += 1
+        return random.uniform(backoff / 2, backoff)